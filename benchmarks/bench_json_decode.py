@@ -0,0 +1,37 @@
+"""
+Measures the decode throughput (MB/s) of every installed JSON decoder on
+the issues data file (by default the one configured through
+ENPM611_PROJECT_DATA_PATH).
+
+    python benchmarks/bench_json_decode.py [path to data file]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import config
+import json_decoders
+
+
+def bench(loads, text:str, repeat:int=3) -> float:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        loads(text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+if __name__ == '__main__':
+    path = sys.argv[1] if len(sys.argv) > 1 else config.get_parameter('ENPM611_PROJECT_DATA_PATH')
+    with open(path, 'r') as fin:
+        text = fin.read()
+    size_mb = len(text.encode('utf-8')) / (1024 * 1024)
+
+    print(f'Decoding {path} ({size_mb:.1f} MB)')
+    for name, loads in json_decoders.available_decoders().items():
+        elapsed = bench(loads, text)
+        print(f'  {name:10s} {elapsed:7.3f}s  {size_mb / elapsed:8.1f} MB/s')
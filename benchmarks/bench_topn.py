@@ -0,0 +1,58 @@
+"""
+Compares the pandas groupby/value_counts path that ExampleAnalysis used to
+get the top issue creators with the Counter/heap path in topn.py.
+
+    python benchmarks/bench_topn.py [number of issues]
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from model import Issue
+from topn import top_n_by_key
+
+
+def make_issues(n:int, users:int=50000):
+    # Creator activity is heavily skewed, as in real repositories
+    rng = np.random.default_rng(611)
+    creators = rng.zipf(1.3, n) % users
+    issues = []
+    for c in creators:
+        issue = Issue()
+        issue.creator = f'user{c}'
+        issues.append(issue)
+    return issues
+
+
+def pandas_path(issues, n):
+    df = pd.DataFrame.from_records([{'creator': issue.creator} for issue in issues])
+    return df.groupby(df['creator']).value_counts().nlargest(n)
+
+
+def topn_path(issues, n):
+    return top_n_by_key(issues, lambda issue: issue.creator, n)
+
+
+def bench(fn, *args, repeat:int=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+if __name__ == '__main__':
+    n_issues = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    issues = make_issues(n_issues)
+    pandas_time = bench(pandas_path, issues, 50)
+    topn_time = bench(topn_path, issues, 50)
+    print(f'{n_issues} issues, top 50 creators')
+    print(f'  pandas groupby/value_counts: {pandas_time:.3f}s')
+    print(f'  Counter + heap:              {topn_time:.3f}s ({pandas_time / topn_time:.1f}x)')
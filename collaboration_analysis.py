@@ -0,0 +1,56 @@
+"""
+Collaboration between users: who works on the same issues as whom, and
+which users are most central to the project's issue traffic. Interactions
+are creating an issue, being assigned to it and authoring its events.
+"""
+
+import config
+from data_loader import DataLoader
+from interaction_graph import InteractionGraph
+
+_TOP_K_USERS = 15
+_TOP_K_COLLABORATORS = 10
+
+
+class CollaborationAnalysis:
+    """
+    Prints the most central users of the user x user collaboration graph
+    and, with --user, the users they shared the most issues with.
+    """
+
+    def __init__(self):
+        """
+        Constructor
+        """
+        # Parameter is passed in via command line (--user)
+        self.USER:str = config.get_parameter('user')
+
+    def run(self):
+        """
+        Starting point for this analysis.
+        """
+        issues = DataLoader().get_issues()
+        graph = InteractionGraph.from_issues(issues)
+        users, _ = graph.shape
+
+        print(f'\n\n{users} users interacted with {len(issues)} issues '
+              f'({graph.incidence.nnz} user-issue pairs, {graph.collaboration().nnz // 2} collaborating user pairs).')
+        central = graph.centrality(_TOP_K_USERS)
+        print(f'\nTop {len(central)} users by PageRank on the collaboration graph:')
+        for row in central.itertuples(index=False):
+            print(f'  {row.user:<25} pagerank {row.pagerank:.4f}  {row.issues} issues, '
+                  f'{row.collaborators} collaborators, {row.shared_issues} shared issues')
+
+        if self.USER is not None:
+            collaborators = graph.collaborators_of(self.USER, _TOP_K_COLLABORATORS)
+            print(f'\nUsers sharing the most issues with {self.USER}:')
+            if not collaborators:
+                print('  None')
+            for user, shared in collaborators:
+                print(f'  {user}: {shared} issues')
+        print('\n\n')
+
+
+if __name__ == '__main__':
+    # Invoke run method when running this module directly
+    CollaborationAnalysis().run()
@@ -3,6 +3,7 @@ logger = logging.getLogger(__name__)
 
 import json
 import os
+import threading
 
 '''
 Handles the loading of the config file as well as the access of specific
@@ -10,6 +11,8 @@ config parameters.
 '''
 
 _config = None
+# Makes sure the config file is only read once, even by concurrent callers
+_config_lock = threading.Lock()
 
 
 def _init_config(path=None):
@@ -17,14 +20,18 @@ def _init_config(path=None):
     if _config is not None:
         return
 
-    filepath = _get_default_path()
-    if filepath is None:
-        logger.info('Initializing empty config')
-        _config = {}
+    with _config_lock:
+        if _config is not None:
+            return
 
-    else:
-        with open(filepath, 'r') as fin:
-            _config = json.loads(fin.read())
+        filepath = _get_default_path()
+        if filepath is None:
+            logger.info('Initializing empty config')
+            _config = {}
+
+        else:
+            with open(filepath, 'r') as fin:
+                _config = json.loads(fin.read())
 
 
 def _get_default_path():
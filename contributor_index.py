@@ -0,0 +1,184 @@
+"""
+Per-contributor activity index. It is built in a single pass over the
+issues and their events and stored next to the data file, so looking up
+a user (--user) or ranking contributors does not require scanning the
+events again.
+"""
+
+import logging
+logger = logging.getLogger(__name__)
+
+import heapq
+import json
+import os
+from collections import Counter
+from datetime import datetime
+from typing import List, Dict, Optional
+
+from dateutil import parser
+
+from model import Issue
+
+# Bump when the persisted format changes so stale files are rebuilt
+_INDEX_VERSION = 1
+
+
+class ContributorStats:
+    """
+    Activity of a single user across all issues.
+    """
+
+    def __init__(self, user:str):
+        self.user:str = user
+        self.events_by_type:Counter = Counter()
+        self.issues_created:int = 0
+        self.assignments:int = 0
+        self.first_activity:datetime = None
+        self.last_activity:datetime = None
+
+    @property
+    def total_events(self) -> int:
+        return sum(self.events_by_type.values())
+
+    def _touch(self, when:datetime):
+        if when is None:
+            return
+        if self.first_activity is None or when < self.first_activity:
+            self.first_activity = when
+        if self.last_activity is None or when > self.last_activity:
+            self.last_activity = when
+
+    def to_json(self) -> dict:
+        return {
+            'events_by_type': dict(self.events_by_type),
+            'issues_created': self.issues_created,
+            'assignments': self.assignments,
+            'first_activity': self.first_activity.isoformat() if self.first_activity else None,
+            'last_activity': self.last_activity.isoformat() if self.last_activity else None,
+        }
+
+    @classmethod
+    def from_json(cls, user:str, jobj:dict):
+        stats = cls(user)
+        stats.events_by_type = Counter(jobj.get('events_by_type', {}))
+        stats.issues_created = jobj.get('issues_created', 0)
+        stats.assignments = jobj.get('assignments', 0)
+        for field in ('first_activity', 'last_activity'):
+            if jobj.get(field):
+                setattr(stats, field, parser.parse(jobj[field]))
+        return stats
+
+
+class ContributorIndex:
+    """
+    Maps every user to their ContributorStats.
+    """
+
+    def __init__(self):
+        self.contributors:Dict[str, ContributorStats] = {}
+        # Events without an author are not attributed to anyone
+        self.unattributed_events:int = 0
+
+    def __len__(self):
+        return len(self.contributors)
+
+    def _stats(self, user:str) -> ContributorStats:
+        stats = self.contributors.get(user)
+        if stats is None:
+            stats = self.contributors[user] = ContributorStats(user)
+        return stats
+
+    @classmethod
+    def build(cls, issues:List[Issue]):
+        """
+        Builds the index in one pass over the issues and their events.
+        """
+        index = cls()
+        for issue in issues:
+            if issue.creator:
+                stats = index._stats(issue.creator)
+                stats.issues_created += 1
+                stats._touch(issue.created_date)
+            for assignee in issue.assignees:
+                index._stats(assignee).assignments += 1
+            for event in issue.events:
+                if not event.author:
+                    index.unattributed_events += 1
+                    continue
+                stats = index._stats(event.author)
+                stats.events_by_type[event.event_type] += 1
+                stats._touch(event.event_date)
+        return index
+
+    def get(self, user:str) -> Optional[ContributorStats]:
+        return self.contributors.get(user)
+
+    def total_events(self) -> int:
+        return self.unattributed_events + sum(stats.total_events for stats in self.contributors.values())
+
+    def top(self, n:int, key=lambda stats: stats.total_events) -> List[ContributorStats]:
+        """
+        Returns the n contributors with the highest value for key
+        (by default the number of events they authored).
+        """
+        return heapq.nlargest(n, self.contributors.values(), key=key)
+
+    @staticmethod
+    def cache_path(data_path:str) -> str:
+        return f'{data_path}.contributors.json'
+
+    @staticmethod
+    def _source_signature(data_path:str) -> dict:
+        stat = os.stat(data_path)
+        return {'version': _INDEX_VERSION, 'size': stat.st_size, 'mtime': stat.st_mtime}
+
+    def save(self, data_path:str):
+        """
+        Persists the index next to the data file, tagged with the size and
+        modification time of that file so it can be invalidated.
+        """
+        payload = {
+            'source': self._source_signature(data_path),
+            'unattributed_events': self.unattributed_events,
+            'contributors': {user: stats.to_json() for user, stats in self.contributors.items()},
+        }
+        with open(self.cache_path(data_path), 'w') as fout:
+            json.dump(payload, fout)
+
+    @classmethod
+    def load(cls, data_path:str):
+        """
+        Loads a persisted index, or returns None if there is none or it is
+        out of date with respect to the data file.
+        """
+        try:
+            with open(cls.cache_path(data_path), 'r') as fin:
+                payload = json.load(fin)
+            if payload.get('source') != cls._source_signature(data_path):
+                return None
+        except (OSError, ValueError):
+            return None
+
+        index = cls()
+        index.unattributed_events = payload.get('unattributed_events', 0)
+        for user, jobj in payload.get('contributors', {}).items():
+            index.contributors[user] = ContributorStats.from_json(user, jobj)
+        return index
+
+    @classmethod
+    def load_or_build(cls, issues:List[Issue], data_path:str=None):
+        """
+        Returns the persisted index for data_path if it is still valid and
+        otherwise builds it from the issues and persists it.
+        """
+        index = cls.load(data_path) if data_path else None
+        if index is not None:
+            return index
+
+        index = cls.build(issues)
+        if data_path:
+            try:
+                index.save(data_path)
+            except OSError as e:
+                logger.info(f'Could not persist contributor index: {e}')
+        return index
@@ -1,41 +1,272 @@
 
-import json
-from typing import List
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import List, Dict
 
 import config
-from model import Issue
+import json_decoders
+import data_stream
+import sampling
+from model import Issue, LABELS
+from timeline import TimelineIndex
+from contributor_index import ContributorIndex
+from sqlite_store import SQLiteStore
+from shared_dataset import SharedDataset
+from text_arena import TextBudget
 
 # Store issues as singleton to avoid reloads
 _ISSUES:List[Issue] = None
+# Issues of the named datasets configured in ENPM611_PROJECT_DATASETS
+_DATASETS:Dict[str, List[Issue]] = {}
+# Timelines derived from the issues of each dataset, rebuilt only when the issues change
+_TIMELINES:Dict[str, TimelineIndex] = {}
+# Per-user activity of each dataset as (issues, index), persisted next to the data file
+_CONTRIBUTORS:Dict[str, tuple] = {}
+# Database of each dataset with the optional SQLite storage backend
+# (ENPM611_PROJECT_STORAGE=sqlite), as (data file, store)
+_STORES:Dict[str, tuple] = {}
+
+# Guards the singletons above so that concurrent callers never load the
+# same dataset twice. Loads of different datasets do not block each other.
+_LOCKS_GUARD = threading.Lock()
+_LOAD_LOCKS:Dict[str, threading.Lock] = {}
+_DERIVED_LOCK = threading.RLock()
+# Loads currently running on behalf of get_issues_async, per dataset
+_IN_FLIGHT:Dict[str, Future] = {}
+
+
+def _load_lock(dataset:str) -> threading.Lock:
+    with _LOCKS_GUARD:
+        lock = _LOAD_LOCKS.get(dataset)
+        if lock is None:
+            lock = _LOAD_LOCKS[dataset] = threading.Lock()
+        return lock
+
 
 class DataLoader:
     """
     Loads the issue data into a runtime object.
     """
     
-    def __init__(self):
+    def __init__(self, dataset:str=None):
         """
-        Constructor
+        Constructor. Without a dataset name the data file configured in
+        ENPM611_PROJECT_DATA_PATH is used; otherwise the path is looked up in
+        the ENPM611_PROJECT_DATASETS mapping of names to data files.
         """
-        self.data_path:str = config.get_parameter('ENPM611_PROJECT_DATA_PATH')
+        self.dataset:str = dataset
+        if dataset is None:
+            self.data_path:str = config.get_parameter('ENPM611_PROJECT_DATA_PATH')
+        else:
+            datasets = config.get_parameter('ENPM611_PROJECT_DATASETS') or {}
+            if dataset not in datasets:
+                raise ValueError(f'Dataset "{dataset}" is not configured in ENPM611_PROJECT_DATASETS')
+            self.data_path:str = datasets[dataset]
+        self.storage:str = config.get_parameter('ENPM611_PROJECT_STORAGE', 'memory')
+        self.decoder:str = config.get_parameter('ENPM611_PROJECT_JSON_DECODER', 'auto')
+        # MB of issue texts and comments kept in RAM, the rest is moved to disk (unlimited if not set)
+        self.memory_budget = config.get_parameter('ENPM611_PROJECT_MEMORY_BUDGET_MB')
         
     def get_issues(self):
         """
         This should be invoked by other parts of the application to get access
         to the issues in the data file.
         """
+        issues = self._loaded()
+        if issues is None:
+            # Only one caller loads, everyone else waits for it and shares the result
+            with _load_lock(self.dataset):
+                issues = self._loaded()
+                if issues is None:
+                    issues = self._load()
+                    print(f'Loaded {len(issues)} issues from {self.data_path}.')
+                    self._set_loaded(issues)
+        return issues
+
+    async def get_issues_async(self):
+        """
+        Awaitable variant of get_issues(). The load runs in a background
+        thread so the event loop is not blocked, and all coroutines awaiting
+        the same dataset share that single in-flight load.
+        """
+        issues = self._loaded()
+        if issues is not None:
+            return issues
+        with _LOCKS_GUARD:
+            future = _IN_FLIGHT.get(self.dataset)
+            if future is None:
+                future = _IN_FLIGHT[self.dataset] = Future()
+                threading.Thread(target=self._load_into, args=(future,), daemon=True).start()
+        return await asyncio.wrap_future(future)
+
+    def _load_into(self, future:Future):
+        try:
+            future.set_result(self.get_issues())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with _LOCKS_GUARD:
+                _IN_FLIGHT.pop(self.dataset, None)
+
+    def _loaded(self) -> List[Issue]:
+        if self.dataset is None:
+            return _ISSUES
+        return _DATASETS.get(self.dataset)
+
+    def _set_loaded(self, issues:List[Issue]):
         global _ISSUES # to access it within the function
-        if _ISSUES is None:
-            _ISSUES = self._load()
-            print(f'Loaded {len(_ISSUES)} issues from {self.data_path}.')
-        return _ISSUES
+        if self.dataset is None:
+            _ISSUES = issues
+        else:
+            _DATASETS[self.dataset] = issues
+
+    def get_timelines(self) -> TimelineIndex:
+        """
+        Returns the timelines (close/reopen times, label intervals, time in
+        status) of all issues. They are computed once per loaded dataset and
+        shared by all analyses.
+        """
+        issues = self.get_issues()
+        with _DERIVED_LOCK:
+            timelines = _TIMELINES.get(self.dataset)
+            if timelines is None or timelines.issues is not issues:
+                timelines = _TIMELINES[self.dataset] = TimelineIndex(issues)
+            return timelines
+
+    def get_contributors(self) -> ContributorIndex:
+        """
+        Returns the per-user activity index. It is read from the file stored
+        next to the data file when that is still up to date, and otherwise
+        built from the issues in one pass and persisted.
+        """
+        issues = self.get_issues()
+        with _DERIVED_LOCK:
+            source, contributors = _CONTRIBUTORS.get(self.dataset, (None, None))
+            if contributors is None or source is not issues:
+                contributors = ContributorIndex.load_or_build(issues, self.data_path)
+                _CONTRIBUTORS[self.dataset] = (issues, contributors)
+            return contributors
     
-    def _load(self):
+    def publish_shared(self) -> SharedDataset:
+        """
+        Copies the loaded issues into shared memory once so that
+        multiprocessing workers can attach to them by passing the returned
+        dataset's handle to SharedDatasetView.attach(). The caller owns the
+        shared memory and must unlink() it when the workers are done.
         """
-        Loads the issues into memory.
+        return SharedDataset(self.get_issues())
+
+    def get_store(self) -> SQLiteStore:
         """
+        Returns the SQLite database holding the issues if the SQLite storage
+        backend is configured, and None otherwise. The data file is ingested
+        the first time and again whenever it changes.
+        """
+        if self.storage != 'sqlite':
+            return None
+        with _DERIVED_LOCK:
+            source, store = _STORES.get(self.dataset, (None, None))
+            if store is None or source != self.data_path:
+                # A store of a previously configured data file is closed once its readers drop it
+                store = SQLiteStore.open_for(self.data_path, self._load_records, self._db_path())
+                _STORES[self.dataset] = (self.data_path, store)
+            return store
+
+    def _db_path(self) -> str:
+        # Named datasets get their own database next to their data file
+        return config.get_parameter('ENPM611_PROJECT_DB_PATH') if self.dataset is None else None
+
+    def rebuild_store(self) -> SQLiteStore:
+        """
+        Ingests the data file into a new SQLite database on the calling
+        thread and then swaps it in for the current one. Readers keep using
+        the previous database meanwhile; it is closed once the last of them
+        drops its reference to it.
+        """
+        store = SQLiteStore.rebuild(self.data_path, self._load_records, self._db_path())
+        with _DERIVED_LOCK:
+            _STORES[self.dataset] = (self.data_path, store)
+        return store
+
+    def find_issues(self, state:str=None, label:str=None, creator:str=None) -> List[Issue]:
+        """
+        Returns the issues matching all of the given filters. With the SQLite
+        backend the filtering is done by the database and only the matching
+        issues are materialized.
+        """
+        store = self.get_store()
+        if store is not None:
+            return store.get_issues(state=state, label=label, creator=creator)
+        issues = self.get_issues()
+        label_code = None
+        if label is not None:
+            # Labels are compared by their code in the shared vocabulary
+            label_code = LABELS.code(label)
+            if label_code is None:
+                return []
+        return [
+            issue for issue in issues
+            if (state is None or issue.state == state)
+            and (label_code is None or label_code in issue.label_codes)
+            and (creator is None or issue.creator == creator)
+        ]
+
+    def get_sample(self, size:int, key=None, seed:int=None) -> sampling.Sample:
+        """
+        Returns a uniform sample of size issues (or, with a stratum key from
+        sampling.STRATA, up to size issues per stratum). The sample is drawn
+        from the loaded issues if there are any; otherwise the data file is
+        streamed once and only the sampled records become Issue objects.
+        """
+        issues = self._loaded()
+        if issues is not None:
+            return sampling.draw(issues, size, key, seed)
+        return sampling.draw(self.iter_records(), size, key, seed).map(Issue)
+
+    def iter_records(self):
+        """
+        Streams the raw issue records from the data file one at a time,
+        decompressing it on the fly if needed. Neither the file nor the
+        list of records is held in memory.
+        """
+        compression = data_stream.detect_compression(self.data_path)
+        with data_stream.open_text(self.data_path, compression) as fin:
+            yield from data_stream.iter_json_array(fin)
+
+    def _load_records(self):
+        """
+        Reads the raw issue records from the data file. Compressed files are
+        decoded incrementally while they are decompressed; plain files are
+        decoded in one go with the fastest available decoder.
+        """
+        if data_stream.detect_compression(self.data_path) is not None:
+            return self.iter_records()
+        _, loads = json_decoders.get_decoder(self.decoder)
         with open(self.data_path,'r') as fin:
-            return [Issue(i) for i in json.load(fin)]
+            return loads(fin.read())
+
+    def _text_budget(self) -> TextBudget:
+        budget = self.memory_budget
+        if isinstance(budget, bool) or not isinstance(budget, (int, float)) or budget < 0:
+            return None
+        return TextBudget(int(budget * 2**20), config.get_parameter('ENPM611_PROJECT_SPILL_DIR'))
+
+    def _load(self):
+        """
+        Loads the issues into memory. With a memory budget, the data file is
+        streamed and the texts that do not fit into the budget are moved to
+        a memory-mapped file as each issue is loaded, so neither the raw
+        records nor all texts are ever held in memory at once.
+        """
+        budget = self._text_budget()
+        if budget is None:
+            return [Issue(i) for i in self._load_records()]
+        issues = [budget.apply(Issue(record)) for record in self.iter_records()]
+        if budget.spilled:
+            print(f'Moved {budget.spilled} texts ({len(budget.arena) / 2**20:.1f} MB) to disk '
+                  f'to stay within the memory budget of {self.memory_budget} MB.')
+        return issues
     
 
 if __name__ == '__main__':
@@ -0,0 +1,209 @@
+"""
+Streaming access to the issues data file. Compressed files (gzip, xz,
+bz2 and, if the zstandard package is installed, zstd) are detected by
+their extension or magic bytes and decompressed on the fly, and the
+top-level JSON array is decoded one record at a time, so neither the
+compressed nor the decompressed file has to be held in memory. Append-only
+JSON Lines feeds of updates can be followed as they grow.
+"""
+
+import logging
+logger = logging.getLogger(__name__)
+
+import bz2
+import gzip
+import io
+import json
+import lzma
+import os
+import time
+from typing import Iterator, Optional, TextIO
+
+_EXTENSIONS = {
+    '.gz': 'gzip',
+    '.gzip': 'gzip',
+    '.xz': 'xz',
+    '.lzma': 'xz',
+    '.bz2': 'bz2',
+    '.zst': 'zstd',
+    '.zstd': 'zstd',
+}
+
+_MAGIC_BYTES = [
+    (b'\x1f\x8b', 'gzip'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'BZh', 'bz2'),
+    (b'\x28\xb5\x2f\xfd', 'zstd'),
+]
+
+# Amount of decompressed text read from the stream at a time
+CHUNK_SIZE = 1 << 20
+
+
+def detect_compression(path:str) -> Optional[str]:
+    """
+    Returns the compression format of the file ("gzip", "xz", "bz2" or
+    "zstd") based on its extension or, failing that, its first bytes.
+    Returns None for uncompressed files.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension in _EXTENSIONS:
+        return _EXTENSIONS[extension]
+    try:
+        with open(path, 'rb') as fin:
+            head = fin.read(8)
+    except OSError:
+        return None
+    for magic, compression in _MAGIC_BYTES:
+        if head[:len(magic)] == magic:
+            return compression
+    return None
+
+
+def open_text(path:str, compression:str=None) -> TextIO:
+    """
+    Opens the file as a text stream, decompressing it on the fly.
+    """
+    if compression is None:
+        return open(path, 'r', encoding='utf-8')
+    if compression == 'gzip':
+        return gzip.open(path, 'rt', encoding='utf-8')
+    if compression == 'xz':
+        return lzma.open(path, 'rt', encoding='utf-8')
+    if compression == 'bz2':
+        return bz2.open(path, 'rt', encoding='utf-8')
+    if compression == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError('Reading zstd compressed data requires the zstandard package')
+        raw = zstandard.ZstdDecompressor().stream_reader(open(path, 'rb'), closefd=True)
+        return io.TextIOWrapper(raw, encoding='utf-8')
+    raise ValueError(f'Unsupported compression "{compression}"')
+
+
+def iter_json_array(stream:TextIO, chunk_size:int=CHUNK_SIZE) -> Iterator[any]:
+    """
+    Incrementally decodes a top-level JSON array from a text stream and
+    yields its elements one by one. Only the text of the element currently
+    being decoded (plus one chunk) is kept in memory.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    eof = False
+
+    def fill(size):
+        nonlocal buffer, pos, eof
+        chunk = stream.read(size)
+        if not chunk:
+            eof = True
+        # Drop the text that has already been decoded
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+    def skip_whitespace():
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n':
+                pos += 1
+            if pos < len(buffer) or eof:
+                return
+            fill(chunk_size)
+
+    skip_whitespace()
+    if pos >= len(buffer) or buffer[pos] != '[':
+        raise ValueError('Expected the data file to contain a JSON array')
+    pos += 1
+
+    # After an element only "," or "]" may follow; after "," only an element,
+    # and "]" right after "[" for an empty array
+    expect_element = True
+    empty = True
+    while True:
+        skip_whitespace()
+        if pos >= len(buffer):
+            raise ValueError('Unexpected end of data while decoding JSON array')
+        char = buffer[pos]
+        if not expect_element:
+            if char == ']':
+                return
+            if char != ',':
+                raise ValueError(f'Expected "," or "]" between JSON array elements, found {char!r}')
+            pos += 1
+            expect_element = True
+            continue
+        if char == ']' and empty:
+            return
+        if char in ',]':
+            raise ValueError(f'Expected a JSON array element, found {char!r}')
+
+        # Decode the next element, reading more text until it is complete
+        read_size = chunk_size
+        while True:
+            try:
+                element, end = decoder.raw_decode(buffer, pos)
+                if end < len(buffer) or eof:
+                    break
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            # Grow geometrically so large elements are not re-parsed too often
+            fill(read_size)
+            read_size *= 2
+        pos = end
+        expect_element = False
+        empty = False
+        yield element
+
+
+def follow_jsonl(path:str, interval:float=1.0, stop=None, from_start:bool=True,
+                 chunk_size:int=CHUNK_SIZE) -> Iterator[Optional[dict]]:
+    """
+    Follows an append-only JSON Lines file like "tail -f" and yields every
+    record once its line is complete. Whenever no new line is available it
+    yields None and then waits interval seconds, so the caller can do
+    periodic work while the file is idle or does not exist yet. If the file
+    shrinks (truncated or replaced), it is read again from the start. A
+    large backlog is read chunk_size bytes at a time and its records are
+    yielded chunk by chunk. Runs until the stop event (a threading.Event)
+    is set.
+    """
+    position = 0
+    if not from_start:
+        try:
+            position = os.path.getsize(path)
+        except OSError:
+            # The file does not exist yet, everything written to it is new
+            pass
+    pending = b''
+    while stop is None or not stop.is_set():
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = None
+        if size is not None and size < position:
+            position = 0
+            pending = b''
+
+        if size is not None and size > position:
+            with open(path, 'rb') as fin:
+                fin.seek(position)
+                data = fin.read(min(size - position, chunk_size))
+            position += len(data)
+            # The last piece is an incomplete line until its newline arrives
+            *lines, pending = (pending + data).split(b'\n')
+            for line in lines:
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    logger.warning(f'Skipping malformed line in {path}: {line[:80]!r}')
+            continue
+
+        yield None
+        if stop is not None:
+            stop.wait(interval)
+        else:
+            time.sleep(interval)
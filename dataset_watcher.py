@@ -0,0 +1,99 @@
+"""
+Keeps a long-lived process in sync with its data file. A background
+thread polls the configured data path and, when the file changes, loads
+the new version and swaps it in for the DataLoader singleton. The swap is
+a single reference assignment, so readers keep using the previous issues
+until the new ones are complete and never wait for the reload.
+"""
+
+import logging
+logger = logging.getLogger(__name__)
+
+import os
+import threading
+
+import config
+from data_loader import DataLoader
+
+# Seconds between two checks of the data file
+_DEFAULT_INTERVAL = 5
+
+
+class DatasetWatcher:
+    """
+    Polls the data file of a dataset and reloads it when its size or
+    modification time changes. Use start()/stop() or a with-statement.
+    """
+
+    def __init__(self, dataset:str=None, interval:float=None):
+        self.loader:DataLoader = DataLoader(dataset)
+        self.interval:float = interval or config.get_parameter('ENPM611_PROJECT_WATCH_INTERVAL', _DEFAULT_INTERVAL)
+        self.reloads:int = 0
+        self._signature = self._stat()
+        self._stop_event = threading.Event()
+        self._thread:threading.Thread = None
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.loader.data_path)
+        except OSError:
+            return None
+        return (stat.st_size, stat.st_mtime_ns)
+
+    def check_once(self) -> bool:
+        """
+        Reloads the dataset if the data file changed since the last check.
+        Returns whether a reload happened.
+        """
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return False
+        try:
+            self.reload()
+        except Exception as e:
+            # Most likely the file is still being written, retry on the next check
+            logger.warning(f'Could not reload {self.loader.data_path}: {e}')
+            return False
+        self._signature = signature
+        return True
+
+    def reload(self):
+        """
+        Loads the data file and atomically replaces the cached issues. With
+        the SQLite backend the file is ingested into a new database that is
+        swapped in the same way; the issues are then only reloaded into
+        memory if they had been loaded before.
+        """
+        if self.loader.storage == 'sqlite':
+            count = self.loader.rebuild_store().count_issues()
+            if self.loader._loaded() is not None:
+                self.loader._set_loaded(self.loader._load())
+        else:
+            issues = self.loader._load()
+            self.loader._set_loaded(issues)
+            count = len(issues)
+        self.reloads += 1
+        print(f'Reloaded {count} issues from {self.loader.data_path}.')
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self.check_once()
+
+    def start(self):
+        if self._thread is None:
+            self._stop_event.clear()
+            self._thread = threading.Thread(target=self._run, name='dataset-watcher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
@@ -0,0 +1,146 @@
+"""
+Finds likely duplicate issues. Every issue's title and body is reduced to
+a MinHash signature and locality-sensitive hashing groups the signatures
+into buckets, so only issues sharing a bucket are compared instead of all
+pairs. Signatures are cached next to the data file by issue number and a
+digest of the issue text, so a re-run only hashes new or edited issues.
+"""
+
+import logging
+logger = logging.getLogger(__name__)
+
+import hashlib
+import os
+from typing import List, Tuple
+
+import numpy as np
+
+from data_loader import DataLoader
+from minhash import MinHasher, candidate_pairs, estimate_similarity
+from model import Issue
+from trigram_index import issue_text
+
+# Bump when the shingling or hashing changes so old caches are discarded
+_CACHE_VERSION = 1
+
+_NUM_PERM = 128
+# 32 bands of 4 rows: pairs above roughly 0.42 similarity become candidates
+_BANDS = 32
+# Candidate pairs below this estimated similarity are not reported
+_SIMILARITY_THRESHOLD = 0.5
+_TOP_K_PAIRS = 20
+
+
+def _text_digest(text:str) -> int:
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class DuplicateAnalysis:
+    """
+    Reports the pairs of issues whose texts are most similar.
+    """
+
+    def __init__(self):
+        """
+        Constructor
+        """
+        self.hasher:MinHasher = MinHasher(num_perm=_NUM_PERM)
+
+    @staticmethod
+    def cache_path(data_path:str) -> str:
+        return f'{data_path}.minhash.npz'
+
+    def _params(self) -> np.ndarray:
+        return np.array([_CACHE_VERSION, self.hasher.num_perm, self.hasher.shingle_size, self.hasher.seed],
+                        dtype=np.int64)
+
+    def _load_cache(self, data_path:str) -> dict:
+        """
+        Returns the cached signatures as a mapping of issue number to
+        (text digest, signature), or an empty mapping if there is no usable
+        cache.
+        """
+        try:
+            with np.load(self.cache_path(data_path), allow_pickle=False) as cache:
+                if not np.array_equal(cache['params'], self._params()):
+                    return {}
+                return {int(number): (int(digest), signature) for number, digest, signature
+                        in zip(cache['numbers'], cache['digests'], cache['signatures'])}
+        except (OSError, ValueError, KeyError):
+            return {}
+
+    def _save_cache(self, data_path:str, numbers:List[int], digests:List[int], signatures:np.ndarray):
+        path = self.cache_path(data_path)
+        try:
+            # Write to a temporary file first so an interrupted run cannot leave a truncated cache
+            with open(path + '.tmp', 'wb') as fout:
+                np.savez(fout, params=self._params(), numbers=np.array(numbers, dtype=np.int64),
+                         digests=np.array(digests, dtype=np.uint64), signatures=signatures)
+            os.replace(path + '.tmp', path)
+        except OSError as e:
+            logger.info(f'Could not cache MinHash signatures: {e}')
+
+    def signatures(self, issues:List[Issue], data_path:str=None) -> np.ndarray:
+        """
+        Returns the MinHash signature of every issue (one row per issue),
+        reusing the cached signature of issues whose text has not changed.
+        """
+        if not isinstance(data_path, str):
+            # Only cache next to real data files
+            data_path = None
+        cached = self._load_cache(data_path) if data_path else {}
+
+        numbers = []
+        digests = []
+        rows = np.empty((len(issues), self.hasher.num_perm), dtype=np.uint32)
+        hashed = 0
+        for i, issue in enumerate(issues):
+            text = issue_text(issue)
+            digest = _text_digest(text)
+            entry = cached.get(issue.number)
+            if entry is not None and entry[0] == digest:
+                rows[i] = entry[1]
+            else:
+                rows[i] = self.hasher.signature(text)
+                hashed += 1
+            numbers.append(issue.number)
+            digests.append(digest)
+
+        if data_path and hashed:
+            self._save_cache(data_path, numbers, digests, rows)
+        logger.info(f'Computed {hashed} of {len(issues)} MinHash signatures')
+        return rows
+
+    def find_duplicates(self, issues:List[Issue], data_path:str=None) -> List[Tuple[float, Issue, Issue]]:
+        """
+        Returns the (estimated similarity, issue, issue) of the likely
+        duplicate pairs, most similar first.
+        """
+        signatures = self.signatures(issues, data_path)
+        pairs = []
+        for i, j in candidate_pairs(signatures, _BANDS):
+            similarity = estimate_similarity(signatures[i], signatures[j])
+            if similarity >= _SIMILARITY_THRESHOLD:
+                pairs.append((similarity, issues[i], issues[j]))
+        pairs.sort(key=lambda p: (-p[0], p[1].number, p[2].number))
+        return pairs
+
+    def run(self):
+        """
+        Starting point for this analysis.
+        """
+        loader = DataLoader()
+        issues = loader.get_issues()
+        pairs = self.find_duplicates(issues, loader.data_path)
+
+        print(f'\n\nFound {len(pairs)} likely duplicate pairs among {len(issues)} issues '
+              f'(estimated similarity >= {_SIMILARITY_THRESHOLD}).')
+        for similarity, a, b in pairs[:_TOP_K_PAIRS]:
+            print(f'  {similarity:.2f}  #{a.number} "{a.title}"')
+            print(f'        #{b.number} "{b.title}"')
+        print('\n\n')
+
+
+if __name__ == '__main__':
+    # Invoke run method when running this module directly
+    DuplicateAnalysis().run()
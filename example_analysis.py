@@ -1,4 +1,5 @@
 
+from collections import Counter
 from typing import List
 import matplotlib.pyplot as plt
 import numpy as np
@@ -6,6 +7,9 @@ import pandas as pd
 
 from data_loader import DataLoader
 from model import Issue,Event
+from sampling import Sample, describe, sample_parameters
+from sketches import ActivitySketch
+from topn import top_n_by_key
 import config
 
 class ExampleAnalysis:
@@ -20,7 +24,67 @@ class ExampleAnalysis:
         """
         # Parameter is passed in via command line (--user)
         self.USER:str = config.get_parameter('user')
+        # Optional preview on a sample (--sample, --stratify, --seed)
+        self.sample_size, self.sample_key, self.seed = sample_parameters()
+        # Use fixed-size sketches instead of exact per-user counts (--approximate)
+        self.APPROXIMATE:bool = config.get_parameter('approximate') is True
     
+    def _print_user_report(self, stats):
+        print(f'Activity of {stats.user}:')
+        print(f'  Issues created: {stats.issues_created}')
+        print(f'  Issues assigned: {stats.assignments}')
+        print(f'  First activity: {stats.first_activity}')
+        print(f'  Last activity: {stats.last_activity}')
+        print('  Events by type:')
+        for event_type, count in stats.events_by_type.most_common():
+            print(f'    {event_type}: {count}')
+        print('\n')
+    
+    def _estimate(self, sample:Sample, top_n:int):
+        """
+        Estimates the number of events (of the user, if given) and the issues
+        created per user in the full dataset from a sample, and prints them
+        with their confidence intervals.
+        """
+        if self.USER is not None:
+            events = sample.estimate_total(sum(1 for e in issue.events if e.author == self.USER)
+                                           for issue in sample.items)
+        else:
+            events = sample.estimate_total(len(issue.events) for issue in sample.items)
+
+        created = Counter()
+        for issue, weight in zip(sample.items, sample.weights):
+            if issue.creator:
+                created[issue.creator] += weight
+        top_creators = [(user, round(count)) for user, count in created.most_common(top_n)]
+
+        print('\n\n' + describe(sample))
+        print(f'Estimated events: {events}')
+        print('Estimated issues created by the top 10 creators:')
+        for user, _ in top_creators[:10]:
+            print(f'  {user}: {sample.estimate_count(lambda issue: issue.creator == user)}')
+        return round(events.value), top_creators
+
+    def _sketch(self, loader:DataLoader, top_n:int):
+        """
+        Streams the data file once into fixed-size sketches and prints the
+        approximate number of distinct users and the top commenters.
+        """
+        sketch = ActivitySketch.build(loader.iter_records(), capacity=2 * top_n)
+        if self.USER is not None:
+            total_events = sketch.authors.estimate(self.USER)
+        else:
+            total_events = sketch.events
+
+        print('\n\nApproximate statistics (HyperLogLog, Count-Min and Space-Saving sketches):')
+        print(f'  Distinct issue creators: ~{sketch.creators.distinct.count():,.0f}')
+        print(f'  Distinct event authors: ~{sketch.authors.distinct.count():,.0f}')
+        print(f'  Distinct commenters: ~{sketch.commenters.distinct.count():,.0f}')
+        print('  Top 10 commenters:')
+        for user, count in sketch.commenters.top(10):
+            print(f'    {user}: ~{count}')
+        return sketch.issues, total_events, sketch.creators.top(top_n)
+
     def run(self):
         """
         Starting point for this analysis.
@@ -28,29 +92,54 @@ class ExampleAnalysis:
         Note: this is just an example analysis. You should replace the code here
         with your own implementation and then implement two more such analyses.
         """
-        issues:List[Issue] = DataLoader().get_issues()
+        loader = DataLoader()
+        top_n:int = 50
+        stats = None
         
-        ### BASIC STATISTICS
-        # Calculate the total number of events for a specific user (if specified in command line args)
-        total_events:int = 0
-        for issue in issues:
-            total_events += len([e for e in issue.events if self.USER is None or e.author == self.USER])
+        if self.APPROXIMATE:
+            total_issues, total_events, top_creators = self._sketch(loader, top_n)
+        elif self.sample_size is not None:
+            sample = loader.get_sample(self.sample_size, self.sample_key, self.seed)
+            total_issues:int = sample.population
+            total_events, top_creators = self._estimate(sample, top_n)
+        elif loader.storage == 'sqlite':
+            # Counting is pushed down into the database
+            store = loader.get_store()
+            total_issues:int = store.count_issues()
+            total_events:int = store.count_events(self.USER)
+            if self.USER is not None:
+                stats = store.contributor_stats(self.USER)
+            top_creators = store.top_creators(top_n)
+        else:
+            issues:List[Issue] = loader.get_issues()
+            total_issues:int = len(issues)
+            
+            ### BASIC STATISTICS
+            # Calculate the total number of events for a specific user (if specified in command line args)
+            contributors = loader.get_contributors()
+            if self.USER is not None:
+                stats = contributors.get(self.USER)
+                total_events:int = stats.total_events if stats is not None else 0
+            else:
+                total_events:int = contributors.total_events()
+            
+            # Count issues per creator and keep the top N with a heap
+            top_creators = top_n_by_key(issues, lambda issue: issue.creator, top_n)
         
-        output:str = f'Found {total_events} events across {len(issues)} issues'
+        output:str = f'Found {total_events} events across {total_issues} issues'
         if self.USER is not None:
             output += f' for {self.USER}.'
         else:
             output += '.'
         print('\n\n'+output+'\n\n')
+        if stats is not None:
+            self._print_user_report(stats)
         
 
         ### BAR CHART
         # Display a graph of the top 50 creators of issues
-        top_n:int = 50
-        # Create a dataframe (with only the creator's name) to make statistics a lot easier
-        df = pd.DataFrame.from_records([{'creator':issue.creator} for issue in issues])
-        # Determine the number of issues for each creator and generate a bar chart of the top N
-        df_hist = df.groupby(df["creator"]).value_counts().nlargest(top_n).plot(kind="bar", figsize=(14,8), title=f"Top {top_n} issue creators")
+        # Generate a bar chart of the top N (only N rows reach pandas)
+        df_hist = pd.Series(dict(top_creators)).plot(kind="bar", figsize=(14,8), title=f"Top {top_n} issue creators")
         # Set axes labels
         df_hist.set_xlabel("Creator Names")
         df_hist.set_ylabel("# of issues created")
@@ -0,0 +1,79 @@
+"""
+Skips re-rendering figures whose data and style did not change since the
+image file was last written. A small metadata file next to the image
+records a hash of everything that was plotted and how long rendering
+took, so an unchanged figure is reused and the time saved is reported.
+"""
+
+import logging
+logger = logging.getLogger(__name__)
+
+import hashlib
+import json
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+import matplotlib.pyplot as plt
+
+
+def figure_key(*parts:Any) -> str:
+    """
+    Hash of the plotted data and style parameters. Values that are not
+    JSON types (numpy numbers, enums, dates ...) are hashed by their str().
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def show_image(image_path:Path):
+    """
+    Puts a saved image on a bare figure, so that plt.show() displays it
+    without drawing the original figure again.
+    """
+    image = plt.imread(image_path)
+    fig = plt.figure(figsize=(image.shape[1] / 100, image.shape[0] / 100))
+    ax = fig.add_axes([0, 0, 1, 1])
+    ax.imshow(image)
+    ax.axis('off')
+
+
+class FigureCache:
+    """
+    Cache entry of one image file.
+    """
+
+    def __init__(self, image_path:Path):
+        self.image_path:Path = Path(image_path)
+        self.meta_path:Path = self.image_path.with_name(self.image_path.name + '.cache.json')
+
+    def _read_meta(self) -> dict:
+        try:
+            with open(self.meta_path, 'r') as fin:
+                return json.load(fin)
+        except (OSError, ValueError):
+            return {}
+
+    def is_current(self, key:str) -> bool:
+        return self.image_path.exists() and self._read_meta().get('key') == key
+
+    def render(self, key:str, draw:Callable[[], None]) -> bool:
+        """
+        Calls draw(), which must write the image file, unless the file was
+        written for the same key before. Returns whether draw() was called;
+        if it was not, show_image() displays the existing file.
+        """
+        if self.is_current(key):
+            saved = self._read_meta().get('render_seconds', 0.0)
+            print(f"\nFigure unchanged, reusing: {self.image_path.resolve()} (saved {saved:.2f}s of rendering)")
+            return False
+
+        start = time.perf_counter()
+        draw()
+        elapsed = time.perf_counter() - start
+        try:
+            with open(self.meta_path, 'w') as fout:
+                json.dump({'key': key, 'render_seconds': elapsed}, fout)
+        except OSError as e:
+            logger.info(f'Could not record figure cache entry: {e}')
+        return True
@@ -0,0 +1,197 @@
+"""
+Issue throughput over time: how many issues were opened, reopened and
+closed in each day, week or month, how large the backlog of open issues
+was at the end of each period and how old the currently open issues are.
+All dates are binned at once with a binary search into the period
+boundaries and the backlog is a cumulative sum over the periods, so the
+cost is one vectorized pass over the dates, however many issues there are.
+"""
+
+from pathlib import Path
+from typing import Iterable
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+import config
+from data_loader import DataLoader
+from figure_cache import FigureCache, figure_key, show_image
+from timeline import TimelineIndex
+
+# Period (--period) -> (pandas period code, date_range frequency of the period starts)
+_PERIODS = {
+    'day': ('D', 'D'),
+    'week': ('W', 'W-MON'),
+    'month': ('M', 'MS'),
+}
+_DEFAULT_PERIOD = 'week'
+# Age buckets of open issues, in days
+_AGE_EDGES = [0, 7, 30, 90, 180, 365, 730, np.inf]
+_AGE_LABELS = ['< 1 week', '1-4 weeks', '1-3 months', '3-6 months', '6-12 months', '1-2 years', '> 2 years']
+# Number of most recent periods printed
+_RECENT_PERIODS = 12
+OUTPUT_PNG = Path("./figures/flow_analysis/flow_analysis.png")
+# Part of the figure cache key; bump version when the plotting code changes
+_FIGURE_STYLE = {'version': 1, 'figsize': (18, 6), 'dpi': 200}
+
+
+def _datetimes(values:Iterable) -> np.ndarray:
+    """
+    Dates as UTC datetime64[ns] values (NaT where missing).
+    """
+    return pd.to_datetime(pd.Series(list(values), dtype=object), utc=True).to_numpy(dtype='datetime64[ns]')
+
+
+def _bin(dates:np.ndarray, starts:np.ndarray) -> np.ndarray:
+    """
+    Number of dates falling into each period, given the sorted period starts.
+    """
+    index = np.searchsorted(starts, dates, side='right') - 1
+    return np.bincount(np.maximum(index, 0), minlength=len(starts))[:len(starts)]
+
+
+def flow_series(created:np.ndarray, closed:np.ndarray, reopened:np.ndarray=None,
+                period:str=_DEFAULT_PERIOD) -> pd.DataFrame:
+    """
+    Returns one row per period (indexed by its start) with the number of
+    issues opened, reopened and closed in it, the net change and the
+    backlog of open issues at its end. closed and reopened hold every
+    close and reopen of every issue, so an issue that was closed twice
+    leaves the backlog twice and re-enters it once.
+    """
+    created = np.asarray(created, dtype='datetime64[ns]')
+    closed = np.asarray(closed, dtype='datetime64[ns]')
+    reopened = np.asarray(reopened if reopened is not None else [], dtype='datetime64[ns]')
+    created, closed, reopened = (d[~np.isnat(d)] for d in (created, closed, reopened))
+
+    columns = ['opened', 'reopened', 'closed', 'net', 'backlog']
+    if not len(created):
+        return pd.DataFrame(columns=columns, dtype=np.int64)
+
+    code, frequency = _PERIODS[period]
+    last = max(d.max() for d in (created, closed, reopened) if len(d))
+    first = pd.Timestamp(created.min()).to_period(code).start_time
+    starts = pd.date_range(first, pd.Timestamp(last), freq=frequency).to_numpy(dtype='datetime64[ns]')
+
+    opened_counts = _bin(created, starts)
+    reopened_counts = _bin(reopened, starts)
+    closed_counts = _bin(closed, starts)
+    net = opened_counts + reopened_counts - closed_counts
+    return pd.DataFrame({
+        'opened': opened_counts,
+        'reopened': reopened_counts,
+        'closed': closed_counts,
+        'net': net,
+        'backlog': np.cumsum(net),
+    }, index=pd.DatetimeIndex(starts, name='period_start'), columns=columns)
+
+
+def age_distribution(created:np.ndarray, as_of:np.datetime64) -> pd.Series:
+    """
+    Number of open issues per age bucket, given their creation dates.
+    """
+    created = np.asarray(created, dtype='datetime64[ns]')
+    created = created[~np.isnat(created)]
+    ages = (np.datetime64(as_of, 'ns') - created) / np.timedelta64(1, 'D')
+    counts, _ = np.histogram(np.maximum(ages, 0), bins=_AGE_EDGES)
+    return pd.Series(counts, index=_AGE_LABELS, name='open_issues')
+
+
+class FlowAnalysis:
+    """
+    Reports the inflow and outflow of issues per period, the resulting
+    backlog and the age distribution of the open issues.
+    """
+
+    def __init__(self):
+        """
+        Constructor
+        """
+        # Parameter is passed in via command line (--period)
+        period = config.get_parameter('period')
+        self.period:str = period if period in _PERIODS else _DEFAULT_PERIOD
+
+    def compute(self, timelines:TimelineIndex):
+        """
+        Returns the flow series and the age distribution of the open issues
+        as of the latest date in the data.
+        """
+        frame = timelines.frame
+        created = frame['created_date'].to_numpy(dtype='datetime64[ns]')
+        closed = _datetimes(d for t in timelines.timelines for d in t.close_dates)
+        reopened = _datetimes(d for t in timelines.timelines for d in t.reopen_dates)
+        flow = flow_series(created, closed, reopened, self.period)
+
+        is_open = np.fromiter((t.is_open for t in timelines.timelines), dtype=bool, count=len(timelines))
+        dates = np.concatenate([created, closed, reopened])
+        dates = dates[~np.isnat(dates)]
+        ages = age_distribution(created[is_open], dates.max()) if len(dates) else None
+        return flow, ages
+
+    def _print_analysis(self, flow:pd.DataFrame, ages:pd.Series):
+        print("\n\n")
+        print(f"Issue flow per {self.period} (last {min(_RECENT_PERIODS, len(flow))} of {len(flow)}):")
+        print(flow.tail(_RECENT_PERIODS).to_string() if len(flow) else "  No issues")
+        if len(flow):
+            print(f"\nOpened: {flow['opened'].sum()}, reopened: {flow['reopened'].sum()}, "
+                  f"closed: {flow['closed'].sum()}, open at the end: {flow['backlog'].iloc[-1]}")
+            print(f"Mean per {self.period}: {flow['opened'].mean():.1f} opened, "
+                  f"{flow['closed'].mean():.1f} closed")
+        if ages is not None:
+            print("\nAge of open issues:")
+            for bucket, count in ages.items():
+                print(f"  {bucket}: {count}")
+        print("\n\n")
+
+    def _plot_analysis(self, flow:pd.DataFrame, ages:pd.Series):
+        # The figure is only rendered again if the plotted data or style changed
+        key = figure_key(self.period, flow.to_dict('list'), [str(d) for d in flow.index],
+                         ages.to_dict() if ages is not None else None, _FIGURE_STYLE)
+        if FigureCache(OUTPUT_PNG).render(key, lambda: self._render(flow, ages)):
+            print(f"\nSaved figure to: {OUTPUT_PNG.resolve()}")
+        else:
+            show_image(OUTPUT_PNG)
+        plt.show()
+
+    def _render(self, flow:pd.DataFrame, ages:pd.Series):
+        fig, axes = plt.subplots(1, 3, figsize=_FIGURE_STYLE['figsize'])
+
+        # Left: inflow vs outflow per period
+        axes[0].plot(flow.index, flow['opened'] + flow['reopened'], label="Opened / reopened")
+        axes[0].plot(flow.index, flow['closed'], label="Closed")
+        axes[0].set_ylabel(f"Issues per {self.period}")
+        axes[0].set_title("Issue Inflow vs Outflow")
+        axes[0].legend()
+
+        # Middle: backlog at the end of each period
+        axes[1].fill_between(flow.index, flow['backlog'], step='post', alpha=0.5)
+        axes[1].set_ylabel("Open issues")
+        axes[1].set_title("Open Issue Backlog")
+
+        # Right: age of the open issues
+        if ages is not None:
+            y = np.arange(len(ages))
+            axes[2].barh(y, ages.values)
+            axes[2].set_yticks(y, labels=list(ages.index))
+            axes[2].set_xlabel("Open issues")
+        axes[2].set_title("Age of Open Issues")
+        fig.autofmt_xdate()
+
+        plt.tight_layout()
+        OUTPUT_PNG.parent.mkdir(parents=True, exist_ok=True)
+        plt.savefig(OUTPUT_PNG, dpi=_FIGURE_STYLE['dpi'])
+
+    def run(self):
+        """
+        Starting point for this analysis.
+        """
+        flow, ages = self.compute(DataLoader().get_timelines())
+        self._print_analysis(flow, ages)
+        if len(flow):
+            self._plot_analysis(flow, ages)
+
+
+if __name__ == '__main__':
+    # Invoke run method when running this module directly
+    FlowAnalysis().run()
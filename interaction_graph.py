@@ -0,0 +1,154 @@
+"""
+Sparse bipartite user x issue interaction matrix built from who created,
+was assigned to and authored events on each issue. Projecting it onto the
+users with a sparse product gives how many issues every pair of users
+shared, and degree and PageRank centrality are computed on that
+projection with sparse matrix-vector products, so no dense user x user
+matrix is ever built.
+"""
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from model import Issue
+
+_DAMPING = 0.85
+_MAX_ITERATIONS = 100
+# PageRank stops once the scores change by less than this (L1 norm)
+_TOLERANCE = 1e-10
+
+
+class InteractionGraph:
+    """
+    Incidence matrix with one row per user and one column per issue; an
+    entry is the number of times the user interacted with the issue
+    (creating it, being assigned to it, authoring one of its events).
+    """
+
+    def __init__(self, incidence:sparse.csr_matrix, users:List[str]):
+        self.incidence:sparse.csr_matrix = incidence
+        self.users:List[str] = users
+        self._collaboration:sparse.csr_matrix = None
+
+    @classmethod
+    def from_issues(cls, issues:List[Issue]):
+        """
+        Builds the matrix in one pass over the issues and their events.
+        """
+        codes:Dict[str, int] = {}
+        rows = []
+        cols = []
+        for col, issue in enumerate(issues):
+            users = [issue.creator, *(issue.assignees or []), *(event.author for event in issue.events)]
+            for user in users:
+                if not user:
+                    continue
+                row = codes.get(user)
+                if row is None:
+                    row = codes[user] = len(codes)
+                rows.append(row)
+                cols.append(col)
+        incidence = sparse.csr_matrix((np.ones(len(rows), dtype=np.int32), (rows, cols)),
+                                      shape=(len(codes), len(issues)))
+        # Constructing sums repeated (user, issue) entries into interaction counts
+        incidence.sum_duplicates()
+        return cls(incidence, list(codes))
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.incidence.shape
+
+    def collaboration(self) -> sparse.csr_matrix:
+        """
+        User x user matrix whose entry (u, v) is the number of issues both
+        users interacted with; the diagonal is zero.
+        """
+        if self._collaboration is None:
+            touched = self.incidence.copy()
+            touched.data[:] = 1
+            shared = (touched @ touched.T).tocsr()
+            shared.setdiag(0)
+            shared.eliminate_zeros()
+            self._collaboration = shared
+        return self._collaboration
+
+    def issue_counts(self) -> np.ndarray:
+        """
+        Number of distinct issues every user interacted with.
+        """
+        return np.diff(self.incidence.indptr)
+
+    def degree(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the number of distinct collaborators of every user and the
+        number of issues shared with them in total.
+        """
+        shared = self.collaboration()
+        return np.diff(shared.indptr), np.asarray(shared.sum(axis=1)).ravel()
+
+    def pagerank(self, damping:float=_DAMPING, max_iterations:int=_MAX_ITERATIONS,
+                 tolerance:float=_TOLERANCE) -> np.ndarray:
+        """
+        PageRank of every user on the collaboration graph, with edges
+        weighted by the number of shared issues. Users without
+        collaborators spread their score evenly over all users. The scores
+        sum to 1.
+        """
+        n = self.shape[0]
+        if n == 0:
+            return np.zeros(0)
+        shared = self.collaboration().astype(np.float64)
+        strength = np.asarray(shared.sum(axis=1)).ravel()
+        dangling = strength == 0
+        inverse = np.divide(1.0, strength, out=np.zeros_like(strength), where=~dangling)
+        # Row-stochastic transition matrix, transposed once for the iteration
+        transition = (sparse.diags(inverse) @ shared).T.tocsr()
+
+        scores = np.full(n, 1.0 / n)
+        for _ in range(max_iterations):
+            updated = damping * (transition @ scores + scores[dangling].sum() / n) + (1 - damping) / n
+            change = np.abs(updated - scores).sum()
+            scores = updated
+            if change < tolerance:
+                break
+        return scores
+
+    def centrality(self, n:int=None) -> pd.DataFrame:
+        """
+        One row per user with the number of issues they interacted with,
+        their collaborators, the issues shared with them and their PageRank,
+        highest PageRank first. With n, only the n most central users.
+        """
+        columns = ['user', 'issues', 'collaborators', 'shared_issues', 'pagerank']
+        scores = self.pagerank()
+        selected = np.arange(len(scores))
+        if n is not None and n < len(scores):
+            if n <= 0:
+                return pd.DataFrame(columns=columns)
+            selected = np.argpartition(-scores, n - 1)[:n]
+        collaborators, shared = self.degree()
+        frame = pd.DataFrame({
+            'user': [self.users[i] for i in selected],
+            'issues': self.issue_counts()[selected],
+            'collaborators': collaborators[selected],
+            'shared_issues': shared[selected].astype(np.int64),
+            'pagerank': scores[selected],
+        }, columns=columns)
+        return frame.sort_values(['pagerank', 'user'], ascending=[False, True], kind='stable').reset_index(drop=True)
+
+    def collaborators_of(self, user:str, n:int) -> List[Tuple[str, int]]:
+        """
+        The n users the user shared the most issues with, with the number
+        of shared issues.
+        """
+        try:
+            row = self.users.index(user)
+        except ValueError:
+            return []
+        shared = self.collaboration()
+        start, end = shared.indptr[row], shared.indptr[row + 1]
+        pairs = [(self.users[col], int(count)) for col, count in zip(shared.indices[start:end], shared.data[start:end])]
+        return sorted(pairs, key=lambda kv: (-kv[1], kv[0]))[:n]
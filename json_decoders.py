@@ -0,0 +1,54 @@
+"""
+Selects the function used to decode the issues JSON. Third-party decoders
+are considerably faster than the standard library on large exports, so
+they are used when installed. The decoder can be chosen with the config
+parameter ENPM611_PROJECT_JSON_DECODER ("auto", "orjson", "ujson",
+"simdjson" or "json"); "auto" picks the fastest one that is installed.
+"""
+
+import logging
+logger = logging.getLogger(__name__)
+
+import importlib
+import json
+from typing import Callable, Dict, List, Tuple
+
+# Fastest first; "auto" uses the first one that can be imported
+_PREFERENCE:List[str] = ['orjson', 'simdjson', 'ujson', 'json']
+
+
+def _load(name:str) -> Callable:
+    if name == 'json':
+        return json.loads
+    # All supported libraries expose a json-compatible loads()
+    return importlib.import_module(name).loads
+
+
+def available_decoders() -> Dict[str, Callable]:
+    """
+    Returns the installed decoders by name, fastest first.
+    """
+    decoders = {}
+    for name in _PREFERENCE:
+        try:
+            decoders[name] = _load(name)
+        except ImportError:
+            pass
+    return decoders
+
+
+def get_decoder(name:str='auto') -> Tuple[str, Callable]:
+    """
+    Returns (name, loads) of the requested decoder. If it is unknown or not
+    installed, the fastest installed one is used instead.
+    """
+    name = str(name or 'auto').lower()
+    if name not in _PREFERENCE and name != 'auto':
+        logger.warning(f'Unknown JSON decoder "{name}", expected one of {["auto"] + _PREFERENCE}')
+    elif name != 'auto':
+        try:
+            return name, _load(name)
+        except ImportError:
+            logger.warning(f'JSON decoder "{name}" is not installed, falling back to the fastest available one')
+
+    return next(iter(available_decoders().items()))
@@ -6,7 +6,20 @@ import config
 import os
 import sys
 import re
+import time
 import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from trigram_index import TrigramIndex, issue_text, required_literals
+from text_index import PreparedText
+
+# Above this many matching issues the chart shows summaries instead of one bar per issue
+_MAX_BARS = 30
+_TOP_K_ISSUES = 20
+_HISTOGRAM_BINS = 30
+# Matches over time are binned by year instead of month beyond this many months
+_MAX_TIME_BINS = 120
 
 
 class KeywordAnalysis:
@@ -23,7 +36,17 @@ class KeywordAnalysis:
             print("Usage: python run.py --feature 1 --keyword <word or phrase>")
             sys.exit(1)
 
-        self.keyword_pattern = re.compile(re.escape(self.KEYWORD.strip()), re.IGNORECASE)
+        # With --regex the keyword is used as a regular expression
+        self.REGEX: bool = config.get_parameter("regex") is True
+        pattern = self.KEYWORD.strip() if self.REGEX else re.escape(self.KEYWORD.strip())
+        try:
+            self.keyword_pattern = re.compile(pattern, re.IGNORECASE)
+        except re.error as e:
+            print(f"Error: '{self.KEYWORD}' is not a valid regular expression ({e}).")
+            sys.exit(1)
+
+        # With --comments the comments of all events are searched as well
+        self.COMMENTS: bool = config.get_parameter("comments") is True
 
     def _is_noise(self, line: str) -> bool:
         """Determines if a line looks like code, logs, or trace output."""
@@ -36,42 +59,125 @@ class KeywordAnalysis:
 
     def _find_sentences_with_keyword(self, text: str):
         """Finds meaningful sentences containing the keyword."""
-        text = re.sub(r"```.*?```", "", text, flags=re.DOTALL)
-        text = re.sub(r"\s{2,}", " ", text.strip())
-        sentences = re.split(r"(?<=[.!?;:])\s+|\n+", text)
-
-        matches = []
-        for s in sentences:
-            s = s.strip()
-            if not s:
-                continue
-            if self.keyword_pattern.search(s):  # Always keep lines with keyword
-                if len(s) > 250:
-                    s = s[:250] + "..."
-                matches.append(s)
-            elif not self.keyword_pattern.search(s) and self._is_noise(s):
-                continue
-        return matches
+        prepared = PreparedText(text)
+        if not self.REGEX and not prepared.contains(self.KEYWORD.strip()):
+            # Cheap literal check on the lowercase copy before running the regex
+            return []
+        return prepared.sentences_matching(self.keyword_pattern)
+
+    def _candidate_issues(self):
+        """
+        Returns the issues that may contain the keyword and the total number
+        of issues. A trigram index (saved next to the data file) or the
+        SQLite full-text index rules out issues that lack the literal text
+        the keyword requires, so the regex only runs on the remaining
+        candidates. Without a data file to save the index to, all issues
+        are scanned.
+        """
+        loader = DataLoader()
+        if loader.storage == "sqlite":
+            store = loader.get_store()
+            total_issues = store.count_issues()
+            required = required_literals(self.keyword_pattern.pattern)
+            if required is not None and len(required) == 1:
+                # Let the full-text index find the issues containing the longest literal
+                return store.search(max(required[0], key=len)), total_issues
+            return store.get_issues(), total_issues
+
+        issues: List[Issue] = loader.get_issues()
+        index = TrigramIndex.for_issues(issues, loader.data_path)
+        positions = index.candidates(self.keyword_pattern.pattern) if index is not None else None
+        if positions is None:
+            return issues, len(issues)
+        return [issues[p] for p in positions], len(issues)
+
+    def _snippet(self, text: str) -> str:
+        """Returns the text around the first match of the keyword."""
+        snippet_index = self.keyword_pattern.search(text).start()
+        snippet_start = max(0, snippet_index - 80)
+        snippet_end = min(len(text), snippet_index + 80)
+        return text[snippet_start:snippet_end].strip()
+
+    def _iter_comments(self, loader):
+        """
+        Yields (issue number, issue title, author, date, comment) for every
+        event comment. With the SQLite backend the comments are streamed from
+        the database; otherwise they are read from the already loaded issues.
+        """
+        if loader.storage == "sqlite":
+            yield from loader.get_store().iter_comments()
+            return
+        for issue in loader.get_issues():
+            for event in issue.events:
+                comment = event.comment
+                if comment:
+                    yield (issue.number, issue.title, event.author, event.event_date, comment)
+
+    def _search_comments(self, loader):
+        """
+        Searches all event comments for the keyword. Returns the matches with
+        their author and date, the number of bytes (UTF-8) scanned and the
+        time it took. Only the matching snippets are kept.
+        """
+        results = []
+        scanned = 0
+        start = time.perf_counter()
+        for number, title, author, date, comment in self._iter_comments(loader):
+            scanned += len(comment.encode("utf-8"))
+            count = sum(1 for _ in self.keyword_pattern.finditer(comment))
+            if count:
+                sentences = self._find_sentences_with_keyword(comment) or [self._snippet(comment)]
+                results.append({
+                    "number": number,
+                    "title": title,
+                    "author": author,
+                    "date": date,
+                    "count": count,
+                    "sentences": sentences
+                })
+        return results, scanned, time.perf_counter() - start
+
+    def _report_comments(self, loader):
+        """Prints and saves the keyword matches found in event comments."""
+        results, scanned, elapsed = self._search_comments(loader)
+        megabytes = scanned / (1024 * 1024)
+        print(f"\nScanned {megabytes:.1f} MB of comments in {elapsed:.2f}s "
+              f"({megabytes / max(elapsed, 1e-9):.1f} MB/s).")
+        if not results:
+            print(f"No comments found containing '{self.KEYWORD}'.\n")
+            return
+
+        print(f"Found {len(results)} comment(s) containing '{self.KEYWORD}':\n")
+        out_path = "keyword_comment_results.txt"
+        with open(out_path, "w", encoding="utf-8") as f:
+            for r in results:
+                header = f"#{r['number']} {r['title']} (comment by {r['author']} on {r['date']})"
+                print(f"• {header}")
+                f.write(f"{header}\n")
+                for s in r["sentences"]:
+                    print(f"   → {s}")
+                    f.write(f"   → {s}\n")
+                print(f"   [Matches in this comment: {r['count']}]\n")
+                f.write(f"   [Matches in this comment: {r['count']}]\n\n")
+        print(f"Comment results saved to '{os.path.abspath(out_path)}'")
 
     def run(self):
         """Executes the keyword analysis."""
-        issues: List[Issue] = DataLoader().get_issues()
+        issues, total_issues = self._candidate_issues()
+        loader = DataLoader()
         results = []
         total_matches = 0
 
         for issue in issues:
-            text = (issue.title or "") + ". " + (issue.text or "")
+            text = issue_text(issue)
             all_matches = self.keyword_pattern.findall(text)
 
             if all_matches:
+                # Only the texts of matching issues are cleaned and split into sentences
                 sentences = self._find_sentences_with_keyword(text)
                 if not sentences:
                     # fallback: at least show a snippet around the keyword
-                    snippet_index = text.lower().find(self.KEYWORD.lower())
-                    snippet_start = max(0, snippet_index - 80)
-                    snippet_end = min(len(text), snippet_index + 80)
-                    snippet = text[snippet_start:snippet_end].strip()
-                    sentences = [snippet]
+                    sentences = [self._snippet(text)]
                 total_matches += len(all_matches)
                 results.append({
                     "issue": issue,
@@ -79,8 +185,12 @@ class KeywordAnalysis:
                     "sentences": sentences
                 })
 
-        print(f"\nLoaded {len(issues)} issues from the dataset.")
-        print(f"\nSearching for keyword: '{self.KEYWORD}' (case-insensitive)")
+        print(f"\nLoaded {total_issues} issues from the dataset.")
+        kind = "pattern" if self.REGEX else "keyword"
+        print(f"\nSearching for {kind}: '{self.KEYWORD}' (case-insensitive)")
+
+        if self.COMMENTS:
+            self._report_comments(loader)
 
         if not results:
             print("\nNo issues found that match the given keyword.")
@@ -109,10 +219,51 @@ class KeywordAnalysis:
 
         # Visualization only if results exist
         if results:
-            titles = [
-                r["issue"].title[:60] + ("..." if len(r["issue"].title) > 60 else "")
-                for r in results
-            ]
+            self._plot_results(results)
+
+    @staticmethod
+    def _short_title(issue:Issue) -> str:
+        title = issue.title or ""
+        return title[:60] + ("..." if len(title) > 60 else "")
+
+    def _aggregate(self, results) -> dict:
+        """
+        Summarizes the matches of many issues for plotting: the top issues by
+        number of matches, a histogram of the number of matches per issue
+        and the matches per month (or per year for long periods) the issues
+        were created in. All binning is vectorized, so the size of the
+        summary does not depend on the number of results.
+        """
+        counts = np.array([r["count"] for r in results], dtype=np.int64)
+
+        k = min(_TOP_K_ISSUES, len(counts))
+        top = np.argpartition(-counts, k - 1)[:k]
+        top = top[np.argsort(-counts[top], kind="stable")]
+
+        bins = min(_HISTOGRAM_BINS, int(counts.max() - counts.min()) + 1)
+        frequencies, edges = np.histogram(counts, bins=bins)
+
+        created = pd.to_datetime([r["issue"].created_date for r in results], utc=True, errors="coerce")
+        known = ~created.isna()
+        dates = created[known].tz_localize(None).to_numpy(dtype="datetime64[ns]")
+        unit = "M"
+        if len(dates) and (dates.max().astype("datetime64[M]") - dates.min().astype("datetime64[M]")).astype(int) >= _MAX_TIME_BINS:
+            unit = "Y"
+        periods, inverse = np.unique(dates.astype(f"datetime64[{unit}]"), return_inverse=True)
+        per_period = np.bincount(inverse.ravel(), weights=counts[np.asarray(known)], minlength=len(periods))
+
+        return {
+            "top_titles": [self._short_title(results[i]["issue"]) for i in top],
+            "top_counts": counts[top].tolist(),
+            "histogram": (frequencies, edges),
+            "periods": periods,
+            "period_unit": unit,
+            "matches_per_period": per_period.astype(np.int64),
+        }
+
+    def _plot_results(self, results):
+        if len(results) <= _MAX_BARS:
+            titles = [self._short_title(r["issue"]) for r in results]
             counts = [r["count"] for r in results]
 
             plt.figure(figsize=(10, 6))
@@ -122,7 +273,34 @@ class KeywordAnalysis:
             plt.title(f"Occurrences of '{self.KEYWORD}' in matched issues")
             plt.tight_layout()
             plt.show()
+            return
+
+        # Too many issues for one bar each, plot summaries of bounded size instead
+        summary = self._aggregate(results)
+        fig, axes = plt.subplots(1, 3, figsize=(18, 6))
+
+        y = np.arange(len(summary["top_titles"]))
+        axes[0].barh(y, summary["top_counts"])
+        axes[0].set_yticks(y, labels=summary["top_titles"])
+        axes[0].invert_yaxis()
+        axes[0].set_xlabel("Number of keyword matches")
+        axes[0].set_title(f"Top {len(y)} of {len(results)} issues matching '{self.KEYWORD}'")
+
+        frequencies, edges = summary["histogram"]
+        axes[1].stairs(frequencies, edges, fill=True)
+        axes[1].set_xlabel("Matches per issue")
+        axes[1].set_ylabel("Number of issues")
+        axes[1].set_title("Distribution of matches per issue")
+
+        unit = "month" if summary["period_unit"] == "M" else "year"
+        axes[2].plot(summary["periods"], summary["matches_per_period"], marker="o")
+        axes[2].set_xlabel(f"Issue creation {unit}")
+        axes[2].set_ylabel("Number of keyword matches")
+        axes[2].set_title(f"Matches per {unit} of issue creation")
+        fig.autofmt_xdate()
 
+        plt.tight_layout()
+        plt.show()
 
 if __name__ == "__main__":
     KeywordAnalysis().run()
\ No newline at end of file
@@ -1,65 +1,190 @@
 import json
-from collections import Counter, defaultdict
-from datetime import datetime
 import matplotlib.pyplot as plt
 import matplotlib.ticker as ticker
+import numpy as np
+import pandas as pd
+
+import data_stream
+from label_matrix import LabelMatrix
+from model import LABELS
+from sampling import describe, draw, sample_parameters
+from timeline import IssueTimeline
+from topn import top_n
+
+# Quantiles reported for resolution times, as (column name, quantile)
+_PERCENTILES = [('median', 0.5), ('p90', 0.9), ('p99', 0.99)]
+_TOP_K_PAIRS = 10
 
 class LabelAnalysis:
     def __init__(self, data_path='data/poetry_issues_all.json'):
         self.data_path = data_path
         self.issues = []
+        # Label codes of self.issues, as (issues, codes)
+        self._codes = None
+        # Optional preview on a sample (--sample, --stratify, --seed)
+        self.sample_size, self.sample_key, self.seed = sample_parameters()
+        self.sample = None
 
     def load_data(self):
+        if self.sample_size is not None:
+            # Stream the file once and keep only the sampled records
+            compression = data_stream.detect_compression(self.data_path)
+            with data_stream.open_text(self.data_path, compression) as f:
+                self.sample = draw(data_stream.iter_json_array(f), self.sample_size, self.sample_key, self.seed)
+            self.issues = self.sample.items
+            return
         with open(self.data_path, 'r', encoding='utf-8') as f:
             self.issues = json.load(f)
 
-    def parse_date(self, date_str):
-        try:
-            return datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-        except Exception:
-            return None
+    def _label_codes(self):
+        """
+        Encodes the labels of every issue (names or label objects) with the
+        shared vocabulary once per loaded list of issues.
+        """
+        if self._codes is None or self._codes[0] is not self.issues:
+            self._codes = (self.issues, [LABELS.encode(issue.get('labels', [])) for issue in self.issues])
+        return self._codes[1]
+
+    def _close_date(self, issue):
+        """
+        Returns when the issue was closed according to its events. Issues
+        without events fall back to updated_date as an approximation.
+        """
+        if issue.get('events'):
+            closed = IssueTimeline.from_json(issue).closed_date
+            if closed is not None:
+                return closed.isoformat()
+        return issue.get('updated_date')
+
+    def _close_dates(self, closed):
+        """
+        Returns the close date of every closed issue (None for the others),
+        replaying the events of each record once.
+        """
+        if not any(issue.get('events') for issue in self.issues):
+            # Nothing to replay, issues without events are closed at their last update
+            return [issue.get('updated_date') if c else None for issue, c in zip(self.issues, closed)]
+        return [self._close_date(issue) if c else None for issue, c in zip(self.issues, closed)]
+
+    def _issue_resolution(self):
+        """
+        Returns one row per issue (in the order of self.issues) with its
+        creation date and resolution time in months, which is NaN for issues
+        that are not closed or lack a valid date. Dates are parsed in a
+        single vectorized call instead of once per issue.
+        """
+        closed = [issue.get('state') == 'closed' for issue in self.issues]
+        df = pd.DataFrame({
+            'created': pd.to_datetime([i.get('created_date') for i in self.issues],
+                                      utc=True, errors='coerce', format='ISO8601'),
+            'closed': pd.to_datetime(self._close_dates(closed), utc=True, errors='coerce', format='ISO8601'),
+        })
+        df['months'] = (df['closed'] - df['created']).dt.total_seconds() / (24 * 3600) / 30.44
+        return df[['created', 'months']]
+
+    def _resolution_frame(self, per_issue=None):
+        """
+        Builds one row per (closed issue, label) with the month the issue was
+        created in and its resolution time in months. A frame from
+        _issue_resolution can be passed in to avoid rebuilding it.
+        """
+        df = self._issue_resolution() if per_issue is None else per_issue
+        df = df.dropna(subset=['months']).copy()
+        codes = self._label_codes()
+        df['label'] = [[LABELS.names[c] for c in codes[i]] or [None] for i in df.index]
+        df['month'] = df['created'].dt.strftime('%Y-%m')
+        return df.explode('label')[['label', 'month', 'months']]
+
+    def label_matrix(self):
+        """
+        Returns the sparse issue x label incidence matrix of self.issues.
+        """
+        return LabelMatrix.from_codes(self._label_codes(), LABELS)
+
+    def _print_label_pairs(self, per_issue, matrix=None):
+        matrix = self.label_matrix() if matrix is None else matrix
+        pairs = matrix.top_pairs(_TOP_K_PAIRS, months=per_issue['months'].to_numpy())
+        if pairs.empty:
+            return
+        scope = ' within the sample' if self.sample is not None else ''
+        print(f'\nTop {_TOP_K_PAIRS} label pairs{scope} (issues carrying both, P(b|a), P(a|b), mean resolution months):')
+        print(pairs.round(2).to_string(index=False))
+
+    def resolution_percentiles(self, by='label', resolution=None):
+        """
+        Returns the median, p90 and p99 resolution time (in months) of closed
+        issues grouped by label (by='label') or by month of creation
+        (by='month'), together with the number of issues in each group.
+        A frame from _resolution_frame can be passed in to avoid rebuilding it.
+        """
+        df = self._resolution_frame() if resolution is None else resolution
+        if by == 'month':
+            # Issues carrying several labels must only be counted once per month
+            df = df.loc[~df.index.duplicated()]
+        columns = [name for name, _ in _PERCENTILES] + ['count']
+        if df.empty:
+            return pd.DataFrame(columns=columns)
+
+        grouped = df.groupby(by)['months']
+        result = grouped.quantile([q for _, q in _PERCENTILES]).unstack()
+        result.columns = [name for name, _ in _PERCENTILES]
+        result['count'] = grouped.size()
+        return result[columns]
+
+    def _print_percentiles(self, top_labels, resolution):
+        percentiles = self.resolution_percentiles(by='label', resolution=resolution)
+        percentiles = percentiles.loc[[l for l in top_labels if l in percentiles.index]]
+        if percentiles.empty:
+            return
+        scope = ' within the sample' if self.sample is not None else ''
+        print(f'\nResolution time percentiles (months) per label{scope} (closed issues only):')
+        print(percentiles.round(2).to_string())
+
+    def _estimate_labels(self, matrix, per_issue, top_labels):
+        """
+        Estimates the issues per label and the mean resolution time of the
+        top labels in the full dataset from the sample, prints them with
+        their confidence intervals and returns the mean resolution times.
+        """
+        months = per_issue['months'].to_numpy()
+        rows = []
+        for label in top_labels:
+            has_label = matrix.incidence[:, LABELS.code(label)].toarray().ravel() > 0
+            count = self.sample.estimate_total(has_label)
+            mean = self.sample.estimate_mean(np.where(has_label, months, np.nan))
+            rows.append((label, count, mean))
+
+        print('\n' + describe(self.sample))
+        print('Estimated issues and mean resolution time (months) per label:')
+        for label, count, mean in rows:
+            print(f'  {label}: {count} issues, {mean} months')
+        return {label: mean.value for label, _, mean in rows if not np.isnan(mean.value)}
 
     def run(self):
         self.load_data()
 
-        # Label frequency calculation
-        label_count = Counter()
-        for issue in self.issues:
-            labels = issue.get('labels', [])
-            for label in labels:
-                label_name = label if isinstance(label, str) else label.get('name', '')
-                if label_name:
-                    label_count[label_name] += 1
+        # Label frequency calculation (number of issues carrying each label)
+        matrix = self.label_matrix()
+        if self.sample is not None:
+            # Every sampled issue stands for weight issues of the full dataset
+            estimated = matrix.incidence.T @ self.sample.weights
+            label_count = {LABELS.names[c]: round(v) for c, v in enumerate(estimated) if v > 0}
+        else:
+            label_count = matrix.label_counts().to_dict()
 
-        top_labels = [l for l, _ in label_count.most_common(15)]
+        top_labels = [l for l, _ in top_n(label_count, 15)]
         top_label_counts = [label_count[l] for l in top_labels]
 
         # Average resolution time computation (closed issues only, in months)
-        label_resolution_sum = defaultdict(float)
-        label_resolution_count = defaultdict(int)
-
-        for issue in self.issues:
-            if issue.get('state') != 'closed':
-                continue
-
-            created = self.parse_date(issue.get('created_date'))
-            updated = self.parse_date(issue.get('updated_date'))
-            if not created or not updated:
-                continue
-
-            resolution_days = (updated - created).total_seconds() / (24 * 3600)
-            resolution_months = resolution_days / 30.44
-
-            for label in issue.get('labels', []):
-                label_resolution_sum[label] += resolution_months
-                label_resolution_count[label] += 1
-
-        avg_resolution_time = {
-            label: label_resolution_sum[label] / label_resolution_count[label]
-            for label in label_resolution_sum
-        }
+        per_issue = self._issue_resolution()
+        resolution = self._resolution_frame(per_issue)
+        avg_resolution_time = resolution.groupby('label')['months'].mean().to_dict()
+        if self.sample is not None:
+            avg_resolution_time = self._estimate_labels(matrix, per_issue, top_labels)
 
         avg_times_top_labels = [avg_resolution_time.get(label, 0) for label in top_labels]
+        self._print_percentiles(top_labels, resolution)
+        self._print_label_pairs(per_issue, matrix)
 
         # Plotting
         fig, axs = plt.subplots(1, 2, figsize=(16, 6))
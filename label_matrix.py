@@ -0,0 +1,149 @@
+"""
+Sparse issue x label incidence matrix over the integer label codes of a
+LabelVocabulary. Which labels appear together, how often one label
+implies another and how long issues carrying both take to resolve are
+all computed with sparse matrix products instead of loops over label
+pairs.
+"""
+
+from typing import Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from model import Issue, LabelVocabulary, LABELS
+
+
+class LabelMatrix:
+    """
+    Incidence matrix with one row per issue and one column per label; an
+    entry is 1 if the issue carries the label (repeated labels count once).
+    """
+
+    def __init__(self, incidence:sparse.csr_matrix, vocabulary:LabelVocabulary):
+        self.incidence:sparse.csr_matrix = incidence
+        self.vocabulary:LabelVocabulary = vocabulary
+        self._cooccurrence:sparse.csr_matrix = None
+
+    @classmethod
+    def from_codes(cls, code_lists:Iterable[Iterable[int]], vocabulary:LabelVocabulary):
+        """
+        Builds the matrix from the label codes of every issue.
+        """
+        rows = []
+        cols = []
+        n = 0
+        for row, codes in enumerate(code_lists):
+            n = row + 1
+            rows.extend([row] * len(codes))
+            cols.extend(codes)
+        incidence = sparse.csr_matrix((np.ones(len(rows), dtype=np.int32), (rows, cols)),
+                                      shape=(n, len(vocabulary)))
+        # Constructing sums repeated (issue, label) entries, clip them back to 1
+        incidence.sum_duplicates()
+        incidence.data[:] = 1
+        return cls(incidence, vocabulary)
+
+    @classmethod
+    def build(cls, label_lists:Iterable[Iterable[any]], vocabulary:LabelVocabulary=None):
+        """
+        Builds the matrix from the labels (names or label objects) of every
+        issue, encoding them with a new vocabulary unless one is given.
+        """
+        vocabulary = LabelVocabulary() if vocabulary is None else vocabulary
+        return cls.from_codes([vocabulary.encode(labels) for labels in label_lists], vocabulary)
+
+    @classmethod
+    def from_issues(cls, issues:List[Issue]):
+        """
+        Builds the matrix from the label codes the issues were loaded with.
+        """
+        return cls.from_codes((issue.label_codes for issue in issues), LABELS)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.incidence.shape
+
+    def label_counts(self) -> pd.Series:
+        """
+        Number of issues carrying each label, for the labels carried by at
+        least one issue.
+        """
+        counts = np.asarray(self.incidence.sum(axis=0)).ravel()
+        present = np.flatnonzero(counts)
+        return pd.Series(counts[present], index=[self.vocabulary.names[c] for c in present], dtype=np.int64)
+
+    def cooccurrence(self) -> sparse.csr_matrix:
+        """
+        Label x label matrix whose entry (a, b) is the number of issues
+        carrying both labels; the diagonal holds the label counts.
+        """
+        if self._cooccurrence is None:
+            self._cooccurrence = (self.incidence.T @ self.incidence).tocsr()
+        return self._cooccurrence
+
+    def conditional(self) -> sparse.csr_matrix:
+        """
+        Label x label matrix whose entry (a, b) is P(b | a), the share of
+        the issues carrying label a that also carry label b.
+        """
+        counts = self.cooccurrence().diagonal().astype(np.float64)
+        inverse = np.divide(1.0, counts, out=np.zeros_like(counts), where=counts > 0)
+        return (sparse.diags(inverse) @ self.cooccurrence()).tocsr()
+
+    def pair_resolution(self, months) -> Tuple[sparse.csr_matrix, sparse.csr_matrix]:
+        """
+        Returns the total resolution time and the number of resolved issues
+        for every label pair, given the resolution time of every issue (NaN
+        for unresolved issues). Dividing the two gives the mean per pair.
+        """
+        months = np.asarray(months, dtype=np.float64)
+        resolved = ~np.isnan(months)
+        x = self.incidence[resolved]
+        totals = (x.T @ sparse.diags(months[resolved]) @ x).tocsr()
+        counts = (x.T @ x).tocsr()
+        return totals, counts
+
+    def top_pairs(self, n:int, months=None) -> pd.DataFrame:
+        """
+        Returns the n label pairs that appear together most often, with the
+        number of shared issues, both conditional probabilities and, if the
+        per-issue resolution times are given, the mean resolution time of
+        the resolved issues carrying both labels.
+        """
+        columns = ['label_a', 'label_b', 'count', 'p_b_given_a', 'p_a_given_b']
+        if months is not None:
+            columns.append('mean_months')
+        pairs = sparse.triu(self.cooccurrence(), k=1).tocoo()
+        if pairs.nnz == 0 or n <= 0:
+            return pd.DataFrame(columns=columns)
+
+        names = self.vocabulary.names
+        candidates = np.arange(pairs.nnz)
+        if pairs.nnz > n:
+            # Only pairs reaching the n-th highest count can make the cut
+            nth = np.partition(pairs.data, pairs.nnz - n)[pairs.nnz - n]
+            candidates = np.flatnonzero(pairs.data >= nth)
+        # Highest counts first, ties by label names for a stable order
+        order = sorted(candidates,
+                       key=lambda k: (-pairs.data[k], names[pairs.row[k]], names[pairs.col[k]]))[:n]
+        a = pairs.row[order]
+        b = pairs.col[order]
+        counts = pairs.data[order]
+        diagonal = self.cooccurrence().diagonal()
+
+        result = pd.DataFrame({
+            'label_a': [names[i] for i in a],
+            'label_b': [names[j] for j in b],
+            'count': counts,
+            'p_b_given_a': counts / diagonal[a],
+            'p_a_given_b': counts / diagonal[b],
+        })
+        if months is not None:
+            totals, resolved = self.pair_resolution(months)
+            resolved = np.asarray(resolved[a, b]).ravel().astype(np.float64)
+            totals = np.asarray(totals[a, b]).ravel()
+            result['mean_months'] = np.divide(totals, resolved, out=np.full_like(resolved, np.nan),
+                                              where=resolved > 0)
+        return result[columns]
@@ -0,0 +1,112 @@
+"""
+MinHash signatures and locality-sensitive hashing (LSH) for finding
+near-duplicate texts without comparing every pair.
+
+Each text is reduced to the set of its word shingles. A MinHash signature
+holds, for each of num_perm hash functions, the minimum hash over those
+shingles; the fraction of equal positions in two signatures estimates the
+Jaccard similarity of the shingle sets. LSH splits signatures into bands
+and only texts that agree on all rows of at least one band become
+candidate pairs.
+"""
+
+import re
+import zlib
+from typing import Iterable, Set, Tuple
+
+import numpy as np
+
+_WORD = re.compile(r"\w+")
+_MASK_32 = np.uint64(0xFFFFFFFF)
+_SHIFT_32 = np.uint64(32)
+# Signature value of texts without any shingle
+_EMPTY = np.uint32(0xFFFFFFFF)
+# Rows of an LSH bucket every row is paired with, see candidate_pairs()
+_BUCKET_WINDOW = 50
+
+
+def shingles(text:str, size:int=3) -> Set[str]:
+    """
+    Returns the set of word n-grams of the lowercased text. Texts with fewer
+    than size words yield a single shingle of all their words.
+    """
+    words = _WORD.findall(text.lower())
+    if len(words) < size:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+class MinHasher:
+    """
+    Computes MinHash signatures with num_perm multiply-shift hash functions
+    applied to 32-bit CRC hashes of the shingles. The same seed always
+    produces the same hash functions, so signatures can be cached.
+    """
+
+    def __init__(self, num_perm:int=128, shingle_size:int=3, seed:int=611):
+        self.num_perm:int = num_perm
+        self.shingle_size:int = shingle_size
+        self.seed:int = seed
+        rng = np.random.default_rng(seed)
+        # Odd multipliers make the multiply-shift family universal
+        self._a = rng.integers(1, 2 ** 63, size=(num_perm, 1), dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, size=(num_perm, 1), dtype=np.uint64)
+
+    def signature(self, text:str) -> np.ndarray:
+        grams = shingles(text, self.shingle_size)
+        if not grams:
+            return np.full(self.num_perm, _EMPTY, dtype=np.uint32)
+        hashes = np.fromiter((zlib.crc32(g.encode('utf-8')) for g in grams),
+                             dtype=np.uint64, count=len(grams))
+        # (a * x + b) mod 2^64, keeping the high 32 bits, for all functions at once
+        permuted = ((self._a * hashes[np.newaxis, :] + self._b) >> _SHIFT_32) & _MASK_32
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def signatures(self, texts:Iterable[str]) -> np.ndarray:
+        return np.array([self.signature(t) for t in texts], dtype=np.uint32).reshape(-1, self.num_perm)
+
+
+def estimate_similarity(a:np.ndarray, b:np.ndarray) -> float:
+    """
+    Estimated Jaccard similarity of the texts behind two signatures.
+    """
+    return float(np.mean(a == b))
+
+
+def candidate_pairs(signatures:np.ndarray, bands:int, window:int=_BUCKET_WINDOW) -> Set[Tuple[int, int]]:
+    """
+    Returns the pairs of row positions (i < j) that share all values of at
+    least one band of their signatures. Texts without shingles never pair.
+
+    Within a band bucket every row is paired with the next window rows of
+    the same bucket (in row order), so buckets of up to window + 1 rows
+    yield all their pairs, while huge buckets (e.g. of templated or bot
+    issues) yield a chain of O(size * window) pairs instead of O(size^2).
+    The pairs are generated with array operations and deduplicated once.
+    """
+    n, num_perm = signatures.shape
+    if num_perm % bands != 0:
+        raise ValueError(f'{num_perm} signature values cannot be split into {bands} bands')
+    rows = num_perm // bands
+    positions = np.flatnonzero(~np.all(signatures == _EMPTY, axis=1))
+
+    found = []
+    for band in range(bands):
+        chunk = np.ascontiguousarray(signatures[positions, band * rows:(band + 1) * rows])
+        # One opaque value per band row, so that equal bands get equal keys
+        _, keys = np.unique(chunk.view(np.dtype((np.void, chunk.shape[1] * chunk.itemsize))).ravel(),
+                            return_inverse=True)
+        order = np.argsort(keys.ravel(), kind='stable')
+        sorted_keys = keys.ravel()[order]
+        members = positions[order]
+        for offset in range(1, min(window, len(members) - 1) + 1):
+            same = sorted_keys[offset:] == sorted_keys[:-offset]
+            if not same.any():
+                break
+            found.append(members[:-offset][same] * np.int64(n) + members[offset:][same])
+
+    if not found:
+        return set()
+    codes = np.sort(np.concatenate(found))
+    codes = codes[np.concatenate(([True], codes[1:] != codes[:-1]))]
+    return set(zip((codes // n).tolist(), (codes % n).tolist()))
@@ -3,11 +3,14 @@ Implements a runtime data model that can be used to access
 the properties contained in the issues JSON.
 """
 
-from typing import List, Dict, Set, Tuple
+import threading
+from typing import List, Dict, Optional, Set, Tuple
 from enum import Enum
 from datetime import datetime
 from dateutil import parser
 
+from text_arena import resolve
+
 
 class State(str, Enum):
     """
@@ -17,6 +20,96 @@ class State(str, Enum):
     closed = 'closed'
 
 
+def label_name(label:any) -> str:
+    """
+    Labels arrive either as plain strings or as {'name': ...} objects.
+    """
+    return label if isinstance(label, str) else (label or {}).get('name', '')
+
+
+def label_namespace(name:str) -> Optional[str]:
+    """
+    The prefix up to and including the first "/" of a label name (e.g.
+    "status/" for "status/triage"), or None for labels without one.
+    """
+    slash = name.find('/')
+    return name[:slash + 1] if slash > 0 else None
+
+
+class LabelVocabulary:
+    """
+    Assigns consecutive integer codes to label names in order of first
+    appearance and groups the codes by label namespace, so labels can be
+    compared, counted and filtered by namespace as integers.
+    """
+
+    def __init__(self, names:List[str]=()):
+        self.names:List[str] = []
+        self.codes:Dict[str, int] = {}
+        self.namespaces:List[Optional[str]] = []
+        self._members:Dict[str, Set[int]] = {}
+        # Issues may be loaded on several threads at once
+        self._lock = threading.Lock()
+        for name in names:
+            self.add(name)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name:str):
+        return name in self.codes
+
+    def add(self, name:str) -> int:
+        code = self.codes.get(name)
+        if code is not None:
+            return code
+        with self._lock:
+            code = self.codes.get(name)
+            if code is None:
+                namespace = label_namespace(name)
+                code = len(self.names)
+                self.names.append(name)
+                self.namespaces.append(namespace)
+                if namespace is not None:
+                    self._members.setdefault(namespace, set()).add(code)
+                self.codes[name] = code
+        return code
+
+    def encode(self, labels:List[any]) -> List[int]:
+        """
+        Returns the codes of the labels (strings or label objects), adding
+        unknown ones. Empty names are skipped.
+        """
+        return [self.add(name) for name in map(label_name, labels) if name]
+
+    def code(self, name:str) -> Optional[int]:
+        return self.codes.get(name)
+
+    def name(self, code:int) -> str:
+        return self.names[code]
+
+    def namespace(self, code:int) -> Optional[str]:
+        return self.namespaces[code]
+
+    def suffix(self, code:int) -> str:
+        """
+        The label name without its namespace, e.g. "triage" for "status/triage".
+        """
+        namespace = self.namespaces[code]
+        return self.names[code][len(namespace):] if namespace else self.names[code]
+
+    def in_namespace(self, namespace:str) -> Set[int]:
+        """
+        Codes of all labels in the namespace. The set grows as new labels are
+        added, do not modify it.
+        """
+        return self._members.setdefault(namespace, set())
+
+
+# Vocabulary shared by all issues
+LABELS = LabelVocabulary()
+
+
 class Event:
     
     def __init__(self, jobj:any):
@@ -38,6 +131,18 @@ class Event:
             pass
         self.label = jobj.get('label')
         self.comment = jobj.get('comment')
+
+    @property
+    def comment(self) -> str:
+        return resolve(self._comment)
+
+    @comment.setter
+    def comment(self, comment:any):
+        """
+        Accepts the comment itself or a text_arena.SpilledText reference to
+        it, which is only read when the comment is accessed.
+        """
+        self._comment = comment
         
         
 class Issue:
@@ -45,7 +150,7 @@ class Issue:
     def __init__(self, jobj:any=None):
         self.url:str = None
         self.creator:str = None
-        self.labels:List[str] = []
+        self.labels = []
         self.state:State = None
         self.assignees:List[str] = []
         self.title:str = None
@@ -80,4 +185,40 @@ class Issue:
         except:
             pass
         self.timeline_url = jobj.get('timeline_url')
-        self.events = [Event(jevent) for jevent in jobj.get('events',[])]
\ No newline at end of file
+        self.events = [Event(jevent) for jevent in jobj.get('events',[])]
+
+    @property
+    def text(self) -> str:
+        return resolve(self._text)
+
+    @text.setter
+    def text(self, text:any):
+        """
+        Accepts the text itself or a text_arena.SpilledText reference to it,
+        which is only read when the text is accessed.
+        """
+        self._text = text
+
+    @property
+    def labels(self) -> List[str]:
+        return self._labels
+
+    @labels.setter
+    def labels(self, labels:List[any]):
+        """
+        Normalizes the labels to their names and encodes them once with the
+        shared vocabulary, so label_codes always matches labels.
+        """
+        self.label_codes:List[int] = LABELS.encode(labels)
+        self._labels:List[str] = [LABELS.names[code] for code in self.label_codes]
+
+    def has_label(self, name:str) -> bool:
+        code = LABELS.code(name)
+        return code is not None and code in self.label_codes
+
+    def labels_in(self, namespace:str) -> List[int]:
+        """
+        Codes of the labels of this issue in the namespace (e.g. "status/").
+        """
+        members = LABELS.in_namespace(namespace)
+        return [code for code in self.label_codes if code in members]
\ No newline at end of file
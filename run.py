@@ -9,6 +9,10 @@ import argparse
 
 import config
 from example_analysis import ExampleAnalysis
+from duplicate_analysis import DuplicateAnalysis
+from tail_analysis import TailAnalysis
+from flow_analysis import FlowAnalysis
+from collaboration_analysis import CollaborationAnalysis
 
 from keyword_analysis import KeywordAnalysis
 from label_analysis import LabelAnalysis
@@ -41,6 +45,30 @@ def parse_args():
     ap.add_argument('--keyword', '-k', type=str, required=False,
                     help='Keyword to search for within issues (case-insensitive)')
     
+    ap.add_argument('--regex', action='store_true',
+                    help='Treat --keyword as a regular expression')
+    
+    ap.add_argument('--comments', action='store_true',
+                    help='Also search the comments of all issue events for --keyword')
+    
+    ap.add_argument('--sample', type=int, required=False,
+                    help='Preview features 0, 2 and 3 on a random sample of this many issues, with estimated results')
+    
+    ap.add_argument('--stratify', choices=['state', 'label'], required=False,
+                    help='Sample up to --sample issues per state or per first label instead of uniformly')
+    
+    ap.add_argument('--seed', type=int, required=False,
+                    help='Random seed for --sample, for reproducible previews')
+    
+    ap.add_argument('--approximate', action='store_true',
+                    help='Compute the user statistics of feature 0 with fixed-size sketches in one streaming pass')
+    
+    ap.add_argument('--tail', type=str, required=False,
+                    help='JSON Lines feed of issue updates to follow with feature 5')
+    
+    ap.add_argument('--period', choices=['day', 'week', 'month'], required=False,
+                    help='Length of the periods the issue flow of feature 6 is reported in (default: week)')
+    
     return ap.parse_args()
 
 
@@ -59,5 +87,13 @@ elif args.feature == 2:
     StatusAnalysis().run()
 elif args.feature == 3:
     LabelAnalysis().run()
+elif args.feature == 4:
+    DuplicateAnalysis().run()
+elif args.feature == 5:
+    TailAnalysis().run()
+elif args.feature == 6:
+    FlowAnalysis().run()
+elif args.feature == 7:
+    CollaborationAnalysis().run()
 else:
     print('Need to specify which feature to run with --feature flag.')
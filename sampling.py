@@ -0,0 +1,236 @@
+"""
+Uniform and stratified reservoir samples drawn in a single streaming pass
+over the issues, for quick approximate previews of the analyses on large
+datasets. A Sample knows how many items each stratum held in the full
+dataset, so it can estimate population totals, counts and means together
+with normal-approximation confidence intervals.
+"""
+
+import math
+import random
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional
+
+import numpy as np
+
+import config
+from model import label_name
+
+# Two-sided 95% quantile of the standard normal distribution
+Z_95 = 1.959963984540054
+
+
+class Estimate(NamedTuple):
+    """
+    Point estimate with the bounds of its 95% confidence interval.
+    """
+    value: float
+    low: float
+    high: float
+
+    def __str__(self):
+        return f'{self.value:,.1f} (95% CI {self.low:,.1f} to {self.high:,.1f})'
+
+
+class Reservoir:
+    """
+    Uniform sample of at most size items from a stream of unknown length.
+    Uses Li's Algorithm L, which draws random numbers only for the items
+    that enter the reservoir instead of for every item seen.
+    """
+
+    def __init__(self, size:int, rng:random.Random):
+        if size < 1:
+            raise ValueError('The sample size must be at least 1')
+        self.size:int = size
+        self.items:List[Any] = []
+        self.seen:int = 0
+        self._rng:random.Random = rng
+        self._w:float = 1.0
+        self._next:int = 0
+
+    def _uniform(self) -> float:
+        # In (0, 1] so the logarithms below are defined
+        return 1.0 - self._rng.random()
+
+    def _skip(self):
+        self._w *= math.exp(math.log(self._uniform()) / self.size)
+        if self._w >= 1.0:
+            self._next = self.seen + 1
+        else:
+            self._next = self.seen + int(math.log(self._uniform()) / math.log(1.0 - self._w)) + 1
+
+    def add(self, item:Any):
+        self.seen += 1
+        if len(self.items) < self.size:
+            self.items.append(item)
+            if len(self.items) == self.size:
+                self._skip()
+        elif self.seen == self._next:
+            self.items[self._rng.randrange(self.size)] = item
+            self._skip()
+
+
+class Sample:
+    """
+    Items sampled from each stratum together with the number of items the
+    stratum held in the full dataset. Estimates weight every sampled item
+    by its stratum's population divided by its sample size.
+    """
+
+    def __init__(self, items:List[Any], stratum_of:np.ndarray, population:np.ndarray, sampled:np.ndarray):
+        self.items:List[Any] = items
+        # Stratum (position in population/sampled) of every item
+        self._stratum_of:np.ndarray = stratum_of
+        self._population:np.ndarray = population
+        self._sampled:np.ndarray = sampled
+
+    @classmethod
+    def from_reservoirs(cls, strata:Dict[Any, Reservoir]):
+        items = []
+        stratum_of = []
+        for h, reservoir in enumerate(strata.values()):
+            items.extend(reservoir.items)
+            stratum_of.extend([h] * len(reservoir.items))
+        return cls(items, np.array(stratum_of, dtype=np.int64),
+                   np.array([r.seen for r in strata.values()], dtype=np.float64),
+                   np.array([len(r.items) for r in strata.values()], dtype=np.float64))
+
+    def __len__(self):
+        return len(self.items)
+
+    @property
+    def population(self) -> int:
+        """
+        Number of items in the full dataset.
+        """
+        return int(self._population.sum())
+
+    @property
+    def weights(self) -> np.ndarray:
+        """
+        How many items of the full dataset every sampled item stands for.
+        """
+        return (self._population / np.maximum(self._sampled, 1))[self._stratum_of]
+
+    def map(self, fn:Callable[[Any], Any]):
+        """
+        Returns the same sample with fn applied to every item, e.g. to turn
+        raw records into Issue objects after sampling.
+        """
+        return Sample([fn(item) for item in self.items], self._stratum_of, self._population, self._sampled)
+
+    def _total_and_variance(self, values:np.ndarray):
+        """
+        Stratified estimate of the population total of the values and its
+        variance, computed for all strata at once.
+        """
+        strata = len(self._population)
+        sums = np.bincount(self._stratum_of, weights=values, minlength=strata)
+        squares = np.bincount(self._stratum_of, weights=values * values, minlength=strata)
+        sampled = np.maximum(self._sampled, 1)
+        total = float(np.sum(self._population * sums / sampled))
+
+        # Sample variance per stratum; strata with fewer than two items add none
+        spread = np.maximum(squares - sums * sums / sampled, 0.0) / np.maximum(self._sampled - 1, 1)
+        # Finite population correction: a stratum sampled completely has no error
+        correction = 1 - self._sampled / np.maximum(self._population, 1)
+        variance = float(np.sum(np.where(self._sampled > 1,
+                                         self._population ** 2 * correction * spread / sampled, 0.0)))
+        return total, variance
+
+    def estimate_total(self, values:Iterable[float]) -> Estimate:
+        """
+        Estimates the sum of a value over the full dataset, given the value
+        of every sampled item.
+        """
+        values = np.asarray(list(values), dtype=np.float64)
+        total, variance = self._total_and_variance(values)
+        margin = Z_95 * math.sqrt(variance)
+        return Estimate(total, total - margin, total + margin)
+
+    def estimate_count(self, predicate:Callable[[Any], bool]) -> Estimate:
+        """
+        Estimates how many items of the full dataset satisfy the predicate.
+        """
+        estimate = self.estimate_total(1.0 if predicate(item) else 0.0 for item in self.items)
+        return Estimate(estimate.value, max(estimate.low, 0.0), estimate.high)
+
+    def estimate_mean(self, values:Iterable[float]) -> Estimate:
+        """
+        Estimates the mean of a value over the items of the full dataset it
+        is defined for, given the value of every sampled item (NaN where it
+        is not defined, e.g. the resolution time of open issues). Uses the
+        ratio estimator and its linearized variance.
+        """
+        values = np.asarray(list(values), dtype=np.float64)
+        defined = ~np.isnan(values)
+        y = np.where(defined, values, 0.0)
+        x = defined.astype(np.float64)
+        y_total, _ = self._total_and_variance(y)
+        x_total, _ = self._total_and_variance(x)
+        if x_total == 0:
+            return Estimate(math.nan, math.nan, math.nan)
+        mean = y_total / x_total
+        _, variance = self._total_and_variance(y - mean * x)
+        margin = Z_95 * math.sqrt(variance) / x_total
+        return Estimate(mean, mean - margin, mean + margin)
+
+
+def draw(items:Iterable[Any], size:int, key:Callable[[Any], Any]=None, seed:int=None) -> Sample:
+    """
+    Draws a sample in one pass over the items: a uniform sample of size
+    items, or, if key is given, up to size items of every value of key.
+    """
+    rng = random.Random(seed)
+    strata:Dict[Any, Reservoir] = {}
+    if key is None:
+        reservoir = strata[None] = Reservoir(size, rng)
+        for item in items:
+            reservoir.add(item)
+    else:
+        for item in items:
+            stratum = key(item)
+            reservoir = strata.get(stratum)
+            if reservoir is None:
+                reservoir = strata[stratum] = Reservoir(size, rng)
+            reservoir.add(item)
+    return Sample.from_reservoirs(strata)
+
+
+def _field(item:Any, name:str):
+    return item.get(name) if isinstance(item, dict) else getattr(item, name)
+
+
+def _state_stratum(item:Any) -> Optional[str]:
+    state = _field(item, 'state')
+    return getattr(state, 'value', state)
+
+
+def _label_stratum(item:Any) -> Optional[str]:
+    # Issues are grouped by their first label
+    labels = _field(item, 'labels') or []
+    return label_name(labels[0]) if labels else None
+
+
+# Ways of stratifying a sample (--stratify); the keys work on raw records and Issues
+STRATA:Dict[str, Callable[[Any], Any]] = {
+    'state': _state_stratum,
+    'label': _label_stratum,
+}
+
+
+def sample_parameters():
+    """
+    Returns the requested sample size (--sample, None for a full run), the
+    stratum key (--stratify) and the random seed (--seed).
+    """
+    size = config.get_parameter('sample')
+    if isinstance(size, bool) or not isinstance(size, int) or size < 1:
+        return None, None, None
+    stratify = config.get_parameter('stratify')
+    seed = config.get_parameter('seed')
+    return size, STRATA.get(stratify), seed if isinstance(seed, int) else None
+
+
+def describe(sample:Sample) -> str:
+    return f'Estimated from a sample of {len(sample)} of {sample.population} issues (95% confidence intervals).'
@@ -0,0 +1,186 @@
+"""
+Publishes the loaded issues into shared memory so that analysis workers
+started with multiprocessing can read them without each receiving a
+pickled copy of the whole List[Issue].
+
+The dataset is stored column-wise in three shared memory blocks: the
+fixed-size fields (number, state, dates, counts) as a NumPy structured
+array, and the variable-size strings (title, text, creator, labels) as
+one UTF-8 arena plus an array of offsets into it. Workers attach to the
+blocks by name through a small, picklable handle and read them in place.
+"""
+
+import sys
+from multiprocessing import shared_memory, resource_tracker
+from typing import List, Dict
+
+import numpy as np
+import pandas as pd
+
+from model import Issue, State
+
+# Fixed-size fields; dates are nanoseconds since the epoch (UTC), NaT if unknown
+_COLUMNS = np.dtype([
+    ('number', np.int64),
+    ('state', np.int8),
+    ('created_date', 'datetime64[ns]'),
+    ('updated_date', 'datetime64[ns]'),
+    ('n_events', np.int32),
+    ('n_assignees', np.int32),
+])
+
+# Variable-size fields stored in the string arena, in this order
+STRING_FIELDS:List[str] = ['title', 'text', 'creator', 'labels']
+# Labels are stored as one string joined by this separator
+_LABEL_SEPARATOR = '\n'
+
+_STATE_CODES:Dict[State, int] = {State.closed: 0, State.open: 1}
+_STATES:List[State] = [State.closed, State.open]
+
+
+def _string_value(issue:Issue, field:str) -> str:
+    if field == 'labels':
+        return _LABEL_SEPARATOR.join(issue.labels)
+    return getattr(issue, field) or ''
+
+
+def _attach(name:str) -> shared_memory.SharedMemory:
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    shm = shared_memory.SharedMemory(name=name)
+    # Before 3.13, attaching registers the block with the resource tracker,
+    # which would destroy it when the worker exits. Only the owner unlinks it.
+    resource_tracker.unregister(shm._name, 'shared_memory')
+    return shm
+
+
+class SharedDataset:
+    """
+    Owner of the shared memory blocks. Create it once in the parent
+    process, pass its handle to the workers, and call unlink() (or use it
+    as a context manager) once all workers are done.
+    """
+
+    def __init__(self, issues:List[Issue]):
+        n = len(issues)
+        columns = np.zeros(n, dtype=_COLUMNS)
+        columns['number'] = [issue.number for issue in issues]
+        columns['state'] = [_STATE_CODES.get(issue.state, -1) for issue in issues]
+        for field in ('created_date', 'updated_date'):
+            dates = pd.to_datetime([getattr(issue, field) for issue in issues], utc=True)
+            columns[field] = dates.tz_localize(None).to_numpy(dtype='datetime64[ns]')
+        columns['n_events'] = [len(issue.events) for issue in issues]
+        columns['n_assignees'] = [len(issue.assignees) for issue in issues]
+
+        # offsets[f, i]:offsets[f, i + 1] is the byte range of field f of issue i
+        encoded = [[_string_value(issue, field).encode('utf-8') for issue in issues] for field in STRING_FIELDS]
+        offsets = np.zeros((len(STRING_FIELDS), n + 1), dtype=np.int64)
+        position = 0
+        for f, values in enumerate(encoded):
+            offsets[f, 0] = position
+            offsets[f, 1:] = position + np.cumsum([len(v) for v in values], dtype=np.int64)
+            position = int(offsets[f, -1])
+
+        # Shared memory blocks cannot be empty
+        self._columns = shared_memory.SharedMemory(create=True, size=max(columns.nbytes, 1))
+        self._offsets = shared_memory.SharedMemory(create=True, size=offsets.nbytes)
+        self._arena = shared_memory.SharedMemory(create=True, size=max(position, 1))
+
+        np.ndarray(columns.shape, dtype=_COLUMNS, buffer=self._columns.buf)[:] = columns
+        np.ndarray(offsets.shape, dtype=np.int64, buffer=self._offsets.buf)[:] = offsets
+        arena = np.ndarray((position,), dtype=np.uint8, buffer=self._arena.buf)
+        for f, values in enumerate(encoded):
+            arena[offsets[f, 0]:offsets[f, -1]] = np.frombuffer(b''.join(values), dtype=np.uint8)
+
+        self.handle:dict = {
+            'size': n,
+            'columns': self._columns.name,
+            'offsets': self._offsets.name,
+            'arena': self._arena.name,
+        }
+
+    def close(self):
+        for shm in (self._columns, self._offsets, self._arena):
+            shm.close()
+
+    def unlink(self):
+        """
+        Releases the shared memory. Views attached to it must be closed first.
+        """
+        self.close()
+        for shm in (self._columns, self._offsets, self._arena):
+            shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.unlink()
+
+
+class SharedDatasetView:
+    """
+    Read-only, zero-copy view of a SharedDataset. Fixed-size fields are
+    available as NumPy arrays (e.g. view.created_date); strings are decoded
+    from the arena on access (e.g. view.title(i)).
+    """
+
+    def __init__(self, handle:dict):
+        self._size:int = handle['size']
+        self._blocks = [_attach(handle[name]) for name in ('columns', 'offsets', 'arena')]
+        columns_shm, offsets_shm, arena_shm = self._blocks
+
+        self._columns = np.ndarray((self._size,), dtype=_COLUMNS, buffer=columns_shm.buf)
+        self._offsets = np.ndarray((len(STRING_FIELDS), self._size + 1), dtype=np.int64, buffer=offsets_shm.buf)
+        self._arena = arena_shm.buf
+        for array in (self._columns, self._offsets):
+            array.flags.writeable = False
+
+        self.number:np.ndarray = self._columns['number']
+        self.state_code:np.ndarray = self._columns['state']
+        self.created_date:np.ndarray = self._columns['created_date']
+        self.updated_date:np.ndarray = self._columns['updated_date']
+        self.n_events:np.ndarray = self._columns['n_events']
+        self.n_assignees:np.ndarray = self._columns['n_assignees']
+
+    @classmethod
+    def attach(cls, handle:dict):
+        return cls(handle)
+
+    def __len__(self):
+        return self._size
+
+    def _string(self, field:int, i:int) -> str:
+        start, end = self._offsets[field, i], self._offsets[field, i + 1]
+        return bytes(self._arena[start:end]).decode('utf-8')
+
+    def state(self, i:int) -> State:
+        code = self.state_code[i]
+        return _STATES[code] if code >= 0 else None
+
+    def title(self, i:int) -> str:
+        return self._string(0, i)
+
+    def text(self, i:int) -> str:
+        return self._string(1, i)
+
+    def creator(self, i:int) -> str:
+        return self._string(2, i)
+
+    def labels(self, i:int) -> List[str]:
+        joined = self._string(3, i)
+        return joined.split(_LABEL_SEPARATOR) if joined else []
+
+    def close(self):
+        # Drop the views into the buffers before closing the blocks
+        self.number = self.state_code = self.created_date = self.updated_date = None
+        self.n_events = self.n_assignees = None
+        self._columns = self._offsets = self._arena = None
+        for shm in self._blocks:
+            shm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,268 @@
+"""
+Fixed-size, mergeable sketches for approximate user statistics:
+HyperLogLog counts distinct items, a Count-Min Sketch estimates how often
+an item occurred and Space-Saving keeps the candidates for the most
+frequent items. Their memory does not grow with the number of users, and
+sketches of separately processed shards of a dataset can be merged into
+the sketch of the whole.
+"""
+
+import hashlib
+import heapq
+import math
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+_MASK_64 = (1 << 64) - 1
+
+
+def _hash128(item:str) -> Tuple[int, int]:
+    """
+    Two independent 64-bit hashes of the item, stable across processes so
+    that sketches built in different processes can be merged.
+    """
+    digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+    return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little')
+
+
+class HyperLogLog:
+    """
+    Estimates the number of distinct items with 2**precision one-byte
+    registers; the relative standard error is about 1.04 / sqrt(2**precision)
+    (0.8% with the default precision of 14, using 16 KiB).
+    """
+
+    def __init__(self, precision:int=14):
+        if not 4 <= precision <= 18:
+            raise ValueError('HyperLogLog precision must be between 4 and 18')
+        self.precision:int = precision
+        self.registers:np.ndarray = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add(self, item:str):
+        self.add_hash(_hash128(item)[0])
+
+    def add_hash(self, h:int):
+        index = h >> (64 - self.precision)
+        rest = h & ((1 << (64 - self.precision)) - 1)
+        # Position of the leftmost 1 bit in the remaining bits
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self) -> float:
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.power(2.0, -self.registers.astype(np.float64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            return m * math.log(m / zeros)
+        return float(estimate)
+
+    def merge(self, other:'HyperLogLog'):
+        if other.precision != self.precision:
+            raise ValueError('Only HyperLogLog sketches with the same precision can be merged')
+        np.maximum(self.registers, other.registers, out=self.registers)
+
+
+class CountMinSketch:
+    """
+    Estimates item frequencies with a depth x width table of counters. An
+    estimate never undercounts and overcounts by at most e * total / width
+    with probability 1 - exp(-depth).
+    """
+
+    def __init__(self, width:int=2048, depth:int=5):
+        self.width:int = width
+        self.depth:int = depth
+        self.table:np.ndarray = np.zeros((depth, width), dtype=np.int64)
+        self.total:int = 0
+        self._rows = np.arange(depth)
+
+    def _columns(self, h1:int, h2:int) -> np.ndarray:
+        # Double hashing derives the depth hash functions from two hashes
+        return np.array([((h1 + i * h2) & _MASK_64) % self.width for i in range(self.depth)])
+
+    def add(self, item:str, count:int=1):
+        self.add_hash(*_hash128(item), count=count)
+
+    def add_hash(self, h1:int, h2:int, count:int=1):
+        self.table[self._rows, self._columns(h1, h2)] += count
+        self.total += count
+
+    def estimate(self, item:str) -> int:
+        return int(self.table[self._rows, self._columns(*_hash128(item))].min())
+
+    def merge(self, other:'CountMinSketch'):
+        if (other.width, other.depth) != (self.width, self.depth):
+            raise ValueError('Only Count-Min sketches with the same dimensions can be merged')
+        self.table += other.table
+        self.total += other.total
+
+
+class SpaceSaving:
+    """
+    Tracks at most capacity candidates for the most frequent items. Every
+    item occurring more than total / capacity times is guaranteed to be
+    tracked; a tracked count overcounts by at most its recorded error.
+
+    The least frequent candidate is found with a min-heap of (count, item)
+    entries. Increments push a new entry instead of updating the old one,
+    which is skipped as stale when it reaches the top, so every update
+    costs O(log capacity).
+    """
+
+    def __init__(self, capacity:int=100):
+        self.capacity:int = capacity
+        self.counts:Dict[str, int] = {}
+        self.errors:Dict[str, int] = {}
+        self._heap:List[Tuple[int, str]] = []
+
+    def _push(self, item:str):
+        heapq.heappush(self._heap, (self.counts[item], item))
+        if len(self._heap) > 2 * self.capacity + 16:
+            # Mostly stale entries, rebuild from the current counts
+            self._rebuild()
+
+    def _rebuild(self):
+        self._heap = [(count, item) for item, count in self.counts.items()]
+        heapq.heapify(self._heap)
+
+    def _least(self) -> Tuple[int, str]:
+        """
+        The current (count, item) entry with the lowest count.
+        """
+        while True:
+            count, item = self._heap[0]
+            if self.counts.get(item) == count:
+                return count, item
+            heapq.heappop(self._heap)
+
+    def add(self, item:str, count:int=1):
+        if item in self.counts:
+            self.counts[item] += count
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = count
+            self.errors[item] = 0
+        else:
+            # The new item takes over the slot (and count) of the least frequent one
+            floor, evicted = self._least()
+            heapq.heappop(self._heap)
+            del self.counts[evicted]
+            del self.errors[evicted]
+            self.counts[item] = floor + count
+            self.errors[item] = floor
+        self._push(item)
+
+    def _floor(self) -> int:
+        # Untracked items occurred at most this often
+        return self._least()[0] if len(self.counts) >= self.capacity else 0
+
+    def merge(self, other:'SpaceSaving'):
+        floor, other_floor = self._floor(), other._floor()
+        merged = {}
+        for item in self.counts.keys() | other.counts.keys():
+            count = self.counts.get(item, floor) + other.counts.get(item, other_floor)
+            error = self.errors.get(item, floor) + other.errors.get(item, other_floor)
+            merged[item] = (count, error)
+        kept = sorted(merged.items(), key=lambda kv: -kv[1][0])[:self.capacity]
+        self.counts = {item: count for item, (count, _) in kept}
+        self.errors = {item: error for item, (_, error) in kept}
+        self._rebuild()
+
+    def top(self, n:int) -> List[Tuple[str, int]]:
+        return sorted(self.counts.items(), key=lambda kv: (-kv[1], kv[0]))[:n]
+
+
+class UserSketch:
+    """
+    Approximate statistics of the users in one role (e.g. issue creators):
+    how many distinct users there are, how often each occurred and which
+    occurred most often. Each user is hashed once for all three sketches.
+    """
+
+    def __init__(self, capacity:int=100, width:int=2048, depth:int=5, precision:int=14):
+        self.distinct:HyperLogLog = HyperLogLog(precision)
+        self.frequency:CountMinSketch = CountMinSketch(width, depth)
+        self.heavy_hitters:SpaceSaving = SpaceSaving(capacity)
+
+    @property
+    def total(self) -> int:
+        return self.frequency.total
+
+    def add(self, user:str):
+        h1, h2 = _hash128(user)
+        self.distinct.add_hash(h1)
+        self.frequency.add_hash(h1, h2)
+        self.heavy_hitters.add(user)
+
+    def update(self, users:Iterable[str]):
+        for user in users:
+            if user:
+                self.add(user)
+
+    def estimate(self, user:str) -> int:
+        return self.frequency.estimate(user)
+
+    def top(self, n:int) -> List[Tuple[str, int]]:
+        """
+        The n most frequent users. Both sketches only overcount, so each
+        candidate's count is the smaller of their two estimates.
+        """
+        candidates = [(user, min(count, self.frequency.estimate(user)))
+                      for user, count in self.heavy_hitters.counts.items()]
+        return sorted(candidates, key=lambda kv: (-kv[1], kv[0]))[:n]
+
+    def merge(self, other:'UserSketch'):
+        self.distinct.merge(other.distinct)
+        self.frequency.merge(other.frequency)
+        self.heavy_hitters.merge(other.heavy_hitters)
+
+
+class ActivitySketch:
+    """
+    Sketches of the issue creators, the authors of all events and the
+    authors of comments of a stream of issue records (or a shard of it).
+    """
+
+    def __init__(self, capacity:int=100):
+        self.issues:int = 0
+        self.creators:UserSketch = UserSketch(capacity)
+        self.authors:UserSketch = UserSketch(capacity)
+        self.commenters:UserSketch = UserSketch(capacity)
+        # Events without an author
+        self.unattributed_events:int = 0
+
+    @property
+    def events(self) -> int:
+        return self.authors.total + self.unattributed_events
+
+    def add(self, record:dict):
+        """
+        Adds one raw issue record, as read from the data file.
+        """
+        self.issues += 1
+        self.creators.update([record.get('creator')])
+        for event in record.get('events', []):
+            author = event.get('author')
+            if not author:
+                self.unattributed_events += 1
+                continue
+            self.authors.add(author)
+            if event.get('event_type') == 'commented':
+                self.commenters.add(author)
+
+    @classmethod
+    def build(cls, records:Iterable[dict], capacity:int=100):
+        sketch = cls(capacity)
+        for record in records:
+            sketch.add(record)
+        return sketch
+
+    def merge(self, other:'ActivitySketch'):
+        self.issues += other.issues
+        self.unattributed_events += other.unattributed_events
+        self.creators.merge(other.creators)
+        self.authors.merge(other.authors)
+        self.commenters.merge(other.commenters)
@@ -0,0 +1,375 @@
+"""
+Optional SQLite storage backend. The issues JSON is ingested once into a
+local database (issues, labels, assignees and events tables plus an FTS5
+index over title/text) so that filtering, counting and keyword search can
+be answered by SQL instead of loading every issue into memory.
+
+The backend is enabled by setting the config parameter
+ENPM611_PROJECT_STORAGE to "sqlite". The database is stored next to the
+data file unless ENPM611_PROJECT_DB_PATH is set.
+"""
+
+import logging
+logger = logging.getLogger(__name__)
+
+import os
+import sqlite3
+from collections import Counter
+from typing import Iterable, List, Dict, Optional
+
+from dateutil import parser
+
+from contributor_index import ContributorStats
+from model import Issue, label_name
+
+# Bump when the schema changes so existing databases are re-ingested
+_SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE issues (
+    id INTEGER PRIMARY KEY,
+    number INTEGER,
+    url TEXT,
+    creator TEXT,
+    state TEXT,
+    title TEXT,
+    text TEXT,
+    created_date TEXT,
+    updated_date TEXT,
+    timeline_url TEXT
+);
+CREATE TABLE labels (issue_id INTEGER, label TEXT);
+CREATE TABLE assignees (issue_id INTEGER, assignee TEXT);
+CREATE TABLE events (
+    issue_id INTEGER,
+    event_type TEXT,
+    author TEXT,
+    event_date TEXT,
+    label TEXT,
+    comment TEXT
+);
+CREATE INDEX idx_issues_state ON issues(state);
+CREATE INDEX idx_issues_creator ON issues(creator);
+CREATE INDEX idx_labels_label ON labels(label, issue_id);
+CREATE INDEX idx_labels_issue ON labels(issue_id);
+CREATE INDEX idx_assignees_assignee ON assignees(assignee);
+CREATE INDEX idx_events_issue ON events(issue_id);
+CREATE INDEX idx_events_author ON events(author, event_type);
+"""
+
+# The trigram tokenizer supports case-insensitive substring matches, which
+# is what the keyword analysis does
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE issues_fts USING fts5(
+    title, text, content='issues', content_rowid='id', tokenize='trigram'
+);
+"""
+
+# FTS5 trigram queries need at least this many characters
+_MIN_FTS_QUERY = 3
+# Ids bound per query by get_issues(ids=...); old SQLite builds allow only 999 parameters
+_MAX_IDS_PER_QUERY = 500
+
+
+class SQLiteStore:
+    """
+    Wraps the SQLite database holding one ingested data file.
+    """
+
+    def __init__(self, db_path:str):
+        self.db_path:str = db_path
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+
+    def close(self):
+        self.conn.close()
+
+    @staticmethod
+    def default_path(data_path:str) -> str:
+        return f'{data_path}.sqlite'
+
+    @staticmethod
+    def _source_signature(data_path:str) -> str:
+        stat = os.stat(data_path)
+        return f'{_SCHEMA_VERSION}:{stat.st_size}:{stat.st_mtime}'
+
+    def is_current(self, data_path:str) -> bool:
+        """
+        Whether the database was ingested from the current version of data_path.
+        """
+        try:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'source'").fetchone()
+        except sqlite3.DatabaseError:
+            return False
+        return row is not None and row[0] == self._source_signature(data_path)
+
+    @property
+    def has_fts(self) -> bool:
+        row = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'issues_fts'").fetchone()
+        return row is not None
+
+    def _execute_script(self, script:str):
+        # Unlike executescript(), which commits first, this runs inside the open transaction
+        for statement in script.split(';'):
+            if statement.strip():
+                self.conn.execute(statement)
+
+    def ingest(self, records:Iterable[dict], data_path:str=None):
+        """
+        (Re)creates the schema and inserts the issue records. If data_path is
+        given, the database is tagged with its size and mtime so that it is
+        re-ingested once the file changes. Everything runs in one
+        transaction, so a failed ingest leaves the previous database intact.
+        """
+        self.conn.execute('BEGIN')
+        try:
+            for (name, kind) in self.conn.execute(
+                    "SELECT name, type FROM sqlite_master WHERE type IN ('table', 'view') "
+                    "AND name NOT LIKE 'sqlite_%' AND name NOT LIKE 'issues_fts_%'").fetchall():
+                self.conn.execute(f'DROP {kind.upper()} IF EXISTS "{name}"')
+            self._execute_script(_SCHEMA)
+            try:
+                self._execute_script(_FTS_SCHEMA)
+            except sqlite3.OperationalError as e:
+                logger.info(f'FTS5 not available, keyword search will scan: {e}')
+
+            for jobj in records:
+                cur = self.conn.execute(
+                    'INSERT INTO issues (number, url, creator, state, title, text, created_date, '
+                    'updated_date, timeline_url) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (jobj.get('number'), jobj.get('url'), jobj.get('creator'), jobj.get('state'),
+                     jobj.get('title'), jobj.get('text'), jobj.get('created_date'),
+                     jobj.get('updated_date'), jobj.get('timeline_url')))
+                issue_id = cur.lastrowid
+                self.conn.executemany('INSERT INTO labels VALUES (?, ?)',
+                                      [(issue_id, label_name(l)) for l in jobj.get('labels', [])])
+                self.conn.executemany('INSERT INTO assignees VALUES (?, ?)',
+                                      [(issue_id, a) for a in jobj.get('assignees', [])])
+                self.conn.executemany('INSERT INTO events VALUES (?, ?, ?, ?, ?, ?)', [
+                    (issue_id, e.get('event_type'), e.get('author'), e.get('event_date'),
+                     e.get('label'), e.get('comment'))
+                    for e in jobj.get('events', [])])
+
+            if self.has_fts:
+                self.conn.execute("INSERT INTO issues_fts(issues_fts) VALUES ('rebuild')")
+            if data_path is not None:
+                self.conn.execute("INSERT INTO meta VALUES ('source', ?)",
+                                  (self._source_signature(data_path),))
+        except BaseException:
+            self.conn.rollback()
+            raise
+        self.conn.commit()
+
+    ### COUNTING
+
+    def count_issues(self) -> int:
+        return self.conn.execute('SELECT COUNT(*) FROM issues').fetchone()[0]
+
+    def count_by_state(self) -> Counter:
+        return Counter(dict(self.conn.execute(
+            'SELECT state, COUNT(*) FROM issues GROUP BY state').fetchall()))
+
+    def label_counts(self, state:str=None) -> Counter:
+        """
+        Number of issues per label, optionally only for issues in the given state.
+        """
+        sql = 'SELECT label, COUNT(DISTINCT issue_id) FROM labels'
+        params = []
+        if state is not None:
+            sql += ' WHERE issue_id IN (SELECT id FROM issues WHERE state = ?)'
+            params.append(state)
+        return Counter(dict(self.conn.execute(sql + ' GROUP BY label', params).fetchall()))
+
+    def open_status_counts(self) -> Counter:
+        """
+        Number of open issues per status/ label (without the prefix). Open
+        issues without any status label are counted as "unassigned".
+        """
+        counts = Counter(dict(self.conn.execute(
+            "SELECT substr(l.label, 8), COUNT(*) FROM labels l JOIN issues i ON i.id = l.issue_id "
+            "WHERE i.state = 'open' AND l.label LIKE 'status/%' GROUP BY l.label").fetchall()))
+        unassigned = self.conn.execute(
+            "SELECT COUNT(*) FROM issues WHERE state = 'open' AND id NOT IN "
+            "(SELECT issue_id FROM labels WHERE label LIKE 'status/%')").fetchone()[0]
+        if unassigned:
+            counts['unassigned'] += unassigned
+        return counts
+
+    def count_events(self, author:str=None) -> int:
+        if author is None:
+            return self.conn.execute('SELECT COUNT(*) FROM events').fetchone()[0]
+        return self.conn.execute('SELECT COUNT(*) FROM events WHERE author = ?', (author,)).fetchone()[0]
+
+    def top_creators(self, n:int) -> List[tuple]:
+        """
+        The n users that created the most issues as (creator, count) pairs.
+        """
+        return self.conn.execute(
+            'SELECT creator, COUNT(*) AS n FROM issues WHERE creator IS NOT NULL '
+            'GROUP BY creator ORDER BY n DESC LIMIT ?', (n,)).fetchall()
+
+    def contributor_stats(self, user:str) -> Optional[ContributorStats]:
+        """
+        Activity of the user as in the in-memory ContributorIndex, or None if
+        the user neither created, was assigned to nor authored anything.
+        """
+        stats = ContributorStats(user)
+        stats.events_by_type = Counter(dict(self.conn.execute(
+            'SELECT event_type, COUNT(*) FROM events WHERE author = ? GROUP BY event_type', (user,)).fetchall()))
+        stats.issues_created = self.conn.execute(
+            'SELECT COUNT(*) FROM issues WHERE creator = ?', (user,)).fetchone()[0]
+        stats.assignments = self.conn.execute(
+            'SELECT COUNT(*) FROM assignees WHERE assignee = ?', (user,)).fetchone()[0]
+        if not (stats.events_by_type or stats.issues_created or stats.assignments):
+            return None
+        # Candidates for the first and last activity: the earliest and latest date
+        # string of the issue creations and of the events (ISO 8601 sorts by time)
+        dates = self.conn.execute(
+            'SELECT MIN(created_date), MAX(created_date) FROM issues WHERE creator = ? '
+            'UNION ALL SELECT MIN(event_date), MAX(event_date) FROM events WHERE author = ?',
+            (user, user)).fetchall()
+        for date in {d for row in dates for d in row if d}:
+            stats._touch(parser.parse(date))
+        return stats
+
+    ### RETRIEVAL
+
+    def iter_comments(self):
+        """
+        Yields (issue number, issue title, author, date, comment) for every
+        event with a comment, reading them from the database lazily.
+        """
+        yield from self.conn.execute(
+            "SELECT i.number, i.title, e.author, e.event_date, e.comment FROM events e "
+            "JOIN issues i ON i.id = e.issue_id WHERE e.comment IS NOT NULL AND e.comment != '' "
+            "ORDER BY e.rowid")
+
+    def _match(self, keyword:str) -> tuple:
+        """
+        Returns the SQL condition selecting the issues whose title or text
+        contains the keyword (case-insensitive substring match), with its
+        parameters.
+        """
+        keyword = keyword.strip()
+        if self.has_fts and len(keyword) >= _MIN_FTS_QUERY:
+            phrase = '"' + keyword.replace('"', '""') + '"'
+            return 'id IN (SELECT rowid FROM issues_fts WHERE issues_fts MATCH ?)', [phrase]
+        pattern = '%' + keyword.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        return "(title LIKE ? ESCAPE '\\' OR text LIKE ? ESCAPE '\\')", [pattern, pattern]
+
+    def search_ids(self, keyword:str) -> List[int]:
+        """
+        Returns the ids of issues whose title or text contains the keyword
+        (case-insensitive substring match).
+        """
+        clause, params = self._match(keyword)
+        return [row[0] for row in self.conn.execute(f'SELECT id FROM issues WHERE {clause} ORDER BY id', params)]
+
+    def search(self, keyword:str) -> List[Issue]:
+        # The matches are selected by a subquery, however many there are
+        clause, params = self._match(keyword)
+        return self._select_issues([clause], params)
+
+    def get_issues(self, ids:List[int]=None, state:str=None, label:str=None,
+                   creator:str=None) -> List[Issue]:
+        """
+        Returns the issues matching all given filters as Issue objects.
+        """
+        clauses, params = [], []
+        if ids is not None:
+            if not ids:
+                return []
+            if len(ids) > _MAX_IDS_PER_QUERY:
+                # One bound parameter per id, so stay below SQLite's limit on them
+                ids = sorted(set(ids))
+                return [issue for start in range(0, len(ids), _MAX_IDS_PER_QUERY)
+                        for issue in self.get_issues(ids[start:start + _MAX_IDS_PER_QUERY], state, label, creator)]
+            clauses.append(f'id IN ({",".join("?" * len(ids))})')
+            params.extend(ids)
+        if state is not None:
+            clauses.append('state = ?')
+            params.append(state)
+        if label is not None:
+            clauses.append('id IN (SELECT issue_id FROM labels WHERE label = ?)')
+            params.append(label)
+        if creator is not None:
+            clauses.append('creator = ?')
+            params.append(creator)
+        return self._select_issues(clauses, params)
+
+    def _select_issues(self, clauses:List[str], params:list) -> List[Issue]:
+        """
+        Returns the issues matching all SQL conditions as Issue objects.
+        """
+        where = f' WHERE {" AND ".join(clauses)}' if clauses else ''
+
+        rows = self.conn.execute(
+            'SELECT id, number, url, creator, state, title, text, created_date, updated_date, '
+            f'timeline_url FROM issues{where} ORDER BY id', params).fetchall()
+        if not rows:
+            return []
+
+        # The labels, assignees and events of all selected issues, one query each
+        selected = f'issue_id IN (SELECT id FROM issues{where})'
+        labels = self._group(f'SELECT issue_id, label FROM labels WHERE {selected} '
+                             'ORDER BY issue_id, rowid', params, lambda r: r[0])
+        assignees = self._group(f'SELECT issue_id, assignee FROM assignees WHERE {selected} '
+                                'ORDER BY issue_id, rowid', params, lambda r: r[0])
+        events = self._group(
+            'SELECT issue_id, event_type, author, event_date, label, comment FROM events '
+            f'WHERE {selected} ORDER BY issue_id, rowid', params,
+            lambda r: dict(zip(('event_type', 'author', 'event_date', 'label', 'comment'), r)))
+
+        issues = []
+        for row in rows:
+            jobj = dict(zip(('number', 'url', 'creator', 'state', 'title', 'text', 'created_date',
+                             'updated_date', 'timeline_url'), row[1:]))
+            jobj['labels'] = labels.get(row[0], [])
+            jobj['assignees'] = assignees.get(row[0], [])
+            jobj['events'] = events.get(row[0], [])
+            issues.append(Issue(jobj))
+        return issues
+
+    def _group(self, sql:str, params:list, value) -> Dict[int, list]:
+        """
+        Runs a query whose rows start with an issue id and groups value(rest
+        of the row) by issue id, keeping the row order.
+        """
+        grouped:Dict[int, list] = {}
+        for row in self.conn.execute(sql, params):
+            grouped.setdefault(row[0], []).append(value(row[1:]))
+        return grouped
+
+    @classmethod
+    def open_for(cls, data_path:str, records_loader, db_path:str=None):
+        """
+        Opens the database for data_path, ingesting the records returned by
+        records_loader() first if the database is missing or out of date.
+        """
+        store = cls(db_path or cls.default_path(data_path))
+        if not store.is_current(data_path):
+            logger.info(f'Ingesting {data_path} into {store.db_path}')
+            store.ingest(records_loader(), data_path)
+        return store
+
+    @classmethod
+    def rebuild(cls, data_path:str, records_loader, db_path:str=None):
+        """
+        Ingests the records returned by records_loader() into a new database
+        file and moves it over the database for data_path. Connections that
+        are open on the previous database keep reading its contents until
+        they are closed, so they are never blocked by or broken by the ingest.
+        """
+        db_path = db_path or cls.default_path(data_path)
+        staging_path = db_path + '.new'
+        if os.path.exists(staging_path):
+            os.remove(staging_path)
+        staging = cls(staging_path)
+        try:
+            logger.info(f'Ingesting {data_path} into {db_path}')
+            staging.ingest(records_loader(), data_path)
+        finally:
+            staging.close()
+        os.replace(staging_path, db_path)
+        return cls(db_path)
@@ -6,11 +6,16 @@ from collections import Counter
 from pathlib import Path
 
 from data_loader import DataLoader
-from model import Issue,Event
+from figure_cache import FigureCache, figure_key, show_image
+from model import Issue,Event,LABELS
+from timeline import STATUS_PREFIX, UNASSIGNED_STATUS
+from sampling import Sample, describe, sample_parameters
 import config
 
 _TOP_K_STATUSES = 10
 OUTPUT_PNG = Path("./figures/status_analysis/status_analysis.png")
+# Part of the figure cache key; bump version when the plotting code changes
+_FIGURE_STYLE = {'version': 1, 'figsize': (16, 6), 'dpi': 200}
 
 class StatusAnalysis:
     """
@@ -26,10 +31,22 @@ class StatusAnalysis:
         self.USER:str = config.get_parameter('user')
         self.states: List[str] = []
         self.open_status_labels: List[str] = []
+        # Optional preview on a sample (--sample, --stratify, --seed)
+        self.sample_size, self.sample_key, self.seed = sample_parameters()
     
     def _plot_analysis(self, state_sizes, state_labels, status_items, status_keys, status_vals):
+        # The figure is only rendered again if the plotted data or style changed
+        key = figure_key(state_sizes, state_labels, status_items, _FIGURE_STYLE)
+        if FigureCache(OUTPUT_PNG).render(key, lambda: self._render(state_sizes, state_labels, status_items,
+                                                                    status_keys, status_vals)):
+            print(f"\nSaved figure to: {OUTPUT_PNG.resolve()}")
+        else:
+            show_image(OUTPUT_PNG)
+        plt.show()
+
+    def _render(self, state_sizes, state_labels, status_items, status_keys, status_vals):
         # plot
-        fig, axes = plt.subplots(1, 2, figsize=(16, 6))
+        fig, axes = plt.subplots(1, 2, figsize=_FIGURE_STYLE['figsize'])
         # Left: Pie for open vs closed
         axes[0].pie(state_sizes, labels=state_labels, autopct="%1.1f%%", startangle=90)
         axes[0].set_title("Issue Status Distribution (Open vs Closed)")
@@ -54,9 +71,7 @@ class StatusAnalysis:
                     ha="center", va="center", transform=ax.transAxes)
 
         plt.tight_layout()
-        plt.savefig(OUTPUT_PNG, dpi=200)
-        print(f"\nSaved figure to: {OUTPUT_PNG.resolve()}")
-        plt.show()
+        plt.savefig(OUTPUT_PNG, dpi=_FIGURE_STYLE['dpi'])
     
     def _print_analysis(self, state_labels, state_counts, status_items):
         # print summary
@@ -69,40 +84,109 @@ class StatusAnalysis:
             print(f"  {label}: {cnt}")
         print("\n\n") 
     
-    def run(self):
+    def status_snapshots(self, dates) -> pd.DataFrame:
         """
-        Starting point for this analysis.
-        
-        Note: this is just an example analysis. You should replace the code here
-        with your own implementation and then implement two more such analyses.
+        Returns how many open issues were in each status at each of the given
+        dates (one row per date, one column per status, including
+        "unassigned"). The status intervals of every issue are replayed from
+        its events once; each status' interval starts and ends are sorted and
+        the counts at all dates come from a binary search into them, so the
+        whole series costs O(events log events) regardless of the number of
+        dates.
+        """
+        timelines = DataLoader().get_timelines().timelines
+        intervals:dict = {}
+        for timeline in timelines:
+            for status, start, end in timeline.status_intervals:
+                starts, ends = intervals.setdefault(status, ([], []))
+                starts.append(start)
+                if end is not None:
+                    ends.append(end)
+
+        points = pd.to_datetime(pd.Series(list(dates)), utc=True).to_numpy(dtype='datetime64[ns]')
+        counts = {}
+        for status, (starts, ends) in intervals.items():
+            starts = np.sort(pd.to_datetime(pd.Series(starts), utc=True).to_numpy(dtype='datetime64[ns]'))
+            ends = np.sort(pd.to_datetime(pd.Series(ends, dtype=object), utc=True).to_numpy(dtype='datetime64[ns]'))
+            # Intervals are half-open: an issue counts from its start up to (not including) its end
+            counts[status] = np.searchsorted(starts, points, side='right') - np.searchsorted(ends, points, side='right')
+
+        return pd.DataFrame(counts, index=pd.DatetimeIndex(points, tz='UTC'), columns=sorted(counts))
+
+    def _statuses(self, issue) -> List[str]:
+        """
+        The statuses of an open issue ("unassigned" if it has none).
+        """
+        codes = getattr(issue, 'label_codes', None)
+        if codes is None:
+            # Not loaded through model.Issue, encode the names now
+            codes = LABELS.encode(issue.labels)
+        statuses = LABELS.in_namespace(STATUS_PREFIX)
+        found = [LABELS.suffix(code) for code in codes if code in statuses]
+        return found or [UNASSIGNED_STATUS]
+
+    def _count(self, issues:List[Issue]):
+        """
+        Counts the issues per state and the open issues per status label.
         """
-        issues:List[Issue] = DataLoader().get_issues()
-        
-        ### BASIC STATISTICS
-        # Calculate the total number of events for a specific user (if specified in command line args)
-        total_events:int = 0
         for issue in issues:
             state = issue.state
             self.states.append(state)
-
             if state == "open":
-                labels = issue.labels
+                self.open_status_labels.extend(self._statuses(issue))
+
+        return Counter(self.states), Counter(self.open_status_labels)
+
+    def _estimate(self, sample:Sample):
+        """
+        Estimates the counts per state and per open issue status of the full
+        dataset from a sample and prints them with their confidence intervals.
+        """
+        statuses = [self._statuses(issue) if issue.state == "open" else [] for issue in sample.items]
+        state_estimates = {
+            state: sample.estimate_count(lambda issue: issue.state == state)
+            for state in sorted({issue.state for issue in sample.items})
+        }
+        status_estimates = {
+            status: sample.estimate_total(found.count(status) for found in statuses)
+            for status in sorted({status for found in statuses for status in found})
+        }
+
+        print("\n" + describe(sample))
+        print("Estimated issue status counts:")
+        for state, estimate in state_estimates.items():
+            print(f"  {state}: {estimate}")
+        print("Estimated open issue status labels:")
+        for status, estimate in status_estimates.items():
+            print(f"  {status}: {estimate}")
+
+        return (Counter({k: round(e.value) for k, e in state_estimates.items()}),
+                Counter({k: round(e.value) for k, e in status_estimates.items()}))
 
-                status_found = False
-                for label in labels:
-                    if isinstance(label, str) and label.startswith("status/"):
-                        self.open_status_labels.append(label[len("status/"):])
-                        status_found = True
-                if not status_found:
-                    self.open_status_labels.append("unassigned")
+    def run(self):
+        """
+        Starting point for this analysis.
+        
+        Note: this is just an example analysis. You should replace the code here
+        with your own implementation and then implement two more such analyses.
+        """
+        loader = DataLoader()
+        if self.sample_size is not None:
+            sample = loader.get_sample(self.sample_size, self.sample_key, self.seed)
+            state_counts, status_counts_all = self._estimate(sample)
+        elif loader.storage == "sqlite":
+            # Counting is pushed down into the database
+            store = loader.get_store()
+            state_counts = store.count_by_state()
+            status_counts_all = store.open_status_counts()
+        else:
+            state_counts, status_counts_all = self._count(loader.get_issues())
 
         # for state analysis
-        state_counts = Counter(self.states)
         state_labels = list(state_counts.keys())
         state_sizes = [state_counts[k] for k in state_labels]
 
         # for open state label analysis
-        status_counts_all = Counter(self.open_status_labels)
         status_counts = Counter(dict(status_counts_all.most_common(_TOP_K_STATUSES)))
         status_items = sorted(status_counts.items(), key=lambda kv: kv[1], reverse=True)
         status_keys = [k for k, _ in status_items]
@@ -0,0 +1,225 @@
+"""
+Live status and label counts over a continuously appended JSON Lines feed
+of issue updates. The counters are seeded once from the dataset and every
+update then only replaces the contribution of the one issue it touches,
+so the cost per update does not depend on the size of the dataset.
+
+Each line of the feed is either a complete issue record (same format as
+the data file; it replaces the issue with the same number) or an event of
+an existing issue: {"number": 12, "event_type": "labeled", "label":
+"status/triage", "event_date": "..."}. The event types closed, reopened,
+labeled and unlabeled change the counts.
+"""
+
+import logging
+logger = logging.getLogger(__name__)
+
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+from dateutil import parser
+
+import config
+import data_stream
+from data_loader import DataLoader
+from model import Issue, LABELS
+from timeline import IssueTimeline, STATUS_PREFIX, UNASSIGNED_STATUS
+
+# Seconds between two printed snapshots
+_DEFAULT_SNAPSHOT_INTERVAL = 10
+_TOP_K_LABELS = 10
+
+
+class _IssueEntry:
+    """
+    What the counters know about one issue.
+    """
+
+    __slots__ = ('state', 'labels', 'created_date', 'closed_date')
+
+    def __init__(self, state:str, labels:Set[int], created_date:datetime, closed_date:datetime):
+        self.state:str = state
+        self.labels:Set[int] = labels
+        self.created_date:datetime = created_date
+        self.closed_date:datetime = closed_date
+
+    def resolution_days(self) -> Optional[float]:
+        if self.state != 'closed' or self.created_date is None or self.closed_date is None:
+            return None
+        try:
+            return (self.closed_date - self.created_date).total_seconds() / (24 * 3600)
+        except TypeError:
+            # Mix of dates with and without time zone
+            return None
+
+
+class LiveCounts:
+    """
+    Issue counts per state, open issue counts per status, issue counts per
+    label and the total resolution time of closed issues, kept up to date
+    one update at a time. Labels are counted by their code in the shared
+    vocabulary.
+    """
+
+    def __init__(self):
+        self.issues:Dict[int, _IssueEntry] = {}
+        self.states:Counter = Counter()
+        # Keyed by status label code, None for open issues without a status
+        self.statuses:Counter = Counter()
+        self.labels:Counter = Counter()
+        self.resolution_days_total:float = 0.0
+        self.resolved:int = 0
+        self.updates:int = 0
+        # Events for issues that are not known (yet)
+        self.skipped:int = 0
+        self._status_codes:Set[int] = LABELS.in_namespace(STATUS_PREFIX)
+
+    def _count(self, entry:_IssueEntry, sign:int):
+        """
+        Adds (sign=1) or removes (sign=-1) the contribution of one issue.
+        """
+        self.states[entry.state] += sign
+        for code in entry.labels:
+            self.labels[code] += sign
+        if entry.state == 'open':
+            statuses = [code for code in entry.labels if code in self._status_codes]
+            for code in statuses or [None]:
+                self.statuses[code] += sign
+        days = entry.resolution_days()
+        if days is not None:
+            self.resolution_days_total += sign * days
+            self.resolved += sign
+
+    def add_issue(self, issue:Issue, timeline:IssueTimeline=None):
+        """
+        Adds an issue, replacing the issue with the same number if known.
+        """
+        timeline = timeline or IssueTimeline.from_issue(issue)
+        closed_date = timeline.closed_date
+        if closed_date is None and issue.state == 'closed':
+            closed_date = issue.updated_date
+        entry = _IssueEntry(getattr(issue.state, 'value', issue.state), set(issue.label_codes),
+                            issue.created_date, closed_date)
+        previous = self.issues.get(issue.number)
+        if previous is not None:
+            self._count(previous, -1)
+        self.issues[issue.number] = entry
+        self._count(entry, 1)
+
+    def seed(self, issues:List[Issue], timelines:List[IssueTimeline]=None):
+        timelines = timelines or [None] * len(issues)
+        for issue, timeline in zip(issues, timelines):
+            self.add_issue(issue, timeline)
+
+    def apply(self, record:dict):
+        """
+        Applies one line of the feed: a complete issue record or an event of
+        a known issue.
+        """
+        self.updates += 1
+        if 'event_type' not in record:
+            try:
+                issue = Issue(record)
+            except (KeyError, TypeError, ValueError):
+                logger.warning(f'Skipping issue record without a valid state: {record.get("number")}')
+                self.skipped += 1
+                return
+            self.add_issue(issue)
+            return
+
+        entry = self.issues.get(record.get('number'))
+        if entry is None:
+            self.skipped += 1
+            return
+        event_type = record.get('event_type')
+        self._count(entry, -1)
+        if event_type == 'closed':
+            entry.state = 'closed'
+            entry.closed_date = _parse_date(record.get('event_date'))
+        elif event_type == 'reopened':
+            entry.state = 'open'
+            entry.closed_date = None
+        elif event_type == 'labeled' and record.get('label'):
+            entry.labels.add(LABELS.add(record['label']))
+        elif event_type == 'unlabeled' and record.get('label'):
+            code = LABELS.code(record['label'])
+            entry.labels.discard(code)
+        self._count(entry, 1)
+
+    def snapshot(self) -> dict:
+        """
+        The current counts, with label names instead of codes.
+        """
+        return {
+            'issues': len(self.issues),
+            'updates': self.updates,
+            'states': {state: n for state, n in self.states.items() if n > 0},
+            'statuses': {(LABELS.suffix(code) if code is not None else UNASSIGNED_STATUS): n
+                         for code, n in self.statuses.items() if n > 0},
+            'labels': {LABELS.name(code): n for code, n in self.labels.most_common(_TOP_K_LABELS) if n > 0},
+            'mean_resolution_days': self.resolution_days_total / self.resolved if self.resolved else None,
+        }
+
+
+def _parse_date(value) -> Optional[datetime]:
+    try:
+        return parser.parse(value)
+    except Exception:
+        return None
+
+
+class TailAnalysis:
+    """
+    Follows the feed of issue updates and periodically prints the current
+    counts. Stop it with Ctrl+C.
+    """
+
+    def __init__(self):
+        """
+        Constructor
+        """
+        # Path of the JSON Lines feed (--tail)
+        self.path:str = config.get_parameter('tail') or config.get_parameter('ENPM611_PROJECT_TAIL_PATH')
+        self.interval:float = config.get_parameter('ENPM611_PROJECT_SNAPSHOT_INTERVAL', _DEFAULT_SNAPSHOT_INTERVAL)
+        self.counts:LiveCounts = LiveCounts()
+
+    def _print_snapshot(self):
+        snapshot = self.counts.snapshot()
+        print(f"\n[{datetime.now():%H:%M:%S}] {snapshot['issues']} issues, {snapshot['updates']} updates applied")
+        print('  States: ' + ', '.join(f'{k}: {v}' for k, v in sorted(snapshot['states'].items())))
+        print('  Open issues by status: ' + ', '.join(f'{k}: {v}' for k, v in
+                                                     sorted(snapshot['statuses'].items(), key=lambda kv: -kv[1])))
+        print('  Top labels: ' + ', '.join(f'{k}: {v}' for k, v in snapshot['labels'].items()))
+        if snapshot['mean_resolution_days'] is not None:
+            print(f"  Mean resolution time: {snapshot['mean_resolution_days']:.1f} days")
+
+    def run(self, stop=None):
+        """
+        Starting point for this analysis. Runs until interrupted or until
+        the stop event (a threading.Event) is set.
+        """
+        if not self.path:
+            print('Need to specify the feed of issue updates to follow with the --tail flag.')
+            return
+        loader = DataLoader()
+        self.counts.seed(loader.get_issues(), loader.get_timelines().timelines)
+        self._print_snapshot()
+
+        last_snapshot = time.monotonic()
+        try:
+            for record in data_stream.follow_jsonl(self.path, min(self.interval, 1.0), stop):
+                if record is not None:
+                    self.counts.apply(record)
+                if time.monotonic() - last_snapshot >= self.interval:
+                    self._print_snapshot()
+                    last_snapshot = time.monotonic()
+        except KeyboardInterrupt:
+            pass
+        self._print_snapshot()
+
+
+if __name__ == '__main__':
+    # Invoke run method when running this module directly
+    TailAnalysis().run()
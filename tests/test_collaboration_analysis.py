@@ -0,0 +1,32 @@
+import io
+import unittest
+from unittest.mock import patch
+
+import collaboration_analysis
+from model import Issue
+
+
+class TestCollaborationAnalysis(unittest.TestCase):
+
+    def test_run_prints_central_users_and_collaborators(self):
+        issues = [
+            Issue({'number': 1, 'state': 'open', 'creator': 'alice', 'events': [{'author': 'bob'}]}),
+            Issue({'number': 2, 'state': 'open', 'creator': 'bob', 'assignees': ['carol']}),
+        ]
+        with patch('collaboration_analysis.DataLoader') as loader_mock, patch(
+            'collaboration_analysis.config.get_parameter', return_value='bob'
+        ):
+            loader_mock.return_value.get_issues.return_value = issues
+            buffer = io.StringIO()
+            with patch('sys.stdout', buffer):
+                collaboration_analysis.CollaborationAnalysis().run()
+
+        output = buffer.getvalue()
+        self.assertIn('3 users interacted with 2 issues (4 user-issue pairs, 2 collaborating user pairs)', output)
+        self.assertIn('Top 3 users by PageRank', output)
+        self.assertLess(output.index('  bob'), output.index('  alice'))
+        self.assertIn('Users sharing the most issues with bob:\n  alice: 1 issues\n  carol: 1 issues', output)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,7 @@
 import unittest
 import os
 import json
+import threading
 from unittest.mock import patch, MagicMock
 import config
 
@@ -115,5 +116,16 @@ class TestConfig(unittest.TestCase):
         # Test passing something broken to trigger the except blocks
         config.overwrite_from_args(None)
 
+    @patch('config._get_default_path')
+    def test_init_config_once_under_concurrency(self, mock_path):
+        # Concurrent first calls must only look for the config file once
+        mock_path.return_value = None
+        threads = [threading.Thread(target=config.get_parameter, args=("ANY",)) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        mock_path.assert_called_once()
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+from contributor_index import ContributorIndex
+from model import Issue
+
+
+def _issues():
+    return [
+        Issue({
+            'creator': 'alice', 'state': 'open', 'assignees': ['bob'],
+            'created_date': '2020-01-01T00:00:00',
+            'events': [
+                {'event_type': 'commented', 'author': 'bob', 'event_date': '2020-01-02T00:00:00'},
+                {'event_type': 'labeled', 'author': 'bob', 'event_date': '2020-01-05T00:00:00'},
+                {'event_type': 'commented', 'author': 'alice', 'event_date': '2020-01-03T00:00:00'},
+                {'event_type': 'cross-referenced', 'event_date': '2020-01-04T00:00:00'},
+            ],
+        }),
+        Issue({
+            'creator': 'bob', 'state': 'closed', 'assignees': ['bob'],
+            'created_date': '2019-12-01T00:00:00',
+        }),
+    ]
+
+
+class TestContributorIndex(unittest.TestCase):
+
+    def test_build(self):
+        index = ContributorIndex.build(_issues())
+
+        bob = index.get('bob')
+        self.assertEqual(bob.events_by_type, {'commented': 1, 'labeled': 1})
+        self.assertEqual(bob.issues_created, 1)
+        self.assertEqual(bob.assignments, 2)
+        self.assertEqual(bob.first_activity, datetime(2019, 12, 1))
+        self.assertEqual(bob.last_activity, datetime(2020, 1, 5))
+
+        self.assertEqual(index.get('alice').total_events, 1)
+        self.assertIsNone(index.get('carol'))
+        # The event without an author still counts towards the total
+        self.assertEqual(index.total_events(), 4)
+
+    def test_top(self):
+        index = ContributorIndex.build(_issues())
+        self.assertEqual([s.user for s in index.top(1)], ['bob'])
+        self.assertEqual([s.user for s in index.top(2, key=lambda s: -s.assignments)], ['alice', 'bob'])
+
+    def test_persisted_next_to_data_file(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            data_path = os.path.join(tmp_dir, 'issues.json')
+            with open(data_path, 'w') as fout:
+                fout.write('[]')
+
+            built = ContributorIndex.load_or_build(_issues(), data_path)
+            self.assertTrue(os.path.isfile(ContributorIndex.cache_path(data_path)))
+
+            # Served from disk without looking at the issues
+            loaded = ContributorIndex.load_or_build([], data_path)
+            self.assertEqual(loaded.get('bob').to_json(), built.get('bob').to_json())
+            self.assertEqual(loaded.total_events(), 4)
+
+            # Changing the data file invalidates the persisted index
+            with open(data_path, 'w') as fout:
+                fout.write('[ ]')
+            self.assertIsNone(ContributorIndex.load(data_path))
+            self.assertEqual(len(ContributorIndex.load_or_build([], data_path)), 0)
+
+    def test_load_missing(self):
+        self.assertIsNone(ContributorIndex.load('/does/not/exist.json'))
+
+
+if __name__ == '__main__':
+    unittest.main()
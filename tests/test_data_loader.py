@@ -1,5 +1,11 @@
 import unittest
+import asyncio
 import json
+import threading
+import time
+import gzip
+import os
+import tempfile
 from unittest.mock import patch, mock_open
 import data_loader
 from model import Issue
@@ -10,6 +16,8 @@ class TestDataLoader(unittest.TestCase):
         # We have to clear the cache before every test, otherwise
         # the tests will interfere with each other.
         data_loader._ISSUES = None
+        data_loader._DATASETS.clear()
+        data_loader._TIMELINES.clear()
 
     @patch('config.get_parameter')
     @patch('builtins.open', new_callable=mock_open, read_data='[{"title": "fresh", "state": "open"}]')
@@ -51,5 +59,179 @@ class TestDataLoader(unittest.TestCase):
         dl = data_loader.DataLoader()
         self.assertEqual(dl.data_path, "test_data.json")
 
+    def test_timelines_cached_per_dataset(self):
+        # Timelines are only rebuilt when a different dataset is loaded
+        data_loader._ISSUES = [Issue({"number": 7, "state": "open"})]
+        dl = data_loader.DataLoader()
+        timelines = dl.get_timelines()
+
+        self.assertIsNotNone(timelines.get(7))
+        self.assertIs(dl.get_timelines(), timelines)
+
+        data_loader._ISSUES = [Issue({"number": 8, "state": "open"})]
+        self.assertIsNotNone(dl.get_timelines().get(8))
+
+    def test_find_issues_in_memory(self):
+        data_loader._ISSUES = [
+            Issue({"number": 1, "state": "open", "labels": ["bug"], "creator": "a"}),
+            Issue({"number": 2, "state": "closed", "labels": ["bug"], "creator": "b"}),
+        ]
+        dl = data_loader.DataLoader()
+        dl.storage = 'memory'
+
+        self.assertEqual([i.number for i in dl.find_issues(label="bug")], [1, 2])
+        self.assertEqual([i.number for i in dl.find_issues(state="closed", creator="b")], [2])
+        self.assertIsNone(dl.get_store())
+
+    def test_loading_compressed(self):
+        # Compressed files are streamed instead of read in one go
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'issues.json.gz')
+            with gzip.open(path, 'wt') as fout:
+                json.dump([{"title": "zipped", "state": "closed"}], fout)
+
+            dl = data_loader.DataLoader()
+            dl.data_path = path
+            issues = dl.get_issues()
+
+        self.assertEqual(len(issues), 1)
+        self.assertEqual(issues[0].title, "zipped")
+
+    def test_memory_budget_spills_texts(self):
+        # The budget holds one long text, later long texts and comments go to disk
+        body = "x" * 200
+        records = [{"number": i, "state": "open", "text": f"{i} {body}", "title": "short",
+                    "events": [{"event_type": "commented", "comment": f"comment {i} {body}"}]}
+                   for i in range(3)]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'issues.json')
+            with open(path, 'w') as fout:
+                json.dump(records, fout)
+
+            dl = data_loader.DataLoader()
+            dl.data_path = path
+            dl.memory_budget = 300 / 2**20
+            issues = dl.get_issues()
+
+            self.assertIsInstance(issues[0]._text, str)
+            self.assertNotIsInstance(issues[1]._text, str)
+            self.assertNotIsInstance(issues[2].events[0]._comment, str)
+            self.assertEqual([issue.text for issue in issues], [r["text"] for r in records])
+            self.assertEqual(issues[2].events[0].comment, records[2]["events"][0]["comment"])
+            self.assertEqual(issues[0].title, "short")
+
+    def test_sample_streams_records(self):
+        # Without loaded issues, the sample is drawn while streaming the file
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'issues.json')
+            with open(path, 'w') as fout:
+                json.dump([{"number": i, "state": "open" if i % 4 else "closed"} for i in range(40)], fout)
+
+            dl = data_loader.DataLoader()
+            dl.data_path = path
+            sample = dl.get_sample(8, seed=1)
+
+        self.assertIsNone(data_loader._ISSUES)
+        self.assertEqual(len(sample), 8)
+        self.assertEqual(sample.population, 40)
+        self.assertTrue(all(isinstance(issue, Issue) for issue in sample.items))
+
+    def test_sample_of_loaded_issues(self):
+        data_loader._ISSUES = [Issue({"number": i, "state": "open"}) for i in range(5)]
+        sample = data_loader.DataLoader().get_sample(3, seed=1)
+        self.assertEqual(sample.population, 5)
+        self.assertTrue(all(issue in data_loader._ISSUES for issue in sample.items))
+
+    def _slow_load(self, calls):
+        def load(dl):
+            calls.append(dl.data_path)
+            time.sleep(0.05)
+            return [Issue({"title": dl.data_path, "state": "open"})]
+        return load
+
+    @patch('config.get_parameter', return_value="dummy.json")
+    def test_concurrent_callers_share_one_load(self, mock_conf):
+        calls = []
+        results = []
+        with patch.object(data_loader.DataLoader, '_load', self._slow_load(calls)):
+            threads = [threading.Thread(target=lambda: results.append(data_loader.DataLoader().get_issues()))
+                       for _ in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(r is results[0] for r in results))
+
+    @patch('config.get_parameter', return_value="dummy.json")
+    def test_async_callers_share_one_load(self, mock_conf):
+        calls = []
+
+        async def load_many():
+            return await asyncio.gather(*[data_loader.DataLoader().get_issues_async() for _ in range(5)])
+
+        with patch.object(data_loader.DataLoader, '_load', self._slow_load(calls)):
+            results = asyncio.run(load_many())
+            # Once loaded, the cached issues are returned right away
+            cached = asyncio.run(data_loader.DataLoader().get_issues_async())
+
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(r is results[0] for r in results))
+        self.assertIs(cached, results[0])
+        self.assertEqual(data_loader._IN_FLIGHT, {})
+
+    @patch('config.get_parameter')
+    def test_named_datasets(self, mock_conf):
+        mock_conf.side_effect = lambda name, default=None: (
+            {"poetry": "poetry.json", "pip": "pip.json"} if name == 'ENPM611_PROJECT_DATASETS' else default)
+        calls = []
+        with patch.object(data_loader.DataLoader, '_load', self._slow_load(calls)):
+            poetry = data_loader.DataLoader('poetry').get_issues()
+            pip = data_loader.DataLoader('pip').get_issues()
+            data_loader.DataLoader('poetry').get_issues()
+
+        self.assertEqual(calls, ["poetry.json", "pip.json"])
+        self.assertEqual(poetry[0].title, "poetry.json")
+        self.assertEqual(pip[0].title, "pip.json")
+        # Named datasets do not replace the default one
+        self.assertIsNone(data_loader._ISSUES)
+
+        with self.assertRaises(ValueError):
+            data_loader.DataLoader('unknown')
+
+    @patch('config.get_parameter')
+    def test_derived_data_per_dataset(self, mock_conf):
+        mock_conf.side_effect = lambda name, default=None: (
+            {"poetry": "poetry.json", "pip": "pip.json"} if name == 'ENPM611_PROJECT_DATASETS' else default)
+        data_loader._DATASETS["poetry"] = [Issue({"number": 1, "state": "open"})]
+        data_loader._DATASETS["pip"] = [Issue({"number": 2, "state": "open"})]
+        poetry = data_loader.DataLoader("poetry").get_timelines()
+        pip = data_loader.DataLoader("pip").get_timelines()
+
+        # Switching between datasets neither rebuilds nor mixes up their timelines
+        self.assertIs(data_loader.DataLoader("poetry").get_timelines(), poetry)
+        self.assertIs(data_loader.DataLoader("pip").get_timelines(), pip)
+        self.assertIsNotNone(poetry.get(1))
+        self.assertIsNone(poetry.get(2))
+
+    def test_sqlite_store_per_dataset(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            datasets = {}
+            for name, count in (("poetry", 1), ("pip", 2)):
+                datasets[name] = os.path.join(tmp_dir, f"{name}.json")
+                with open(datasets[name], "w") as fout:
+                    json.dump([{"number": n, "state": "open"} for n in range(count)], fout)
+            params = {'ENPM611_PROJECT_DATASETS': datasets, 'ENPM611_PROJECT_STORAGE': 'sqlite'}
+            with patch('config.get_parameter', side_effect=lambda name, default=None: params.get(name, default)):
+                poetry = data_loader.DataLoader("poetry").get_store()
+                pip = data_loader.DataLoader("pip").get_store()
+                # Switching datasets keeps the other dataset's connection open and cached
+                self.assertIs(data_loader.DataLoader("poetry").get_store(), poetry)
+                self.assertEqual((poetry.count_issues(), pip.count_issues()), (1, 2))
+            data_loader._STORES.clear()
+            poetry.close()
+            pip.close()
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
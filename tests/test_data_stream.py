@@ -0,0 +1,128 @@
+import bz2
+import gzip
+import io
+import json
+import lzma
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import data_stream
+
+RECORDS = [{'title': 'first', 'labels': ['a', 'b']}, {'title': 'sec]ond, "quoted"', 'n': 12}, {}]
+
+
+class TestDataStream(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _write(self, name, opener):
+        path = os.path.join(self.tmp_dir.name, name)
+        with opener(path, 'wt', encoding='utf-8') as fout:
+            json.dump(RECORDS, fout)
+        return path
+
+    def test_iter_json_array_small_chunks(self):
+        # Chunks smaller than an element force incremental refills
+        text = ' \n' + json.dumps(RECORDS, indent=2) + '\n'
+        self.assertEqual(list(data_stream.iter_json_array(io.StringIO(text), chunk_size=3)), RECORDS)
+
+    def test_iter_json_array_empty(self):
+        self.assertEqual(list(data_stream.iter_json_array(io.StringIO('[ ]'))), [])
+
+    def test_iter_json_array_errors(self):
+        with self.assertRaises(ValueError):
+            list(data_stream.iter_json_array(io.StringIO('{"a": 1}')))
+        with self.assertRaises(ValueError):
+            list(data_stream.iter_json_array(io.StringIO('[{"a": 1}, {"b"')))
+
+    def test_iter_json_array_rejects_malformed_separators(self):
+        for text in ('[1,]', '[1 2]', '[,1]', '[1,,2]', '[{"a": 1} {"b": 2}]'):
+            with self.subTest(text=text):
+                with self.assertRaises(ValueError):
+                    json.loads(text)
+                with self.assertRaises(ValueError):
+                    list(data_stream.iter_json_array(io.StringIO(text), chunk_size=2))
+        self.assertEqual(list(data_stream.iter_json_array(io.StringIO('[ 1 , 2 ]'), chunk_size=2)), [1, 2])
+
+    def test_detect_by_extension_and_magic(self):
+        gz_path = self._write('issues.json.gz', gzip.open)
+        self.assertEqual(data_stream.detect_compression(gz_path), 'gzip')
+
+        # No telling extension: falls back to the magic bytes
+        renamed = os.path.join(self.tmp_dir.name, 'issues.data')
+        os.rename(self._write('issues.json.xz', lzma.open), renamed)
+        self.assertEqual(data_stream.detect_compression(renamed), 'xz')
+
+        plain = self._write('issues.json', open)
+        self.assertIsNone(data_stream.detect_compression(plain))
+        self.assertIsNone(data_stream.detect_compression(os.path.join(self.tmp_dir.name, 'missing')))
+
+    def test_streams_compressed_files(self):
+        for name, opener in [('a.json.gz', gzip.open), ('b.json.xz', lzma.open), ('c.json.bz2', bz2.open)]:
+            path = self._write(name, opener)
+            with data_stream.open_text(path, data_stream.detect_compression(path)) as fin:
+                self.assertEqual(list(data_stream.iter_json_array(fin, chunk_size=8)), RECORDS)
+
+    def test_follow_jsonl(self):
+        path = os.path.join(self.tmp_dir.name, 'updates.jsonl')
+        with open(path, 'w') as fout:
+            fout.write('{"n": 1}\n\nnot json\n{"n": 2')
+        follower = data_stream.follow_jsonl(path, interval=0)
+
+        # Complete lines are yielded, the idle file yields None
+        self.assertEqual(next(follower), {'n': 1})
+        self.assertIsNone(next(follower))
+        with open(path, 'a') as fout:
+            fout.write('}\n')
+        self.assertEqual(next(follower), {'n': 2})
+        self.assertIsNone(next(follower))
+
+        # A truncated file is read again from the start
+        with open(path, 'w') as fout:
+            fout.write('{"n": 3}\n')
+        self.assertEqual(next(follower), {'n': 3})
+
+    def test_follow_jsonl_waits_for_missing_file(self):
+        path = os.path.join(self.tmp_dir.name, 'later.jsonl')
+        follower = data_stream.follow_jsonl(path, interval=0, from_start=False)
+        self.assertIsNone(next(follower))
+        with open(path, 'w') as fout:
+            fout.write('{"n": 1}\n')
+        self.assertEqual(next(follower), {'n': 1})
+
+    def test_follow_jsonl_reads_in_chunks(self):
+        path = os.path.join(self.tmp_dir.name, 'updates.jsonl')
+        with open(path, 'w') as fout:
+            fout.writelines(f'{{"n": {n}}}\n' for n in range(100))
+        reads = []
+        real_open = open
+
+        def spy_open(*args, **kwargs):
+            fin = real_open(*args, **kwargs)
+            real_read = fin.read
+            fin.read = lambda size=-1: reads.append(size) or real_read(size)
+            return fin
+
+        with mock.patch('data_stream.open', spy_open, create=True):
+            follower = data_stream.follow_jsonl(path, interval=0, chunk_size=32)
+            # The first records arrive before the rest of the backlog is read
+            self.assertEqual(next(follower), {'n': 0})
+            self.assertEqual(reads, [32])
+            records = [next(follower) for _ in range(99)]
+        self.assertEqual(records, [{'n': n} for n in range(1, 100)])
+        self.assertTrue(all(size <= 32 for size in reads))
+        self.assertIsNone(next(follower))
+
+    def test_unsupported_compression(self):
+        with self.assertRaises(ValueError):
+            data_stream.open_text('x', 'rar')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+import data_loader
+from dataset_watcher import DatasetWatcher
+
+
+class TestDatasetWatcher(unittest.TestCase):
+
+    def setUp(self):
+        data_loader._ISSUES = None
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'issues.json')
+        self._write(['first'])
+        patcher = patch('config.get_parameter', side_effect=lambda name, default=None: (
+            self.path if name == 'ENPM611_PROJECT_DATA_PATH' else default))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        data_loader._ISSUES = None
+        self.tmp_dir.cleanup()
+
+    def _write(self, titles):
+        with open(self.path, 'w') as fout:
+            json.dump([{'title': t, 'state': 'open'} for t in titles], fout)
+
+    def _titles(self):
+        return [i.title for i in data_loader.DataLoader().get_issues()]
+
+    def test_check_once_swaps_dataset(self):
+        self.assertEqual(self._titles(), ['first'])
+        watcher = DatasetWatcher(interval=60)
+        self.assertFalse(watcher.check_once())
+
+        self._write(['second', 'third'])
+        self.assertTrue(watcher.check_once())
+        self.assertEqual(self._titles(), ['second', 'third'])
+        self.assertEqual(watcher.reloads, 1)
+        self.assertFalse(watcher.check_once())
+
+    def test_reload_swaps_sqlite_store(self):
+        loader = data_loader.DataLoader()
+        loader.storage = 'sqlite'
+        store = loader.get_store()
+        self.addCleanup(data_loader._STORES.clear)
+        watcher = DatasetWatcher(interval=60)
+        watcher.loader = loader
+
+        self._write(['second', 'third'])
+        with patch.object(loader, '_load') as load:
+            watcher.reload()
+        # The issues were never loaded into memory, so they are not reloaded either
+        load.assert_not_called()
+
+        # Ingested by the watcher and swapped in; readers of the old store are not cut off
+        swapped = loader.get_store()
+        self.assertIsNot(swapped, store)
+        self.assertEqual(swapped.count_issues(), 2)
+        self.assertEqual(store.count_issues(), 1)
+        store.close()
+        swapped.close()
+
+    def test_broken_file_keeps_previous_dataset(self):
+        old = data_loader.DataLoader().get_issues()
+        watcher = DatasetWatcher(interval=60)
+        with open(self.path, 'w') as fout:
+            fout.write('[{"title": "half wri')
+
+        self.assertFalse(watcher.check_once())
+        self.assertIs(data_loader.DataLoader().get_issues(), old)
+
+        # Retried once the file is complete
+        self._write(['complete'])
+        self.assertTrue(watcher.check_once())
+        self.assertEqual(self._titles(), ['complete'])
+
+    def test_background_thread(self):
+        self._titles()
+        with DatasetWatcher(interval=0.01) as watcher:
+            self._write(['background', 'reload'])
+            deadline = time.time() + 5
+            while watcher.reloads == 0 and time.time() < deadline:
+                time.sleep(0.01)
+        self.assertEqual(self._titles(), ['background', 'reload'])
+        self.assertIsNone(watcher._thread)
+
+
+if __name__ == '__main__':
+    unittest.main()
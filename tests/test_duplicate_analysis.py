@@ -0,0 +1,63 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from duplicate_analysis import DuplicateAnalysis
+from model import Issue
+
+
+def _issue(number, title, text):
+    return Issue({'number': number, 'title': title, 'text': text, 'state': 'open'})
+
+
+def _issues():
+    body = ('When I run poetry install inside a docker container the resolver hangs forever '
+            'and never prints any progress, even with verbose output enabled')
+    return [
+        _issue(1, 'Install hangs in docker', body),
+        _issue(2, 'Dark mode for the docs', 'The documentation website should offer a dark color theme'),
+        _issue(3, 'Install hangs in docker', body + ' on linux'),
+    ]
+
+
+class TestDuplicateAnalysis(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.data_path = os.path.join(self.tmp.name, 'issues.json')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_find_duplicates(self):
+        pairs = DuplicateAnalysis().find_duplicates(_issues())
+        self.assertEqual([(a.number, b.number) for _, a, b in pairs], [(1, 3)])
+        self.assertGreater(pairs[0][0], 0.5)
+
+    def test_signatures_are_cached(self):
+        issues = _issues()
+        first = DuplicateAnalysis().signatures(issues, self.data_path)
+        self.assertTrue(os.path.exists(DuplicateAnalysis.cache_path(self.data_path)))
+
+        # Only the edited issue is hashed again
+        issues[1].text = 'The documentation website should offer a high contrast theme'
+        analysis = DuplicateAnalysis()
+        with patch.object(analysis.hasher, 'signature', wraps=analysis.hasher.signature) as signature:
+            second = analysis.signatures(issues, self.data_path)
+        self.assertEqual(signature.call_count, 1)
+        self.assertTrue((first[[0, 2]] == second[[0, 2]]).all())
+        self.assertFalse((first[1] == second[1]).all())
+
+    @patch('duplicate_analysis.DataLoader')
+    def test_run(self, mock_loader):
+        mock_loader.return_value.get_issues.return_value = _issues()
+        with patch('builtins.print') as mock_print:
+            DuplicateAnalysis().run()
+        output = '\n'.join(str(c.args[0]) for c in mock_print.call_args_list if c.args)
+        self.assertIn('Found 1 likely duplicate pairs among 3 issues', output)
+        self.assertIn('#3 "Install hangs in docker"', output)
+
+
+if __name__ == '__main__':
+    unittest.main()
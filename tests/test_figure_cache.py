@@ -0,0 +1,49 @@
+import io
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from figure_cache import FigureCache, figure_key
+
+
+class TestFigureCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / 'figure.png'
+        self.calls = 0
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _draw(self):
+        self.calls += 1
+        self.path.write_bytes(b'png')
+
+    def test_figure_key(self):
+        style = {'dpi': 200}
+        self.assertEqual(figure_key([1, 2], style), figure_key([1, 2], {'dpi': 200}))
+        self.assertNotEqual(figure_key([1, 2], style), figure_key([2, 1], style))
+        self.assertNotEqual(figure_key([1, 2], style), figure_key([1, 2], {'dpi': 100}))
+
+    def test_unchanged_figure_is_reused(self):
+        cache = FigureCache(self.path)
+        self.assertTrue(cache.render('a', self._draw))
+        with patch('sys.stdout', io.StringIO()) as output:
+            self.assertFalse(FigureCache(self.path).render('a', self._draw))
+        self.assertEqual(self.calls, 1)
+        self.assertIn('Figure unchanged', output.getvalue())
+
+    def test_rerenders_on_change_or_missing_image(self):
+        cache = FigureCache(self.path)
+        cache.render('a', self._draw)
+        self.assertTrue(cache.render('b', self._draw))
+        os.remove(self.path)
+        self.assertTrue(cache.render('b', self._draw))
+        self.assertEqual(self.calls, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
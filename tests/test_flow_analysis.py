@@ -0,0 +1,114 @@
+import io
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import matplotlib
+
+# Force a headless backend so plotting doesn't require a GUI during tests
+matplotlib.use("Agg")
+
+import numpy as np
+
+import flow_analysis
+from model import Issue
+from timeline import TimelineIndex
+
+
+def _dates(*values):
+    return np.array(values, dtype="datetime64[ns]")
+
+
+class FlowSeriesTests(unittest.TestCase):
+    def test_bins_per_week_and_accumulates_backlog(self):
+        # 2020-01-06 and 2020-01-13 are Mondays
+        created = _dates("2020-01-06", "2020-01-08", "2020-01-14", "NaT")
+        closed = _dates("2020-01-12", "2020-01-20")
+        flow = flow_analysis.flow_series(created, closed, period="week")
+
+        self.assertListEqual([str(d.date()) for d in flow.index], ["2020-01-06", "2020-01-13", "2020-01-20"])
+        self.assertListEqual(list(flow["opened"]), [2, 1, 0])
+        self.assertListEqual(list(flow["closed"]), [1, 0, 1])
+        self.assertListEqual(list(flow["backlog"]), [1, 2, 1])
+
+    def test_reopens_reenter_the_backlog(self):
+        created = _dates("2020-01-15")
+        closed = _dates("2020-02-01", "2020-04-01")
+        reopened = _dates("2020-03-10")
+        flow = flow_analysis.flow_series(created, closed, reopened, period="month")
+
+        self.assertListEqual(list(flow["reopened"]), [0, 0, 1, 0])
+        self.assertListEqual(list(flow["net"]), [1, -1, 1, -1])
+        self.assertListEqual(list(flow["backlog"]), [1, 0, 1, 0])
+
+    def test_empty_input(self):
+        flow = flow_analysis.flow_series(_dates(), _dates(), period="day")
+        self.assertEqual(len(flow), 0)
+        self.assertListEqual(list(flow.columns), ["opened", "reopened", "closed", "net", "backlog"])
+
+    def test_age_distribution(self):
+        ages = flow_analysis.age_distribution(_dates("2020-12-30", "2020-12-01", "2018-01-01", "NaT"),
+                                              np.datetime64("2021-01-01"))
+        self.assertEqual(ages["< 1 week"], 1)
+        self.assertEqual(ages["1-4 weeks"], 0)
+        self.assertEqual(ages["1-3 months"], 1)
+        self.assertEqual(ages["> 2 years"], 1)
+        self.assertEqual(ages.sum(), 3)
+
+
+class FlowAnalysisTests(unittest.TestCase):
+    def setUp(self):
+        self.issues = [
+            Issue({
+                "number": 1, "state": "closed", "created_date": "2020-01-01T00:00:00Z",
+                "events": [
+                    {"event_type": "closed", "event_date": "2020-01-09T00:00:00Z"},
+                    {"event_type": "reopened", "event_date": "2020-01-15T00:00:00Z"},
+                    {"event_type": "closed", "event_date": "2020-02-01T00:00:00Z"},
+                ],
+            }),
+            Issue({"number": 2, "state": "open", "created_date": "2020-01-07T00:00:00Z"}),
+            # Closed without a close event: closed at its last update
+            Issue({"number": 3, "state": "closed", "created_date": "2019-12-20T00:00:00Z",
+                   "updated_date": "2020-01-03T00:00:00Z"}),
+        ]
+
+    def test_compute_uses_all_close_and_reopen_events(self):
+        with patch("flow_analysis.config.get_parameter", return_value="month"):
+            analysis = flow_analysis.FlowAnalysis()
+        flow, ages = analysis.compute(TimelineIndex(self.issues))
+
+        self.assertListEqual(list(flow["opened"]), [1, 2, 0])
+        self.assertListEqual(list(flow["closed"]), [0, 2, 1])
+        self.assertListEqual(list(flow["reopened"]), [0, 1, 0])
+        self.assertEqual(flow["backlog"].iloc[-1], 1)
+        # Issue 2 is 25 days old on 2020-02-01, the latest date in the data
+        self.assertEqual(ages["1-4 weeks"], 1)
+        self.assertEqual(ages.sum(), 1)
+
+    @patch("flow_analysis.plt.show")
+    def test_run_prints_and_plots(self, mock_show):
+        with tempfile.TemporaryDirectory() as tmp_dir, patch(
+            "flow_analysis.OUTPUT_PNG", Path(tmp_dir) / "flow" / "flow.png"
+        ), patch("flow_analysis.DataLoader") as loader_mock, patch(
+            "flow_analysis.config.get_parameter", return_value=None
+        ):
+            loader_mock.return_value.get_timelines.return_value = TimelineIndex(self.issues)
+            buffer = io.StringIO()
+            with patch("sys.stdout", buffer):
+                flow_analysis.FlowAnalysis().run()
+                # A second run with the same data reuses the image but still displays it
+                flow_analysis.FlowAnalysis().run()
+            self.assertTrue((Path(tmp_dir) / "flow" / "flow.png").exists())
+        self.assertEqual(mock_show.call_count, 2)
+
+        output = buffer.getvalue()
+        self.assertIn("Issue flow per week", output)
+        self.assertIn("Opened: 3, reopened: 1, closed: 3, open at the end: 1", output)
+        self.assertIn("1-4 weeks: 1", output)
+        self.assertIn("Figure unchanged, reusing", output)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+
+import numpy as np
+
+from interaction_graph import InteractionGraph
+from model import Issue
+
+
+def _issues():
+    return [
+        Issue({'number': 1, 'state': 'open', 'creator': 'alice', 'assignees': ['bob'],
+               'events': [{'author': 'bob'}, {'author': 'carol'}, {'author': None}]}),
+        Issue({'number': 2, 'state': 'closed', 'creator': 'alice',
+               'events': [{'author': 'bob'}]}),
+        Issue({'number': 3, 'state': 'open', 'creator': 'dave'}),
+    ]
+
+
+class TestInteractionGraph(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = InteractionGraph.from_issues(_issues())
+        self.row = {user: i for i, user in enumerate(self.graph.users)}
+
+    def test_incidence(self):
+        self.assertEqual(self.graph.shape, (4, 3))
+        self.assertListEqual(self.graph.users, ['alice', 'bob', 'carol', 'dave'])
+        # bob was assigned to and commented on issue 1
+        self.assertEqual(self.graph.incidence[self.row['bob'], 0], 2)
+        self.assertListEqual(list(self.graph.issue_counts()), [2, 2, 1, 1])
+
+    def test_collaboration_and_degree(self):
+        shared = self.graph.collaboration()
+        self.assertEqual(shared[self.row['alice'], self.row['bob']], 2)
+        self.assertEqual(shared[self.row['bob'], self.row['carol']], 1)
+        self.assertEqual(shared[self.row['alice'], self.row['alice']], 0)
+        self.assertEqual((shared != shared.T).nnz, 0)
+
+        collaborators, total = self.graph.degree()
+        self.assertListEqual(list(collaborators), [2, 2, 2, 0])
+        self.assertListEqual(list(total), [3, 3, 2, 0])
+
+    def test_pagerank(self):
+        scores = self.graph.pagerank()
+        self.assertAlmostEqual(scores.sum(), 1.0)
+        # alice and bob are symmetric and more central than carol; dave is isolated
+        self.assertAlmostEqual(scores[self.row['alice']], scores[self.row['bob']])
+        self.assertGreater(scores[self.row['alice']], scores[self.row['carol']])
+        self.assertGreater(scores[self.row['carol']], scores[self.row['dave']])
+
+    def test_pagerank_of_a_star(self):
+        # The hub of a star has the highest score
+        issues = [Issue({'number': i, 'state': 'open', 'creator': 'hub', 'assignees': [f'user{i}']})
+                  for i in range(5)]
+        graph = InteractionGraph.from_issues(issues)
+        scores = graph.pagerank()
+        self.assertEqual(int(np.argmax(scores)), graph.users.index('hub'))
+        self.assertAlmostEqual(scores.sum(), 1.0)
+
+    def test_centrality(self):
+        top = self.graph.centrality(2)
+        self.assertListEqual(list(top['user']), ['alice', 'bob'])
+        self.assertListEqual(list(top['collaborators']), [2, 2])
+        self.assertEqual(len(self.graph.centrality()), 4)
+        self.assertEqual(len(self.graph.centrality(0)), 0)
+
+    def test_collaborators_of(self):
+        self.assertListEqual(self.graph.collaborators_of('bob', 5), [('alice', 2), ('carol', 1)])
+        self.assertListEqual(self.graph.collaborators_of('dave', 5), [])
+        self.assertListEqual(self.graph.collaborators_of('nobody', 5), [])
+
+    def test_empty(self):
+        graph = InteractionGraph.from_issues([])
+        self.assertEqual(graph.shape, (0, 0))
+        self.assertEqual(len(graph.pagerank()), 0)
+        self.assertEqual(len(graph.centrality(5)), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
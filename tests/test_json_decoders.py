@@ -0,0 +1,35 @@
+import json
+import unittest
+from unittest.mock import patch
+
+import json_decoders
+
+
+class TestJsonDecoders(unittest.TestCase):
+
+    def test_stdlib_always_available(self):
+        decoders = json_decoders.available_decoders()
+        self.assertIs(decoders['json'], json.loads)
+        self.assertEqual(list(decoders)[-1], 'json')
+
+    def test_explicit_stdlib(self):
+        name, loads = json_decoders.get_decoder('json')
+        self.assertEqual(name, 'json')
+        self.assertEqual(loads('[{"a": 1}]'), [{'a': 1}])
+
+    def test_auto_prefers_fastest_installed(self):
+        name, _ = json_decoders.get_decoder('auto')
+        self.assertEqual(name, list(json_decoders.available_decoders())[0])
+
+    @patch('json_decoders.importlib.import_module', side_effect=ImportError)
+    def test_falls_back_when_not_installed(self, mock_import):
+        self.assertEqual(json_decoders.get_decoder('orjson')[0], 'json')
+        self.assertEqual(json_decoders.get_decoder(None)[0], 'json')
+
+    def test_unknown_name_falls_back(self):
+        name, loads = json_decoders.get_decoder('yaml')
+        self.assertIn(name, json_decoders.available_decoders())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,7 @@ import unittest
 from unittest.mock import patch, MagicMock, mock_open
 import sys
 import os
+import tempfile
 import matplotlib
 
 # Use non-interactive backend to prevent GUI windows during tests
@@ -157,5 +158,115 @@ class TestKeywordAnalysis(unittest.TestCase):
                 args, _ = handle.write.call_args_list[1]
                 self.assertIn("security issue", args[0])
 
+    # ------------------------------------------------------------------
+    # 4. REGEX MODE & CANDIDATE FILTERING
+    # ------------------------------------------------------------------
+    @patch("keyword_analysis.config.get_parameter",
+           side_effect=lambda name, default=None: True if name == "regex" else r"lock\s*file")
+    def test_regex_mode(self, mock_conf):
+        """With --regex the keyword is a pattern and only candidates are scanned."""
+        issues = [
+            Issue({"title": "Lockfile broken", "text": "The lock file is stale.", "state": "open"}),
+            Issue({"title": "Unrelated", "text": "Nothing to see.", "state": "open"}),
+        ]
+
+        with tempfile.TemporaryDirectory() as tmp_dir, \
+             patch("keyword_analysis.DataLoader") as mock_loader, \
+             patch("keyword_analysis.plt.show"), \
+             patch("keyword_analysis.plt.barh") as mock_barh, \
+             patch("keyword_analysis.open", mock_open()):
+            mock_loader.return_value.get_issues.return_value = issues
+            # The trigram index is only used with a data file to save it next to
+            mock_loader.return_value.data_path = os.path.join(tmp_dir, "issues.json")
+            with open(mock_loader.return_value.data_path, "w") as fout:
+                fout.write("[]")
+            ka = KeywordAnalysis()
+            self.assertTrue(ka.REGEX)
+            self.assertEqual(ka._candidate_issues(), ([issues[0]], 2))
+            ka.run()
+
+            counts = list(mock_barh.call_args[0][1])
+            self.assertEqual(counts, [2])
+
+    @patch("keyword_analysis.config.get_parameter",
+           side_effect=lambda name, default=None: True if name == "regex" else "(unclosed")
+    def test_invalid_regex_exits(self, mock_conf):
+        with self.assertRaises(SystemExit):
+            KeywordAnalysis()
+
+    @patch("keyword_analysis.config.get_parameter", return_value="bug")
+    def test_many_results_are_aggregated(self, mock_conf):
+        """Above _MAX_BARS matches the chart shows summaries, not a bar per issue."""
+        issues = [
+            Issue({"title": f"Issue {i}", "text": "bug " * (i % 7 + 1), "state": "open",
+                   "created_date": f"202{i % 3}-0{i % 9 + 1}-15T10:00:00Z"})
+            for i in range(60)
+        ]
+
+        with patch("keyword_analysis.DataLoader") as mock_loader, \
+             patch("keyword_analysis.plt.show") as mock_show, \
+             patch("keyword_analysis.plt.barh") as mock_barh, \
+             patch("keyword_analysis.open", mock_open()):
+            mock_loader.return_value.get_issues.return_value = issues
+            ka = KeywordAnalysis()
+            ka.run()
+
+            mock_barh.assert_not_called()
+            self.assertTrue(mock_show.called)
+
+            results = [{"issue": issue, "count": i % 7 + 1} for i, issue in enumerate(issues)]
+            summary = ka._aggregate(results)
+            self.assertEqual(len(summary["top_counts"]), 20)
+            self.assertEqual(summary["top_counts"], sorted(summary["top_counts"], reverse=True))
+            self.assertEqual(summary["top_counts"][0], 7)
+            frequencies, _ = summary["histogram"]
+            self.assertEqual(frequencies.sum(), 60)
+            self.assertEqual(summary["period_unit"], "M")
+            self.assertEqual(summary["matches_per_period"].sum(), sum(r["count"] for r in results))
+
+    # ------------------------------------------------------------------
+    # 5. COMMENT SEARCH
+    # ------------------------------------------------------------------
+    @patch("keyword_analysis.config.get_parameter",
+           side_effect=lambda name, default=None: True if name == "comments" else "crash")
+    def test_search_comments_of_loaded_issues(self, mock_conf):
+        """Comments are searched issue by issue with author and date attribution."""
+        issues = [
+            Issue({"number": 1, "title": "First", "state": "open", "events": [
+                {"author": "alice", "event_date": "2020-01-01", "comment": "It does not crash for me. Works."},
+                {"author": "bob", "event_type": "labeled"},
+            ]}),
+            Issue({"number": 2, "title": "Second", "state": "open", "events": [
+                {"author": "carol", "event_date": "2020-02-01", "comment": "Crash, crash! ✓"},
+            ]}),
+        ]
+        loader = MagicMock(storage="memory")
+        loader.get_issues.return_value = issues
+
+        ka = KeywordAnalysis()
+        self.assertTrue(ka.COMMENTS)
+        results, scanned, elapsed = ka._search_comments(loader)
+
+        # The data file is not read a second time
+        loader.iter_records.assert_not_called()
+        self.assertEqual([(r["number"], r["author"], r["count"]) for r in results],
+                         [(1, "alice", 1), (2, "carol", 2)])
+        self.assertEqual(results[0]["sentences"], ["It does not crash for me."])
+        self.assertEqual(results[1]["date"], issues[1].events[0].event_date)
+        # Bytes, not characters
+        self.assertEqual(scanned, len("It does not crash for me. Works.") + len("Crash, crash! ✓".encode("utf-8")))
+
+    @patch("keyword_analysis.config.get_parameter",
+           side_effect=lambda name, default=None: True if name == "comments" else "crash")
+    def test_run_reports_comments(self, mock_conf):
+        with patch("keyword_analysis.DataLoader") as mock_loader, \
+             patch("keyword_analysis.plt.show"), \
+             patch("keyword_analysis.open", mock_open()) as mock_file:
+            mock_loader.return_value.get_issues.return_value = [
+                Issue({"number": 3, "title": "T", "state": "open", "events": [{"author": "dan", "comment": "crash"}]})]
+            KeywordAnalysis().run()
+
+            mock_file.assert_called_once_with("keyword_comment_results.txt", "w", encoding="utf-8")
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -10,6 +10,7 @@ import matplotlib
 # Force non-interactive backend during tests to avoid GUI windows
 matplotlib.use('Agg')
 from label_analysis import LabelAnalysis
+from timeline import IssueTimeline
 
 class TestLabelAnalysis(unittest.TestCase):
     @patch('label_analysis.plt.show')
@@ -128,6 +129,95 @@ class TestLabelAnalysis(unittest.TestCase):
         self.assertIn('bug', labels_arg)
         self.assertEqual(counts_arg[labels_arg.index('bug')], 1)
 
+    def test_resolution_percentiles_by_label(self):
+        """Median/p90/p99 are computed per label over closed issues only."""
+        issues = [
+            {'labels': ['bug'], 'state': 'closed', 'created_date': '2020-01-01T00:00:00Z', 'updated_date': '2020-01-31T10:33:36Z'},
+            {'labels': ['bug', {'name': 'docs'}], 'state': 'closed', 'created_date': '2020-01-01T00:00:00Z', 'updated_date': '2020-03-01T21:07:12Z'},
+            {'labels': ['bug'], 'state': 'open', 'created_date': '2020-01-01T00:00:00Z', 'updated_date': '2021-01-01T00:00:00Z'},
+        ]
+
+        la = LabelAnalysis()
+        la.issues = issues
+        result = la.resolution_percentiles(by='label')
+
+        self.assertListEqual(list(result.columns), ['median', 'p90', 'p99', 'count'])
+        self.assertEqual(result.loc['bug', 'count'], 2)
+        self.assertAlmostEqual(result.loc['bug', 'median'], 1.5, places=2)
+        self.assertAlmostEqual(result.loc['docs', 'p99'], 2.0, places=2)
+
+    def test_resolution_percentiles_by_month(self):
+        """Issues with several labels are counted once per creation month."""
+        issues = [
+            {'labels': ['a', 'b'], 'state': 'closed', 'created_date': '2020-01-05T00:00:00Z', 'updated_date': '2020-01-06T00:00:00Z'},
+            {'labels': [], 'state': 'closed', 'created_date': '2020-02-05T00:00:00Z', 'updated_date': '2020-02-06T00:00:00Z'},
+            {'labels': ['a'], 'state': 'closed', 'created_date': None, 'updated_date': '2020-02-06T00:00:00Z'},
+        ]
+
+        la = LabelAnalysis()
+        la.issues = issues
+        result = la.resolution_percentiles(by='month')
+
+        self.assertListEqual(list(result.index), ['2020-01', '2020-02'])
+        self.assertListEqual(list(result['count']), [1, 1])
+
+    def test_resolution_uses_close_event(self):
+        """The close event is preferred over updated_date, replayed once per record."""
+        issues = [
+            {'number': '7', 'labels': ['bug'], 'state': 'closed', 'created_date': '2020-01-01T00:00:00Z', 'updated_date': '2021-01-01T00:00:00Z',
+             'events': [{'event_type': 'closed', 'event_date': '2020-01-31T10:33:36Z'}]},
+        ]
+
+        la = LabelAnalysis()
+        la.issues = issues
+        with patch('label_analysis.IssueTimeline.from_json', wraps=IssueTimeline.from_json) as from_json:
+            result = la.resolution_percentiles(by='label')
+        self.assertEqual(from_json.call_count, 1)
+        self.assertAlmostEqual(result.loc['bug', 'median'], 1.0, places=2)
+
+    def test_resolution_percentiles_empty(self):
+        """No closed issues yields an empty table rather than an error."""
+        la = LabelAnalysis()
+        la.issues = [{'labels': ['a'], 'state': 'open'}]
+        self.assertTrue(la.resolution_percentiles().empty)
+
+    @patch('config.get_parameter')
+    def test_load_data_sample(self, mock_conf):
+        """With --sample only a sample of the records is kept, with weights for estimates."""
+        params = {'sample': 5, 'seed': 3}
+        mock_conf.side_effect = lambda name, default=None: params.get(name)
+        test_data = [{'labels': ['bug'] if i % 2 else [], 'state': 'open'} for i in range(40)]
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump(test_data, f)
+            temp_path = f.name
+
+        try:
+            la = LabelAnalysis(data_path=temp_path)
+            la.load_data()
+            self.assertEqual(len(la.issues), 5)
+            self.assertEqual(la.sample.population, 40)
+            self.assertEqual(la.sample.estimate_count(lambda issue: True).value, 40)
+        finally:
+            os.unlink(temp_path)
+
+    def test_label_pairs_printed(self):
+        """Co-occurring label pairs are reported with their mean resolution time."""
+        issues = [
+            {'labels': ['bug', 'docs'], 'state': 'closed', 'created_date': '2020-01-01T00:00:00Z', 'updated_date': '2020-01-31T10:33:36Z'},
+            {'labels': ['bug', 'docs'], 'state': 'open', 'created_date': '2020-01-01T00:00:00Z', 'updated_date': '2020-02-01T00:00:00Z'},
+            {'labels': ['bug'], 'state': 'closed', 'created_date': '2020-01-01T00:00:00Z', 'updated_date': '2020-01-02T00:00:00Z'},
+        ]
+
+        la = LabelAnalysis()
+        la.issues = issues
+        with patch('builtins.print') as mock_print:
+            la._print_label_pairs(la._issue_resolution())
+        table = mock_print.call_args_list[-1][0][0]
+        self.assertIn('bug', table)
+        self.assertIn('docs', table)
+        # Two shared issues, one of which is resolved after one month
+        self.assertRegex(table, r'bug\s+docs\s+2\s+0\.67\s+1\.0\s+1\.0')
+
 
 if __name__ == '__main__':
     unittest.main()
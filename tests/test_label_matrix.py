@@ -0,0 +1,60 @@
+import unittest
+
+import numpy as np
+
+from label_matrix import LabelMatrix
+from model import Issue, LABELS
+
+LABEL_LISTS = [
+    ['bug', 'area/installer'],
+    ['bug', 'area/installer', 'bug'],
+    ['bug'],
+    ['feature', 'area/installer'],
+    [],
+]
+
+
+class TestLabelMatrix(unittest.TestCase):
+
+    def setUp(self):
+        self.matrix = LabelMatrix.build(LABEL_LISTS)
+
+    def test_incidence(self):
+        self.assertEqual(self.matrix.shape, (5, 3))
+        # Repeated labels count once
+        self.assertEqual(self.matrix.incidence.sum(), 7)
+        self.assertEqual(self.matrix.label_counts().to_dict(), {'bug': 3, 'area/installer': 3, 'feature': 1})
+
+    def test_cooccurrence_and_conditional(self):
+        code = self.matrix.vocabulary.code
+        cooccurrence = self.matrix.cooccurrence()
+        self.assertEqual(cooccurrence[code('bug'), code('area/installer')], 2)
+        self.assertEqual(cooccurrence[code('bug'), code('feature')], 0)
+        conditional = self.matrix.conditional()
+        self.assertAlmostEqual(conditional[code('feature'), code('area/installer')], 1.0)
+        self.assertAlmostEqual(conditional[code('area/installer'), code('feature')], 1 / 3)
+
+    def test_top_pairs(self):
+        months = np.array([1.0, 3.0, 5.0, np.nan, np.nan])
+        pairs = self.matrix.top_pairs(5, months=months)
+        self.assertEqual(list(pairs['label_a']), ['bug', 'area/installer'])
+        self.assertEqual(list(pairs['label_b']), ['area/installer', 'feature'])
+        self.assertEqual(list(pairs['count']), [2, 1])
+        self.assertAlmostEqual(pairs['p_b_given_a'][0], 2 / 3)
+        self.assertAlmostEqual(pairs['mean_months'][0], 2.0)
+        # No resolved issue carries both area/installer and feature
+        self.assertTrue(np.isnan(pairs['mean_months'][1]))
+
+    def test_from_issues(self):
+        issues = [Issue({'state': 'open', 'labels': labels}) for labels in LABEL_LISTS]
+        matrix = LabelMatrix.from_issues(issues)
+        self.assertIs(matrix.vocabulary, LABELS)
+        self.assertEqual(matrix.label_counts().to_dict(), {'bug': 3, 'area/installer': 3, 'feature': 1})
+
+    def test_top_pairs_limit_and_empty(self):
+        self.assertEqual(len(self.matrix.top_pairs(1)), 1)
+        self.assertTrue(LabelMatrix.build([['bug'], []]).top_pairs(5).empty)
+
+
+if __name__ == '__main__':
+    unittest.main()
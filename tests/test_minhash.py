@@ -0,0 +1,61 @@
+import unittest
+
+import numpy as np
+
+from minhash import MinHasher, shingles, estimate_similarity, candidate_pairs
+
+BASE = ('Running poetry install on a fresh checkout fails with a resolver error '
+        'because the lock file references a package version that was yanked from the index')
+
+
+class TestShingles(unittest.TestCase):
+
+    def test_word_shingles(self):
+        self.assertEqual(shingles('Lock file is Outdated', 3), {'lock file is', 'file is outdated'})
+
+    def test_short_and_empty(self):
+        self.assertEqual(shingles('Crash!', 3), {'crash'})
+        self.assertEqual(shingles('  ...  ', 3), set())
+
+
+class TestMinHash(unittest.TestCase):
+
+    def setUp(self):
+        self.hasher = MinHasher(num_perm=128)
+
+    def test_deterministic(self):
+        other = MinHasher(num_perm=128)
+        np.testing.assert_array_equal(self.hasher.signature(BASE), other.signature(BASE))
+
+    def test_similarity_estimate(self):
+        a = self.hasher.signature(BASE)
+        self.assertEqual(estimate_similarity(a, self.hasher.signature(BASE.upper())), 1.0)
+        near = self.hasher.signature(BASE + ' yesterday')
+        far = self.hasher.signature('Add a dry run flag to the update command so changes can be previewed')
+        self.assertGreater(estimate_similarity(a, near), 0.7)
+        self.assertLess(estimate_similarity(a, far), 0.2)
+
+    def test_candidate_pairs(self):
+        texts = [BASE, 'Unrelated feature request for colored output in the terminal', BASE + ' again', '']
+        signatures = self.hasher.signatures(texts)
+        self.assertEqual(signatures.shape, (4, 128))
+        self.assertEqual(candidate_pairs(signatures, 32), {(0, 2)})
+
+    def test_large_buckets_are_paired_within_a_window(self):
+        # 1000 identical (e.g. templated) texts share every bucket
+        signatures = np.tile(self.hasher.signature(BASE), (1000, 1))
+        pairs = candidate_pairs(signatures, 32, window=10)
+        self.assertEqual(len(pairs), sum(1000 - offset for offset in range(1, 11)))
+        self.assertIn((0, 10), pairs)
+        self.assertNotIn((0, 11), pairs)
+        self.assertTrue(all(i < j for i, j in pairs))
+        # Buckets no larger than the window yield all their pairs
+        self.assertEqual(len(candidate_pairs(signatures[:11], 32, window=10)), 55)
+
+    def test_bands_must_divide_signature(self):
+        with self.assertRaises(ValueError):
+            candidate_pairs(self.hasher.signatures([BASE]), 30)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,6 @@
 import unittest
 from datetime import datetime
-from model import Event, Issue, State
+from model import Event, Issue, State, LabelVocabulary, LABELS, label_namespace
 
 class TestModel(unittest.TestCase):
 
@@ -92,5 +92,30 @@ class TestModel(unittest.TestCase):
         i = Issue(None)
         self.assertIsNone(i.url)
 
+    def test_issue_labels_normalized(self):
+        # Label objects become names and every label gets a shared code
+        i = Issue({'state': 'open', 'labels': ['status/triage', {'name': 'kind/bug'}, '']})
+        self.assertEqual(i.labels, ['status/triage', 'kind/bug'])
+        self.assertEqual(i.label_codes, [LABELS.code('status/triage'), LABELS.code('kind/bug')])
+        self.assertTrue(i.has_label('kind/bug'))
+        self.assertFalse(i.has_label('kind/feature'))
+        self.assertEqual([LABELS.suffix(c) for c in i.labels_in('status/')], ['triage'])
+
+        # Reassigning the labels keeps the codes in sync
+        i.labels = ['area/docs']
+        self.assertEqual(i.label_codes, [LABELS.code('area/docs')])
+        self.assertEqual(i.labels_in('status/'), [])
+
+    def test_label_vocabulary(self):
+        vocabulary = LabelVocabulary(['bug', 'status/done', 'bug', 'status/triage'])
+        self.assertEqual(len(vocabulary), 3)
+        self.assertEqual(vocabulary.code('status/done'), 1)
+        self.assertIsNone(vocabulary.code('docs'))
+        self.assertEqual(vocabulary.name(0), 'bug')
+        self.assertEqual(vocabulary.in_namespace('status/'), {1, 2})
+        self.assertIsNone(vocabulary.namespace(0))
+        self.assertEqual(vocabulary.suffix(2), 'triage')
+        self.assertEqual(label_namespace('/odd'), None)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
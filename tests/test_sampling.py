@@ -0,0 +1,87 @@
+import random
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+import sampling
+from model import Issue
+from sampling import Reservoir, draw, STRATA
+
+
+class TestReservoir(unittest.TestCase):
+
+    def test_keeps_everything_below_size(self):
+        reservoir = Reservoir(10, random.Random(1))
+        for i in range(4):
+            reservoir.add(i)
+        self.assertEqual(reservoir.items, [0, 1, 2, 3])
+        self.assertEqual(reservoir.seen, 4)
+
+    def test_uniform(self):
+        # Every item should be kept about size / n of the time
+        hits = np.zeros(20)
+        for seed in range(2000):
+            reservoir = Reservoir(5, random.Random(seed))
+            for i in range(20):
+                reservoir.add(i)
+            self.assertEqual(len(reservoir.items), 5)
+            hits[reservoir.items] += 1
+        self.assertTrue(np.all(np.abs(hits / 2000 - 0.25) < 0.05), hits / 2000)
+
+    def test_invalid_size(self):
+        with self.assertRaises(ValueError):
+            Reservoir(0, random.Random())
+
+
+class TestSample(unittest.TestCase):
+
+    def test_complete_sample_is_exact(self):
+        sample = draw(range(10), 50, seed=3)
+        self.assertEqual(sample.population, 10)
+        self.assertEqual(sample.estimate_count(lambda i: i % 2 == 0), (5.0, 5.0, 5.0))
+        self.assertEqual(sample.estimate_mean([float(i) for i in sample.items]), (4.5, 4.5, 4.5))
+
+    def test_estimates_cover_truth(self):
+        values = list(range(10000))
+        sample = draw(values, 500, seed=7)
+        self.assertEqual(len(sample), 500)
+        self.assertTrue(np.allclose(sample.weights, 20.0))
+
+        count = sample.estimate_count(lambda i: i < 2500)
+        self.assertLessEqual(count.low, 2500)
+        self.assertGreaterEqual(count.high, 2500)
+        mean = sample.estimate_mean([i if i % 2 else np.nan for i in sample.items])
+        self.assertLessEqual(mean.low, 5000)
+        self.assertGreaterEqual(mean.high, 5000)
+
+    def test_stratified(self):
+        items = [{'state': 'open'}] * 1000 + [{'state': 'closed'}] * 10
+        sample = draw(items, 20, STRATA['state'], seed=1)
+        # The small stratum is sampled completely, the large one is weighted up
+        self.assertEqual(len(sample), 30)
+        self.assertEqual(sample.estimate_count(lambda r: r['state'] == 'closed'), (10.0, 10.0, 10.0))
+        self.assertEqual(sample.estimate_count(lambda r: r['state'] == 'open').value, 1000.0)
+
+    def test_map_keeps_weights(self):
+        sample = draw([{'state': 'open', 'number': i} for i in range(100)], 10, seed=2)
+        issues = sample.map(Issue)
+        self.assertTrue(all(isinstance(issue, Issue) for issue in issues.items))
+        self.assertEqual(issues.estimate_count(lambda issue: issue.state == 'open').value, 100.0)
+
+    def test_label_stratum(self):
+        self.assertEqual(STRATA['label']({'labels': [{'name': 'bug'}, 'docs']}), 'bug')
+        self.assertEqual(STRATA['label'](Issue({'state': 'open'})), None)
+        self.assertEqual(STRATA['state'](Issue({'state': 'open'})), 'open')
+
+    def test_sample_parameters(self):
+        params = {'sample': 100, 'stratify': 'state', 'seed': 5}
+        with patch('sampling.config.get_parameter', side_effect=lambda name, default=None: params.get(name)):
+            self.assertEqual(sampling.sample_parameters(), (100, STRATA['state'], 5))
+        # Anything that is not a positive size disables sampling
+        with patch('sampling.config.get_parameter', return_value='dummy.json'):
+            self.assertEqual(sampling.sample_parameters(), (None, None, None))
+
+
+if __name__ == '__main__':
+    unittest.main()
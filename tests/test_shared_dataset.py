@@ -0,0 +1,65 @@
+import multiprocessing
+import unittest
+
+import numpy as np
+
+from model import Issue, State
+from shared_dataset import SharedDataset, SharedDatasetView
+
+
+def _issues():
+    return [
+        Issue({'number': 1, 'state': 'open', 'title': 'Crash ✓', 'text': 'Long body',
+               'creator': 'alice', 'labels': ['kind/bug', {'name': 'area/cli'}],
+               'created_date': '2020-01-01T00:00:00Z', 'events': [{'event_type': 'closed'}]}),
+        Issue({'number': 2, 'state': 'closed', 'title': None, 'assignees': ['bob']}),
+    ]
+
+
+def _worker_titles(handle):
+    with SharedDatasetView.attach(handle) as view:
+        return [view.title(i) for i in range(len(view))], int(view.number.sum())
+
+
+class TestSharedDataset(unittest.TestCase):
+
+    def test_view_reads_columns_and_strings(self):
+        with SharedDataset(_issues()) as dataset:
+            view = SharedDatasetView.attach(dataset.handle)
+
+            self.assertEqual(len(view), 2)
+            self.assertListEqual(list(view.number), [1, 2])
+            self.assertEqual(view.state(0), State.open)
+            self.assertEqual(view.state(1), State.closed)
+            self.assertEqual(view.created_date[0], np.datetime64('2020-01-01T00:00:00'))
+            self.assertTrue(np.isnat(view.created_date[1]))
+            self.assertListEqual(list(view.n_events), [1, 0])
+            self.assertListEqual(list(view.n_assignees), [0, 1])
+
+            self.assertEqual(view.title(0), 'Crash ✓')
+            self.assertEqual(view.title(1), '')
+            self.assertEqual(view.text(0), 'Long body')
+            self.assertEqual(view.creator(0), 'alice')
+            self.assertEqual(view.labels(0), ['kind/bug', 'area/cli'])
+            self.assertEqual(view.labels(1), [])
+
+            # Views are read-only
+            with self.assertRaises(ValueError):
+                view.number[0] = 5
+            view.close()
+
+    def test_empty_dataset(self):
+        with SharedDataset([]) as dataset:
+            with SharedDatasetView.attach(dataset.handle) as view:
+                self.assertEqual(len(view), 0)
+
+    def test_workers_attach_by_handle(self):
+        with SharedDataset(_issues()) as dataset:
+            with multiprocessing.get_context('spawn').Pool(2) as pool:
+                results = pool.map(_worker_titles, [dataset.handle] * 2)
+
+        self.assertEqual(results, [(['Crash ✓', ''], 3)] * 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
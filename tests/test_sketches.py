@@ -0,0 +1,130 @@
+import unittest
+from collections import Counter
+
+from sketches import HyperLogLog, CountMinSketch, SpaceSaving, UserSketch, ActivitySketch
+
+
+def _stream():
+    # user0 is very frequent, then a long tail of rare users
+    return ['user0'] * 500 + ['user1'] * 200 + [f'rare{i}' for i in range(2000)]
+
+
+class TestHyperLogLog(unittest.TestCase):
+
+    def test_count(self):
+        hll = HyperLogLog()
+        for i in range(20000):
+            hll.add(f'user{i % 10000}')
+        self.assertAlmostEqual(hll.count(), 10000, delta=300)
+
+    def test_small_counts(self):
+        hll = HyperLogLog()
+        for user in ['a', 'b', 'c', 'a']:
+            hll.add(user)
+        self.assertAlmostEqual(hll.count(), 3, delta=0.1)
+
+    def test_merge_is_union(self):
+        left, right, union = HyperLogLog(10), HyperLogLog(10), HyperLogLog(10)
+        for i in range(3000):
+            (left if i % 2 else right).add(str(i))
+            union.add(str(i))
+        left.merge(right)
+        self.assertEqual(left.count(), union.count())
+        with self.assertRaises(ValueError):
+            left.merge(HyperLogLog(12))
+
+
+class TestCountMinSketch(unittest.TestCase):
+
+    def test_never_undercounts(self):
+        cms = CountMinSketch(width=256, depth=4)
+        for user in _stream():
+            cms.add(user)
+        self.assertGreaterEqual(cms.estimate('user0'), 500)
+        self.assertLess(cms.estimate('user0'), 500 + 3 * cms.total / 256)
+        self.assertEqual(cms.total, 2700)
+
+    def test_merge(self):
+        left, right = CountMinSketch(), CountMinSketch()
+        left.add('a', 3)
+        right.add('a', 4)
+        left.merge(right)
+        self.assertEqual(left.estimate('a'), 7)
+        with self.assertRaises(ValueError):
+            left.merge(CountMinSketch(width=16))
+
+
+class TestSpaceSaving(unittest.TestCase):
+
+    def test_heavy_hitters_are_kept(self):
+        summary = SpaceSaving(capacity=20)
+        for user in _stream():
+            summary.add(user)
+        self.assertEqual(len(summary.counts), 20)
+        top = summary.top(2)
+        self.assertEqual([user for user, _ in top], ['user0', 'user1'])
+        self.assertEqual(top[0][1], 500)
+
+    def test_error_bounds_hold_with_many_evictions(self):
+        stream = [f'user{(i * 7919) % 997}' for i in range(5000)] + ['hot'] * 600
+        summary = SpaceSaving(capacity=10)
+        for user in stream:
+            summary.add(user)
+        true_counts = Counter(stream)
+        self.assertEqual(sum(summary.counts.values()), len(stream))
+        for user, count in summary.counts.items():
+            self.assertGreaterEqual(count, true_counts[user])
+            self.assertLessEqual(count - summary.errors[user], true_counts[user])
+        # Stale heap entries are compacted
+        self.assertLessEqual(len(summary._heap), 2 * summary.capacity + 16)
+        self.assertEqual(summary.top(1)[0][0], 'hot')
+
+    def test_merge(self):
+        left, right = SpaceSaving(capacity=20), SpaceSaving(capacity=20)
+        for i, user in enumerate(_stream()):
+            (left if i % 2 else right).add(user)
+        left.merge(right)
+        self.assertEqual(left.top(1)[0][0], 'user0')
+        self.assertLessEqual(len(left.counts), 20)
+
+
+class TestUserSketch(unittest.TestCase):
+
+    def test_top_uses_tighter_estimate(self):
+        sketch = UserSketch(capacity=20)
+        sketch.update(_stream() + [None, ''])
+        self.assertEqual(sketch.total, 2700)
+        self.assertEqual(sketch.top(2), [('user0', 500), ('user1', 200)])
+
+
+class TestActivitySketch(unittest.TestCase):
+
+    RECORDS = [
+        {'creator': 'alice', 'events': [
+            {'event_type': 'commented', 'author': 'bob'},
+            {'event_type': 'labeled', 'author': 'alice'},
+            {'event_type': 'cross-referenced'},
+        ]},
+        {'creator': 'bob', 'events': [{'event_type': 'commented', 'author': 'bob'}]},
+        {'creator': 'alice'},
+    ]
+
+    def test_build(self):
+        sketch = ActivitySketch.build(self.RECORDS)
+        self.assertEqual(sketch.issues, 3)
+        self.assertEqual(sketch.events, 4)
+        self.assertEqual(sketch.creators.top(1), [('alice', 2)])
+        self.assertEqual(sketch.commenters.top(5), [('bob', 2)])
+        self.assertAlmostEqual(sketch.authors.distinct.count(), 2, delta=0.1)
+
+    def test_shards_merge(self):
+        merged = ActivitySketch.build(self.RECORDS[:1])
+        merged.merge(ActivitySketch.build(self.RECORDS[1:]))
+        whole = ActivitySketch.build(self.RECORDS)
+        self.assertEqual((merged.issues, merged.events), (whole.issues, whole.events))
+        self.assertEqual(merged.creators.top(2), whole.creators.top(2))
+        self.assertEqual(merged.authors.estimate('bob'), whole.authors.estimate('bob'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from sqlite_store import SQLiteStore
+
+RECORDS = [
+    {'number': 1, 'creator': 'alice', 'state': 'open', 'title': 'Crash in C++ extension',
+     'text': 'Building fails', 'labels': ['kind/bug', 'status/triage'], 'assignees': ['bob'],
+     'created_date': '2020-01-01T00:00:00Z',
+     'events': [{'event_type': 'commented', 'author': 'bob', 'event_date': '2020-01-02T00:00:00Z',
+                 'comment': 'confirmed'}]},
+    {'number': 2, 'creator': 'alice', 'state': 'closed', 'title': 'Docs typo',
+     'text': 'The DEBUGGING page has a typo', 'labels': [{'name': 'area/docs'}],
+     'events': [{'event_type': 'closed', 'author': 'carol'}]},
+    {'number': 3, 'creator': 'bob', 'state': 'open', 'title': 'Feature idea', 'text': None},
+]
+
+
+class TestSQLiteStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data_path = os.path.join(self.tmp_dir.name, 'issues.json')
+        with open(self.data_path, 'w') as fout:
+            json.dump(RECORDS, fout)
+        self.store = SQLiteStore.open_for(self.data_path, lambda: RECORDS)
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp_dir.cleanup()
+
+    def test_counts(self):
+        self.assertEqual(self.store.count_issues(), 3)
+        self.assertEqual(self.store.count_by_state(), {'open': 2, 'closed': 1})
+        self.assertEqual(self.store.label_counts()['area/docs'], 1)
+        self.assertEqual(self.store.label_counts(state='closed'), {'area/docs': 1})
+        self.assertEqual(self.store.open_status_counts(), {'triage': 1, 'unassigned': 1})
+        self.assertEqual(self.store.count_events(), 2)
+        self.assertEqual(self.store.count_events('bob'), 1)
+        self.assertEqual(self.store.top_creators(1), [('alice', 2)])
+
+    def test_contributor_stats(self):
+        stats = self.store.contributor_stats('bob')
+        self.assertEqual(stats.issues_created, 1)
+        self.assertEqual(stats.assignments, 1)
+        self.assertEqual(dict(stats.events_by_type), {'commented': 1})
+        self.assertEqual(stats.first_activity.isoformat(), '2020-01-02T00:00:00+00:00')
+        self.assertEqual(stats.last_activity, stats.first_activity)
+        self.assertEqual(self.store.contributor_stats('alice').first_activity.isoformat(),
+                         '2020-01-01T00:00:00+00:00')
+        self.assertIsNone(self.store.contributor_stats('nobody'))
+
+    def test_search_is_case_insensitive_substring(self):
+        self.assertEqual([i.number for i in self.store.search('debug')], [2])
+        self.assertEqual([i.number for i in self.store.search('c++')], [1])
+        # Shorter than a trigram, answered by a LIKE scan
+        self.assertEqual([i.number for i in self.store.search('ty')], [2])
+        self.assertEqual(self.store.search('nothing like this'), [])
+
+    def test_get_issues_round_trip(self):
+        issue = self.store.get_issues(label='kind/bug')[0]
+        self.assertEqual(issue.number, 1)
+        self.assertEqual(issue.labels, ['kind/bug', 'status/triage'])
+        self.assertEqual(issue.assignees, ['bob'])
+        self.assertEqual(issue.events[0].comment, 'confirmed')
+        self.assertIsNotNone(issue.created_date)
+
+        self.assertEqual([i.number for i in self.store.get_issues(state='open', creator='bob')], [3])
+        self.assertEqual(self.store.get_issues(ids=[]), [])
+
+    def test_get_issues_keeps_related_rows_per_issue(self):
+        issues = self.store.get_issues()
+        self.assertEqual([i.number for i in issues], [1, 2, 3])
+        self.assertEqual([i.labels for i in issues], [['kind/bug', 'status/triage'], ['area/docs'], []])
+        self.assertEqual([len(i.events) for i in issues], [1, 1, 0])
+        self.assertEqual(issues[1].events[0].author, 'carol')
+
+    def test_many_matches_stay_below_the_parameter_limit(self):
+        records = [{'number': n, 'state': 'open', 'title': f'Crash number {n}'} for n in range(1, 41)]
+        self.store.ingest(records, self.data_path)
+        self.store.conn.setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 10)
+
+        self.assertEqual([i.number for i in self.store.search('crash')], list(range(1, 41)))
+        # Shorter than a trigram, answered by a LIKE scan
+        self.assertEqual(len(self.store.search('nu')), 40)
+        ids = self.store.search_ids('crash')
+        with patch('sqlite_store._MAX_IDS_PER_QUERY', 8):
+            self.assertEqual([i.number for i in self.store.get_issues(ids=ids[::-1])], list(range(1, 41)))
+
+    def test_failed_ingest_keeps_previous_database(self):
+        def failing_records():
+            yield RECORDS[0]
+            raise ValueError('broken record')
+
+        with self.assertRaises(ValueError):
+            self.store.ingest(failing_records(), self.data_path)
+        self.assertTrue(self.store.is_current(self.data_path))
+        self.assertEqual(self.store.count_issues(), 3)
+        self.assertEqual(len(self.store.get_issues(label='kind/bug')), 1)
+
+    def test_iter_comments(self):
+        self.assertEqual(list(self.store.iter_comments()),
+                         [(1, 'Crash in C++ extension', 'bob', '2020-01-02T00:00:00Z', 'confirmed')])
+
+    def test_reingests_when_data_file_changes(self):
+        calls = []
+        def loader():
+            calls.append(1)
+            return RECORDS[:1]
+
+        # Still current: nothing is ingested
+        SQLiteStore.open_for(self.data_path, loader).close()
+        self.assertEqual(calls, [])
+
+        with open(self.data_path, 'w') as fout:
+            json.dump(RECORDS[:1], fout)
+        store = SQLiteStore.open_for(self.data_path, loader)
+        self.assertEqual(calls, [1])
+        self.assertEqual(store.count_issues(), 1)
+        self.assertEqual(store.search('crash')[0].number, 1)
+        store.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
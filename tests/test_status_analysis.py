@@ -10,7 +10,10 @@ import matplotlib
 # Force a headless backend so plotting doesn't require a GUI during tests
 matplotlib.use("Agg")
 
+import sampling
 import status_analysis
+from model import Issue
+from timeline import TimelineIndex
 
 
 class StatusAnalysisTests(unittest.TestCase):
@@ -74,6 +77,78 @@ class StatusAnalysisTests(unittest.TestCase):
                 "Expected plot to be written even when no status items are present",
             )
 
+    @patch("status_analysis.plt.show")
+    def test_plot_reuses_unchanged_figure(self, mock_show):
+        # The second plot of identical data reuses the image instead of rendering it
+        args = dict(state_sizes=[2, 1], state_labels=["open", "closed"],
+                    status_items=[("triage", 2)], status_keys=["triage"], status_vals=[2])
+        with tempfile.TemporaryDirectory() as tmp_dir, patch(
+            "status_analysis.OUTPUT_PNG", Path(tmp_dir) / "status.png"
+        ), patch("sys.stdout", io.StringIO()):
+            analysis = status_analysis.StatusAnalysis()
+            analysis._plot_analysis(**args)
+            with patch.object(analysis, "_render") as render:
+                analysis._plot_analysis(**args)
+                render.assert_not_called()
+                analysis._plot_analysis(**dict(args, status_vals=[3], status_items=[("triage", 3)]))
+                render.assert_called_once()
+        # The chart is displayed every time, reused or not
+        self.assertEqual(mock_show.call_count, 3)
+
+    @patch("status_analysis.plt.show")
+    def test_run_on_sample_estimates_counts(self, mock_show):
+        # A complete sample reproduces the exact counts, with zero-width intervals
+        issues = [
+            Issue({"number": 1, "state": "open", "labels": ["status/triage"]}),
+            Issue({"number": 2, "state": "open"}),
+            Issue({"number": 3, "state": "closed"}),
+        ]
+        params = {"sample": 10, "seed": 1}
+        with tempfile.TemporaryDirectory() as tmp_dir, patch(
+            "status_analysis.OUTPUT_PNG", Path(tmp_dir) / "status.png"
+        ), patch("status_analysis.DataLoader") as loader_mock, patch(
+            "status_analysis.config.get_parameter",
+            side_effect=lambda name, default=None: params.get(name),
+        ):
+            loader_mock.return_value.get_sample.side_effect = (
+                lambda size, key, seed: sampling.draw(issues, size, key, seed))
+            buffer = io.StringIO()
+            with patch("sys.stdout", buffer):
+                status_analysis.StatusAnalysis().run()
+
+        loader_mock.return_value.get_issues.assert_not_called()
+        output = buffer.getvalue()
+        self.assertIn("Estimated from a sample of 3 of 3 issues", output)
+        self.assertIn("triage: 1.0 (95% CI 1.0 to 1.0)", output)
+        self.assertIn("unassigned: 1.0 (95% CI 1.0 to 1.0)", output)
+
+    def test_status_snapshots_replays_events(self):
+        # One issue moves from unassigned to triage and is then closed,
+        # the other stays open in "waiting" (label present since creation).
+        issues = [
+            Issue({
+                "number": 1, "state": "closed", "created_date": "2020-01-01T00:00:00Z",
+                "events": [
+                    {"event_type": "labeled", "label": "status/triage", "event_date": "2020-01-10T00:00:00Z"},
+                    {"event_type": "closed", "event_date": "2020-01-20T00:00:00Z"},
+                ],
+            }),
+            Issue({
+                "number": 2, "state": "open", "created_date": "2020-01-05T00:00:00Z",
+                "labels": ["status/waiting"],
+            }),
+        ]
+        dates = ["2019-12-31", "2020-01-06", "2020-01-10", "2020-01-20", "2020-02-01"]
+
+        with patch("status_analysis.DataLoader") as loader_mock:
+            loader_mock.return_value.get_timelines.return_value = TimelineIndex(issues)
+            snapshots = status_analysis.StatusAnalysis().status_snapshots(dates)
+
+        self.assertListEqual(list(snapshots.columns), ["triage", "unassigned", "waiting"])
+        self.assertListEqual(list(snapshots["unassigned"]), [0, 1, 0, 0, 0])
+        self.assertListEqual(list(snapshots["triage"]), [0, 0, 1, 0, 0])
+        self.assertListEqual(list(snapshots["waiting"]), [0, 1, 1, 1, 1])
+
 
 if __name__ == "__main__":
     unittest.main()
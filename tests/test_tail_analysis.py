@@ -0,0 +1,99 @@
+import io
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+from model import Issue
+from tail_analysis import LiveCounts, TailAnalysis
+
+
+def _issues():
+    return [
+        Issue({'number': 1, 'state': 'open', 'labels': ['kind/bug', 'status/triage'],
+               'created_date': '2020-01-01T00:00:00Z'}),
+        Issue({'number': 2, 'state': 'open', 'labels': ['kind/bug'], 'created_date': '2020-01-01T00:00:00Z'}),
+        Issue({'number': 3, 'state': 'closed', 'labels': ['docs'], 'created_date': '2020-01-01T00:00:00Z',
+               'updated_date': '2020-01-11T00:00:00Z'}),
+    ]
+
+
+class TestLiveCounts(unittest.TestCase):
+
+    def setUp(self):
+        self.counts = LiveCounts()
+        self.counts.seed(_issues())
+
+    def test_seed(self):
+        snapshot = self.counts.snapshot()
+        self.assertEqual(snapshot['states'], {'open': 2, 'closed': 1})
+        self.assertEqual(snapshot['statuses'], {'triage': 1, 'unassigned': 1})
+        self.assertEqual(snapshot['labels']['kind/bug'], 2)
+        self.assertAlmostEqual(snapshot['mean_resolution_days'], 10.0)
+
+    def test_events(self):
+        self.counts.apply({'number': 2, 'event_type': 'labeled', 'label': 'status/waiting'})
+        self.counts.apply({'number': 1, 'event_type': 'closed', 'event_date': '2020-01-21T00:00:00Z'})
+        self.counts.apply({'number': 1, 'event_type': 'unlabeled', 'label': 'kind/bug'})
+        snapshot = self.counts.snapshot()
+        self.assertEqual(snapshot['states'], {'open': 1, 'closed': 2})
+        self.assertEqual(snapshot['statuses'], {'waiting': 1})
+        self.assertEqual(snapshot['labels']['kind/bug'], 1)
+        self.assertAlmostEqual(snapshot['mean_resolution_days'], 15.0)
+
+        # Reopening takes the issue out of the resolution time again
+        self.counts.apply({'number': 1, 'event_type': 'reopened'})
+        snapshot = self.counts.snapshot()
+        self.assertEqual(snapshot['statuses'], {'waiting': 1, 'triage': 1})
+        self.assertAlmostEqual(snapshot['mean_resolution_days'], 10.0)
+
+    def test_issue_records_replace(self):
+        self.counts.apply({'number': 3, 'state': 'open', 'labels': ['docs']})
+        self.counts.apply({'number': 4, 'state': 'open'})
+        self.counts.apply({'number': 99, 'event_type': 'closed'})
+        self.counts.apply({'number': 5})
+        snapshot = self.counts.snapshot()
+        self.assertEqual(snapshot['issues'], 4)
+        self.assertEqual(snapshot['states'], {'open': 4})
+        self.assertEqual(snapshot['statuses'], {'triage': 1, 'unassigned': 3})
+        self.assertIsNone(snapshot['mean_resolution_days'])
+        self.assertEqual(self.counts.skipped, 2)
+
+
+class TestTailAnalysis(unittest.TestCase):
+
+    def test_run_follows_feed(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'updates.jsonl')
+            with open(path, 'w') as fout:
+                fout.write(json.dumps({'number': 2, 'event_type': 'closed',
+                                       'event_date': '2020-01-03T00:00:00Z'}) + '\n')
+                # Incomplete line, not applied until its newline is written
+                fout.write('{"number": 1, "event_type"')
+
+            params = {'tail': path, 'ENPM611_PROJECT_SNAPSHOT_INTERVAL': 0.01}
+            stop = threading.Event()
+            with patch('tail_analysis.config.get_parameter',
+                       side_effect=lambda name, default=None: params.get(name, default)), \
+                    patch('tail_analysis.DataLoader') as loader_mock:
+                loader_mock.return_value.get_issues.return_value = _issues()
+                loader_mock.return_value.get_timelines.return_value.timelines = None
+                analysis = TailAnalysis()
+
+                def on_snapshot(original=analysis._print_snapshot):
+                    original()
+                    if analysis.counts.updates >= 1:
+                        stop.set()
+                analysis._print_snapshot = on_snapshot
+                with patch('sys.stdout', io.StringIO()) as output:
+                    analysis.run(stop)
+
+        self.assertEqual(analysis.counts.updates, 1)
+        self.assertEqual(analysis.counts.snapshot()['states'], {'open': 1, 'closed': 2})
+        self.assertIn('Open issues by status: triage: 1', output.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import threading
+import unittest
+
+from model import Event, Issue
+from text_arena import MIN_SPILL_CHARS, SpilledText, TextArena, TextBudget, resolve
+
+
+class TestTextArena(unittest.TestCase):
+
+    def test_put_and_get(self):
+        arena = TextArena()
+        first = arena.put("hello ✓")
+        second = arena.put("")
+        self.assertEqual(first.load(), "hello ✓")
+        # Texts appended after the first read are visible too
+        third = arena.put("world")
+        self.assertEqual(third.load(), "world")
+        self.assertEqual(second.load(), "")
+        self.assertEqual(len(arena), len("hello ✓".encode('utf-8')) + 5)
+
+    def test_concurrent_puts_and_reads(self):
+        arena = TextArena()
+        results = {}
+
+        def work(n):
+            refs = [(f"{n}-{i}" * 10, arena.put(f"{n}-{i}" * 10)) for i in range(200)]
+            results[n] = all(ref.load() == text for text, ref in refs)
+
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertTrue(all(results.values()))
+
+    def test_resolve(self):
+        arena = TextArena()
+        self.assertEqual(resolve(arena.put("spilled")), "spilled")
+        self.assertEqual(resolve("plain"), "plain")
+        self.assertIsNone(resolve(None))
+
+
+class TestTextBudget(unittest.TestCase):
+
+    def test_keeps_texts_until_budget_is_used(self):
+        long_text = "a" * MIN_SPILL_CHARS
+        budget = TextBudget(budget_bytes=MIN_SPILL_CHARS)
+        self.assertIs(budget.store(long_text), long_text)
+        spilled = budget.store(long_text)
+        self.assertIsInstance(spilled, SpilledText)
+        self.assertEqual(spilled.load(), long_text)
+        # Short texts and missing values always stay
+        self.assertEqual(budget.store("short"), "short")
+        self.assertIsNone(budget.store(None))
+        self.assertEqual(budget.spilled, 1)
+
+    def test_apply_to_issue(self):
+        text = "body " * 100
+        comment = "comment " * 50
+        issue = Issue({"state": "open", "text": text, "events": [{"comment": comment}, {}]})
+        TextBudget(budget_bytes=0).apply(issue)
+
+        self.assertIsInstance(issue._text, SpilledText)
+        self.assertIsInstance(issue.events[0]._comment, SpilledText)
+        self.assertEqual(issue.text, text)
+        self.assertEqual(issue.events[0].comment, comment)
+        self.assertIsNone(issue.events[1].comment)
+
+    def test_plain_assignment(self):
+        event = Event({"comment": "hi"})
+        event.comment = "changed"
+        self.assertEqual(event.comment, "changed")
+
+
+if __name__ == '__main__':
+    unittest.main()
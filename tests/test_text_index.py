@@ -0,0 +1,42 @@
+import re
+import unittest
+
+from text_index import PreparedText, MAX_SENTENCE_LENGTH
+
+
+class TestPreparedText(unittest.TestCase):
+
+    def test_segmentation(self):
+        p = PreparedText("First one.  Second?\nThird line\n\n```\ncode. here\n```  Last")
+        sentences = [p.sentence(i) for i in range(len(p.starts))]
+        self.assertEqual(sentences, ["First one.", "Second?", "Third line Last"])
+
+    def test_sentences_matching(self):
+        p = PreparedText("An error here. Nothing. Another ERROR and error again!")
+        pattern = re.compile("error", re.IGNORECASE)
+        # One entry per sentence, even with several matches in it
+        self.assertEqual(p.sentences_matching(pattern), ["An error here.", "Another ERROR and error again!"])
+
+    def test_regex_is_searched_per_sentence(self):
+        # A greedy match crossing a sentence end must not hide a match within one
+        p = PreparedText("The lock is held. Then the file was written. lock file again.")
+        self.assertEqual(p.sentences_matching(re.compile(r"lock.*file", re.IGNORECASE)), ["lock file again."])
+        # Anchors apply to each sentence
+        self.assertEqual(p.sentences_matching(re.compile(r"^then", re.IGNORECASE)), ["Then the file was written."])
+        self.assertEqual(p.sentences_matching(re.compile(re.escape("lock file"), re.IGNORECASE)), ["lock file again."])
+
+    def test_truncation(self):
+        p = PreparedText("keyword " + "x" * 400)
+        found = p.sentences_matching(re.compile("keyword"))
+        self.assertEqual(len(found[0]), MAX_SENTENCE_LENGTH + 3)
+        self.assertTrue(found[0].endswith("..."))
+
+    def test_contains(self):
+        p = PreparedText("Uses C++ Daily")
+        self.assertTrue(p.contains("c++ daily"))
+        self.assertFalse(p.contains("python"))
+        self.assertTrue(PreparedText("İstanbul").contains("i̇stanbul"))
+
+
+if __name__ == '__main__':
+    unittest.main()
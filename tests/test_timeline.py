@@ -0,0 +1,108 @@
+import unittest
+from datetime import datetime
+
+from model import Issue
+from timeline import IssueTimeline, TimelineIndex, UNASSIGNED_STATUS
+
+
+def _issue(state='open', labels=None, events=None, number=1):
+    return Issue({
+        'number': number,
+        'state': state,
+        'labels': labels or [],
+        'created_date': '2020-01-01T00:00:00',
+        'updated_date': '2020-03-01T00:00:00',
+        'events': events or [],
+    })
+
+
+class TestIssueTimeline(unittest.TestCase):
+
+    def test_close_and_reopen(self):
+        # Closed, reopened and closed again: the last close counts
+        issue = _issue(state='closed', events=[
+            {'event_type': 'reopened', 'event_date': '2020-01-05T00:00:00'},
+            {'event_type': 'closed', 'event_date': '2020-01-03T00:00:00'},
+            {'event_type': 'closed', 'event_date': '2020-01-11T00:00:00'},
+        ])
+        t = IssueTimeline.from_issue(issue)
+
+        self.assertEqual(t.close_dates, [datetime(2020, 1, 3), datetime(2020, 1, 11)])
+        self.assertEqual(t.reopen_count, 1)
+        self.assertEqual(t.closed_date, datetime(2020, 1, 11))
+        self.assertAlmostEqual(t.resolution_days, 10.0)
+
+    def test_missing_close_event_uses_updated_date(self):
+        t = IssueTimeline.from_issue(_issue(state='closed'))
+        self.assertEqual(t.closed_date, datetime(2020, 3, 1))
+        self.assertFalse(t.is_open)
+
+    def test_open_issue_has_no_resolution(self):
+        t = IssueTimeline.from_issue(_issue())
+        self.assertIsNone(t.closed_date)
+        self.assertIsNone(t.resolution_days)
+
+    def test_label_intervals(self):
+        issue = _issue(labels=['kind/bug', 'area/cli'], events=[
+            {'event_type': 'labeled', 'event_date': '2020-01-02T00:00:00', 'label': 'kind/bug'},
+            {'event_type': 'unlabeled', 'event_date': '2020-01-04T00:00:00', 'label': 'kind/bug'},
+            {'event_type': 'labeled', 'event_date': '2020-01-06T00:00:00', 'label': 'kind/bug'},
+        ])
+        t = IssueTimeline.from_issue(issue)
+
+        self.assertEqual(t.label_intervals['kind/bug'], [
+            (datetime(2020, 1, 2), datetime(2020, 1, 4)),
+            (datetime(2020, 1, 6), None),
+        ])
+        # Never touched by events, so assumed present since creation
+        self.assertEqual(t.label_intervals['area/cli'], [(datetime(2020, 1, 1), None)])
+
+    def test_time_in_status(self):
+        issue = _issue(state='closed', events=[
+            {'event_type': 'labeled', 'event_date': '2020-01-03T00:00:00', 'label': 'status/triage'},
+            {'event_type': 'commented', 'event_date': '2020-01-04T00:00:00'},
+            {'event_type': 'closed', 'event_date': '2020-01-08T00:00:00'},
+        ])
+        t = IssueTimeline.from_issue(issue)
+
+        self.assertEqual(t.time_in_status(), {UNASSIGNED_STATUS: 2.0, 'triage': 5.0})
+
+    def test_open_status_counted_up_to_as_of(self):
+        t = IssueTimeline.from_issue(_issue(labels=['status/waiting']))
+        self.assertEqual(t.time_in_status(), {})
+        self.assertEqual(t.time_in_status(as_of=datetime(2020, 1, 4)), {'waiting': 3.0})
+
+    def test_from_json(self):
+        t = IssueTimeline.from_json({
+            'state': 'closed',
+            'created_date': '2020-01-01T00:00:00Z',
+            'events': [{'event_type': 'closed', 'event_date': '2020-01-02T00:00:00Z'}],
+        })
+        self.assertAlmostEqual(t.resolution_days, 1.0)
+
+    def test_no_dates(self):
+        issue = Issue({'state': 'open'})
+        t = IssueTimeline.from_issue(issue)
+        self.assertEqual(t.status_intervals, [])
+
+
+class TestTimelineIndex(unittest.TestCase):
+
+    def test_frame_columns(self):
+        issues = [
+            _issue(number=1, state='closed', events=[
+                {'event_type': 'closed', 'event_date': '2020-01-02T00:00:00'},
+            ]),
+            _issue(number=2),
+        ]
+        index = TimelineIndex(issues)
+
+        self.assertEqual(len(index), 2)
+        self.assertListEqual(list(index.frame['number']), [1, 2])
+        self.assertEqual(index.frame['resolution_days'][0], 1.0)
+        self.assertTrue(index.frame['closed_date'].isna()[1])
+        self.assertIs(index.get(2), index.timelines[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,30 @@
+import unittest
+from collections import Counter
+from types import SimpleNamespace
+
+from topn import count_by, count_all, top_n, top_n_by_key
+
+
+class TestTopN(unittest.TestCase):
+
+    def test_count_by_skips_none(self):
+        items = [SimpleNamespace(creator=c) for c in ['a', 'b', 'a', None]]
+        self.assertEqual(count_by(items, lambda i: i.creator), Counter({'a': 2, 'b': 1}))
+
+    def test_count_all(self):
+        items = [['bug', 'docs'], ['bug'], [None]]
+        self.assertEqual(count_all(items, lambda labels: labels), Counter({'bug': 2, 'docs': 1}))
+
+    def test_top_n_orders_by_count(self):
+        counts = Counter({'a': 1, 'b': 5, 'c': 3, 'd': 4})
+        self.assertEqual(top_n(counts, 2), [('b', 5), ('d', 4)])
+        self.assertEqual(len(top_n(counts, 10)), 4)
+        self.assertEqual(top_n(Counter(), 3), [])
+
+    def test_top_n_by_key(self):
+        items = ['x', 'y', 'y', 'z', 'y', 'z']
+        self.assertEqual(top_n_by_key(items, lambda i: i, 2), [('y', 3), ('z', 2)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import re
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from model import Issue
+from trigram_index import TrigramIndex, required_literals, issue_text
+
+TEXTS = [
+    'Poetry crashes on install',
+    'Lock file is outdated after update',
+    'Installing from a private repository fails',
+    'Add a --dry-run flag to poetry update',
+]
+
+
+class TestRequiredLiterals(unittest.TestCase):
+
+    def test_plain_and_escaped(self):
+        self.assertEqual(required_literals('Install'), [['install']])
+        self.assertEqual(required_literals(re.escape('C++ (beta)')), [['c++ (beta)']])
+
+    def test_regex_constructs(self):
+        self.assertEqual(required_literals(r'lock\s+file'), [['lock', 'file']])
+        self.assertEqual(required_literals(r'(?:crash|fail)s?'), [['crash'], ['fail']])
+        self.assertEqual(required_literals(r'poetry (update|lock)+'), [['poetry ', 'update'], ['poetry ', 'lock']])
+        # Optional parts are not required
+        self.assertEqual(required_literals(r'dry(-run)?'), [['dry']])
+
+    def test_unconstrained(self):
+        self.assertIsNone(required_literals(r'.*'))
+        self.assertIsNone(required_literals(r'foo|.'))
+        self.assertIsNone(required_literals(r'(unbalanced'))
+
+
+class TestTrigramIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = TrigramIndex.build(TEXTS)
+
+    def _check(self, pattern):
+        # Candidates must never miss an actual match
+        regex = re.compile(pattern, re.IGNORECASE)
+        candidates = self.index.candidates(pattern)
+        matching = [i for i, t in enumerate(TEXTS) if regex.search(t)]
+        self.assertTrue(set(matching) <= set(candidates if candidates is not None else range(len(TEXTS))))
+        return candidates
+
+    def test_substring(self):
+        self.assertEqual(self._check('install'), [0, 2])
+        self.assertEqual(self._check('UPDATE'), [1, 3])
+        self.assertEqual(self._check('nothing here'), [])
+
+    def test_regex(self):
+        self.assertEqual(self._check(r'(crash|fail)'), [0, 2])
+        self.assertEqual(self._check(r'poetry\s+update'), [3])
+
+    def test_no_filtering_possible(self):
+        self.assertIsNone(self._check(r'\w+'))
+        # Literal shorter than a trigram
+        self.assertIsNone(self._check('on'))
+
+    def test_non_ascii(self):
+        index = TrigramIndex.build(['Überprüfung fehlgeschlagen', 'naïve café ☕ test'])
+        self.assertEqual(index.candidates('PRÜF'), [0])
+        self.assertEqual(index.candidates('café ☕'), [1])
+
+    def test_for_issues_is_saved(self):
+        issues = [Issue({'title': 'Bug', 'text': 'broken', 'state': 'open'})]
+        self.assertEqual(issue_text(issues[0]), 'Bug. broken')
+        # Without a data file there is nothing to reuse the index from
+        self.assertIsNone(TrigramIndex.for_issues(issues))
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            data_path = os.path.join(tmp_dir, 'issues.json')
+            with open(data_path, 'w') as fout:
+                fout.write('[]')
+            index = TrigramIndex.for_issues(issues, data_path)
+            self.assertIs(TrigramIndex.for_issues(issues, data_path), index)
+            self.assertEqual(index.candidates('broken'), [0])
+            self.assertTrue(os.path.exists(TrigramIndex.cache_path(data_path)))
+
+            # A new list of the same issues loads the saved index instead of building it
+            with patch.object(TrigramIndex, 'build') as build:
+                loaded = TrigramIndex.for_issues(list(issues), data_path)
+            build.assert_not_called()
+            self.assertEqual(loaded.candidates('broken'), [0])
+
+            # The saved index is ignored once the data file changes
+            with open(data_path, 'w') as fout:
+                fout.write('[ ]')
+            self.assertIsNone(TrigramIndex.load(data_path, len(issues)))
+
+if __name__ == '__main__':
+    unittest.main()
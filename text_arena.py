@@ -0,0 +1,125 @@
+"""
+Keeps large text fields (issue bodies, comments) out of RAM. The texts are
+appended as UTF-8 to a temporary file that is memory-mapped for reading,
+and the issue model only holds a small reference (offset and length) that
+fetches the text from the mapping on access. Pages of the mapping that are
+not read are never loaded, and the operating system can drop the ones that
+were read whenever memory gets tight.
+"""
+
+import mmap
+import tempfile
+import threading
+from typing import Any, Optional
+
+# Shorter texts are kept in RAM; the reference would not be much smaller
+MIN_SPILL_CHARS = 128
+
+
+class TextArena:
+    """
+    Append-only file of UTF-8 strings. The file is deleted when the arena
+    (and every reference into it) is garbage collected.
+    """
+
+    def __init__(self, directory:str=None):
+        self._file = tempfile.TemporaryFile(dir=directory)
+        self._size:int = 0
+        self._map:Optional[mmap.mmap] = None
+        self._mapped:int = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """
+        Number of bytes stored.
+        """
+        return self._size
+
+    def put(self, text:str) -> 'SpilledText':
+        data = text.encode('utf-8')
+        with self._lock:
+            offset = self._size
+            self._file.write(data)
+            self._size += len(data)
+        return SpilledText(self, offset, len(data))
+
+    def get(self, offset:int, length:int) -> str:
+        if offset + length > self._mapped:
+            self._remap()
+        return self._map[offset:offset + length].decode('utf-8')
+
+    def _remap(self):
+        # Texts were appended since the file was mapped, map it again
+        with self._lock:
+            if self._mapped < self._size:
+                self._file.flush()
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+                self._mapped = self._size
+
+
+class SpilledText:
+    """
+    Reference to one text stored in a TextArena.
+    """
+
+    __slots__ = ('arena', 'offset', 'length')
+
+    def __init__(self, arena:TextArena, offset:int, length:int):
+        self.arena:TextArena = arena
+        self.offset:int = offset
+        self.length:int = length
+
+    def load(self) -> str:
+        return self.arena.get(self.offset, self.length)
+
+
+class TextBudget:
+    """
+    Decides which texts stay in RAM while issues are loaded: texts are kept
+    until their total size reaches the budget, after that every text of at
+    least MIN_SPILL_CHARS characters is moved to the arena.
+    """
+
+    def __init__(self, budget_bytes:int, directory:str=None):
+        self.budget_bytes:int = budget_bytes
+        self.kept_bytes:int = 0
+        self.spilled:int = 0
+        self._directory:str = directory
+        self._arena:TextArena = None
+
+    @property
+    def arena(self) -> TextArena:
+        if self._arena is None:
+            self._arena = TextArena(self._directory)
+        return self._arena
+
+    def store(self, text:Any) -> Any:
+        """
+        Returns the text itself or, once the budget is used up, a reference
+        to it in the arena.
+        """
+        if not isinstance(text, str) or len(text) < MIN_SPILL_CHARS:
+            return text
+        # Length in characters is a cheap approximation of the size in bytes
+        if self.kept_bytes + len(text) <= self.budget_bytes:
+            self.kept_bytes += len(text)
+            return text
+        self.spilled += 1
+        return self.arena.put(text)
+
+    def apply(self, issue):
+        """
+        Moves the text of the issue and the comments of its events to the
+        arena where the budget requires it.
+        """
+        issue.text = self.store(issue._text)
+        for event in issue.events:
+            event.comment = self.store(event._comment)
+        return issue
+
+
+def resolve(value:Any) -> Any:
+    """
+    The text behind a reference, or the value itself if it is not one.
+    """
+    return value.load() if isinstance(value, SpilledText) else value
@@ -0,0 +1,96 @@
+"""
+Normalized text of an issue for the keyword analysis. Code fences are
+stripped, whitespace is collapsed and sentence boundaries are located in
+one pass, so extracting the sentences around a keyword only requires a
+search over the cleaned text and a binary search over sentence offsets.
+The keyword analysis prepares the text of matching issues only.
+"""
+
+import re
+from array import array
+from bisect import bisect_right
+from typing import List, Pattern
+
+_CODE_FENCE = re.compile(r"```.*?```", re.DOTALL)
+_WHITESPACE = re.compile(r"\s{2,}")
+_SENTENCE_SEPARATOR = re.compile(r"(?<=[.!?;:])\s+|\n+")
+
+# Sentences longer than this are truncated in the output
+MAX_SENTENCE_LENGTH = 250
+
+
+class PreparedText:
+    """
+    Cleaned text of one issue with the offsets of its sentences.
+    """
+
+    __slots__ = ('cleaned', 'starts', 'ends')
+
+    def __init__(self, text:str):
+        cleaned = _CODE_FENCE.sub("", text)
+        cleaned = _WHITESPACE.sub(" ", cleaned.strip())
+        self.cleaned:str = cleaned
+
+        # Sentences are the stripped, non-empty parts between separators
+        self.starts:array = array('I')
+        self.ends:array = array('I')
+        position = 0
+        for separator in _SENTENCE_SEPARATOR.finditer(cleaned):
+            self._add_sentence(position, separator.start())
+            position = separator.end()
+        self._add_sentence(position, len(cleaned))
+
+    def _add_sentence(self, start:int, end:int):
+        while start < end and self.cleaned[start].isspace():
+            start += 1
+        while end > start and self.cleaned[end - 1].isspace():
+            end -= 1
+        if start < end:
+            self.starts.append(start)
+            self.ends.append(end)
+
+    def sentence(self, i:int) -> str:
+        return self.cleaned[self.starts[i]:self.ends[i]]
+
+    def contains(self, literal:str) -> bool:
+        """
+        Case-insensitive substring test.
+        """
+        return literal.lower() in self.cleaned.lower()
+
+    def sentences_matching(self, pattern:Pattern) -> List[str]:
+        """
+        Returns the sentences containing a match of the pattern, in order and
+        truncated to MAX_SENTENCE_LENGTH characters. Literal patterns are
+        searched once over the whole cleaned text (a literal match inside a
+        sentence can never be hidden by one crossing a sentence end); other
+        patterns are searched in every sentence on its own, so anchors and
+        greedy repetitions behave as they would on the sentence alone.
+        """
+        if not _is_literal(pattern):
+            return [_truncate(self.sentence(i)) for i in range(len(self.starts))
+                    if pattern.search(self.sentence(i))]
+
+        found = []
+        last = -1
+        for match in pattern.finditer(self.cleaned):
+            i = bisect_right(self.starts, match.start()) - 1
+            if i <= last or i < 0 or match.end() > self.ends[i]:
+                continue
+            last = i
+            found.append(_truncate(self.sentence(i)))
+        return found
+
+
+def _truncate(sentence:str) -> str:
+    if len(sentence) > MAX_SENTENCE_LENGTH:
+        return sentence[:MAX_SENTENCE_LENGTH] + "..."
+    return sentence
+
+
+def _is_literal(pattern:Pattern) -> bool:
+    """
+    Whether the pattern only matches its own text, i.e. it is re.escape() of
+    a plain string.
+    """
+    return re.escape(re.sub(r"\\(.)", r"\1", pattern.pattern, flags=re.DOTALL)) == pattern.pattern
@@ -0,0 +1,181 @@
+"""
+Derives per-issue timelines from the events attached to each issue:
+when it was closed and reopened, during which intervals each label was
+applied, and how long it spent in each status. The events of an issue
+are sorted once and replayed in a single pass; every metric is collected
+during that pass so analyses never need to re-scan the events.
+"""
+
+from typing import List, Dict, Tuple, Optional
+from datetime import datetime
+
+import pandas as pd
+from dateutil import parser
+
+from model import Issue, Event, State
+
+STATUS_PREFIX = 'status/'
+# Pseudo status of open issues that carry no status/ label
+UNASSIGNED_STATUS = 'unassigned'
+
+# An interval is open-ended (end is None) while it still applies
+Interval = Tuple[datetime, Optional[datetime]]
+
+
+class IssueTimeline:
+    """
+    Replays the events of one issue in chronological order.
+
+    Labels found on the issue that never show up in a labeled/unlabeled
+    event are assumed to have been applied when the issue was created.
+    Closed issues without a 'closed' event are treated as closed at their
+    updated_date so that their intervals still end.
+    """
+
+    def __init__(self, number:int=-1, created_date:datetime=None, state:State=None,
+                 updated_date:datetime=None, labels:List[str]=None, events:List[Event]=None):
+        self.number:int = number
+        self.created_date:datetime = created_date
+        self.close_dates:List[datetime] = []
+        self.reopen_dates:List[datetime] = []
+        self.label_intervals:Dict[str, List[Interval]] = {}
+        self.status_intervals:List[Tuple[str, datetime, Optional[datetime]]] = []
+        self.closed_date:datetime = None
+        self.is_open:bool = True
+
+        self._replay(state, updated_date, labels or [], events or [])
+
+    @classmethod
+    def from_issue(cls, issue:Issue):
+        return cls(issue.number, issue.created_date, issue.state, issue.updated_date,
+                   issue.labels, issue.events)
+
+    @classmethod
+    def from_json(cls, jobj:dict):
+        """
+        Builds a timeline straight from an issue's JSON record. Only the
+        fields required by the replay are parsed.
+        """
+        issue = Issue()
+        issue.number = jobj.get('number', -1)
+        issue.labels = jobj.get('labels', [])
+        issue.state = jobj.get('state')
+        for field in ('created_date', 'updated_date'):
+            try:
+                setattr(issue, field, parser.parse(jobj.get(field)))
+            except:
+                pass
+        issue.events = [Event(jevent) for jevent in jobj.get('events', [])]
+        return cls.from_issue(issue)
+
+    @property
+    def reopen_count(self) -> int:
+        return len(self.reopen_dates)
+
+    @property
+    def resolution_days(self) -> Optional[float]:
+        if self.closed_date is None or self.created_date is None:
+            return None
+        return (self.closed_date - self.created_date).total_seconds() / (24 * 3600)
+
+    def time_in_status(self, as_of:datetime=None) -> Dict[str, float]:
+        """
+        Returns the number of days spent in each status. Statuses that
+        still apply are counted up to as_of, or ignored if it is not given.
+        """
+        durations:Dict[str, float] = {}
+        for status, start, end in self.status_intervals:
+            end = end or as_of
+            if end is None:
+                continue
+            durations[status] = durations.get(status, 0.0) + (end - start).total_seconds() / (24 * 3600)
+        return durations
+
+    def _replay(self, state, updated_date, labels, events):
+        events = sorted((e for e in events if e.event_date is not None), key=lambda e: e.event_date)
+        start = self.created_date or (events[0].event_date if events else None)
+        if start is None:
+            return
+
+        # Labels that are never explicitly added or removed are present from the start
+        touched = {e.label for e in events if e.event_type in ('labeled', 'unlabeled')}
+        active_labels = {}
+        for label in labels:
+            name = label if isinstance(label, str) else label.get('name', '')
+            if name and name not in touched:
+                active_labels[name] = start
+        open_statuses = {}
+        self._sync_statuses(open_statuses, active_labels, start)
+
+        for event in events:
+            when = event.event_date
+            if event.event_type == 'labeled' and event.label and event.label not in active_labels:
+                active_labels[event.label] = when
+            elif event.event_type == 'unlabeled' and event.label in active_labels:
+                self._end_label(event.label, active_labels.pop(event.label), when)
+            elif event.event_type == 'closed' and self.is_open:
+                self.is_open = False
+                self.close_dates.append(when)
+            elif event.event_type == 'reopened' and not self.is_open:
+                self.is_open = True
+                self.reopen_dates.append(when)
+            else:
+                continue
+            self._sync_statuses(open_statuses, active_labels, when)
+
+        if self.is_open and state == State.closed and updated_date is not None:
+            # The close event is missing from the data, fall back to the last update
+            self.is_open = False
+            self.close_dates.append(updated_date)
+            self._sync_statuses(open_statuses, active_labels, updated_date)
+
+        if not self.is_open:
+            self.closed_date = self.close_dates[-1]
+        for label, since in active_labels.items():
+            self._end_label(label, since, None)
+        for status, since in open_statuses.items():
+            self.status_intervals.append((status, since, None))
+
+    def _end_label(self, label, since, until):
+        self.label_intervals.setdefault(label, []).append((since, until))
+
+    def _sync_statuses(self, open_statuses, active_labels, when):
+        """
+        Closes the status intervals that no longer apply and opens the new
+        ones. Only open issues have a status.
+        """
+        current = set()
+        if self.is_open:
+            current = {l[len(STATUS_PREFIX):] for l in active_labels if l.startswith(STATUS_PREFIX)}
+            current = current or {UNASSIGNED_STATUS}
+        for status in list(open_statuses):
+            if status not in current:
+                self.status_intervals.append((status, open_statuses.pop(status), when))
+        for status in current:
+            if status not in open_statuses:
+                open_statuses[status] = when
+
+
+class TimelineIndex:
+    """
+    Holds the timelines of a whole dataset, computed in one batch, and
+    exposes them as columns of a DataFrame (one row per issue).
+    """
+
+    def __init__(self, issues:List[Issue]):
+        self.issues:List[Issue] = issues
+        self.timelines:List[IssueTimeline] = [IssueTimeline.from_issue(issue) for issue in issues]
+        self.frame:pd.DataFrame = pd.DataFrame({
+            'number': [t.number for t in self.timelines],
+            'created_date': pd.to_datetime([t.created_date for t in self.timelines], utc=True),
+            'closed_date': pd.to_datetime([t.closed_date for t in self.timelines], utc=True),
+            'reopen_count': [t.reopen_count for t in self.timelines],
+            'resolution_days': [t.resolution_days for t in self.timelines],
+        }, columns=['number', 'created_date', 'closed_date', 'reopen_count', 'resolution_days'])
+        self._by_number:Dict[int, IssueTimeline] = {t.number: t for t in self.timelines}
+
+    def __len__(self):
+        return len(self.timelines)
+
+    def get(self, number:int) -> Optional[IssueTimeline]:
+        return self._by_number.get(number)
@@ -0,0 +1,50 @@
+"""
+Utilities for counting issues/events by a key and selecting the N most
+frequent keys. Counting uses a Counter (one dict entry per distinct key)
+and selection uses a bounded heap, so neither step materializes more than
+the distinct keys themselves.
+"""
+
+import heapq
+from collections import Counter
+from operator import itemgetter
+from typing import Callable, Iterable, List, Tuple, Any
+
+
+def count_by(items:Iterable[Any], key:Callable[[Any], Any]) -> Counter:
+    """
+    Counts the items per value of key(item). Items whose key is None
+    are skipped.
+    """
+    counts = Counter()
+    for item in items:
+        value = key(item)
+        if value is not None:
+            counts[value] += 1
+    return counts
+
+
+def count_all(items:Iterable[Any], keys:Callable[[Any], Iterable[Any]]) -> Counter:
+    """
+    Like count_by, but keys(item) returns several values (e.g. the labels
+    of an issue), each of which is counted.
+    """
+    counts = Counter()
+    for item in items:
+        counts.update(value for value in keys(item) if value is not None)
+    return counts
+
+
+def top_n(counts:Counter, n:int) -> List[Tuple[Any, int]]:
+    """
+    Returns the n (key, count) pairs with the highest counts, highest first.
+    Uses a heap of size n instead of sorting all keys.
+    """
+    return heapq.nlargest(n, counts.items(), key=itemgetter(1))
+
+
+def top_n_by_key(items:Iterable[Any], key:Callable[[Any], Any], n:int) -> List[Tuple[Any, int]]:
+    """
+    Counts the items by key and returns the n most frequent keys.
+    """
+    return top_n(count_by(items, key), n)
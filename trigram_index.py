@@ -0,0 +1,285 @@
+"""
+Trigram index over the title and body of every issue, used to avoid
+running the keyword regex over the whole corpus. The literal strings a
+pattern requires are extracted from its parse tree, their trigrams are
+looked up in the index, and only the issues containing all of them (for
+at least one alternative of the pattern) are scanned with the real regex.
+The index is saved next to the data file and only rebuilt when that file
+changes.
+"""
+
+import logging
+logger = logging.getLogger(__name__)
+
+import os
+try:
+    from re import _parser as sre_parse
+except ImportError:
+    import sre_parse
+from typing import List, Optional
+
+import numpy as np
+
+from model import Issue
+
+# Bump when the index layout or the indexed text changes so old files are rebuilt
+_INDEX_VERSION = 1
+
+# Patterns with more alternatives than this are not used to filter
+_MAX_ALTERNATIVES = 32
+
+_REPEATS = {sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT}
+if hasattr(sre_parse, 'POSSESSIVE_REPEAT'):
+    _REPEATS.add(sre_parse.POSSESSIVE_REPEAT)
+
+
+def issue_text(issue:Issue) -> str:
+    """
+    The text searched by the keyword analysis for an issue.
+    """
+    return (issue.title or "") + ". " + (issue.text or "")
+
+
+def _code_points(text:str) -> np.ndarray:
+    return np.frombuffer(text.encode('utf-32-le', 'surrogatepass'), dtype=np.uint32).astype(np.int64)
+
+
+def trigram_keys(text:str) -> np.ndarray:
+    """
+    Every trigram of the text (with repeats) as an integer: the three code
+    points of 21 bits each packed into one int64.
+    """
+    codes = _code_points(text)
+    if len(codes) < 3:
+        return np.zeros(0, dtype=np.int64)
+    return (codes[:-2] << 42) | (codes[1:-1] << 21) | codes[2:]
+
+
+def _and(left:List[List[str]], right:Optional[List[List[str]]]) -> Optional[List[List[str]]]:
+    """
+    Combines two requirements that must both hold (cross product of their
+    alternatives). None means "no requirement".
+    """
+    if right is None:
+        return left
+    if len(left) * len(right) > _MAX_ALTERNATIVES:
+        # Too many combinations, keep the more selective side only
+        return left if len(left) <= len(right) else right
+    return [a + b for a in left for b in right]
+
+
+def _analyze(nodes) -> Optional[List[List[str]]]:
+    """
+    Returns the literal strings a parsed (sub)pattern requires, as a list
+    of alternatives each holding strings that must all occur, or None if
+    nothing is required.
+    """
+    required:List[List[str]] = [[]]
+    run = ''
+
+    def flush():
+        nonlocal required, run
+        if run:
+            required = [alt + [run] for alt in required]
+            run = ''
+
+    for op, arg in nodes:
+        if op == sre_parse.LITERAL:
+            run += chr(arg).lower()
+            continue
+        flush()
+        if op == sre_parse.SUBPATTERN:
+            required = _and(required, _analyze(arg[-1]))
+        elif op == sre_parse.BRANCH:
+            branches = [_analyze(branch) for branch in arg[1]]
+            if all(b is not None for b in branches):
+                alternatives = [alt for b in branches for alt in b]
+                if len(alternatives) <= _MAX_ALTERNATIVES:
+                    required = _and(required, alternatives)
+        elif op in _REPEATS:
+            min_count, _, item = arg
+            if min_count >= 1:
+                required = _and(required, _analyze(item))
+    flush()
+
+    if all(not alt for alt in required):
+        return None
+    return required
+
+
+def required_literals(pattern:str) -> Optional[List[List[str]]]:
+    """
+    Returns the lowercase literal strings that any match of the regex must
+    contain, as alternatives (OR) of string lists (AND). Returns None if the
+    pattern can match without any literal, e.g. ".*".
+    """
+    try:
+        return _analyze(sre_parse.parse(pattern))
+    except Exception:
+        return None
+
+
+class TrigramIndex:
+    """
+    Maps every trigram of the lowercased issue texts to the (ascending)
+    positions of the issues containing it. The trigrams are stored as sorted
+    integer keys with the postings of all of them concatenated into one
+    array, so the index is built with a few numpy sorts and can be saved to
+    and loaded from an .npz file as is.
+    """
+
+    def __init__(self, keys:np.ndarray, offsets:np.ndarray, positions:np.ndarray, size:int):
+        self.keys:np.ndarray = keys
+        self.offsets:np.ndarray = offsets
+        self.positions:np.ndarray = positions
+        self.size:int = size
+
+    @classmethod
+    def build(cls, texts:List[str]):
+        """
+        Builds the index in one vectorized pass over all texts: every
+        (trigram, issue) pair is packed into a single int64, sorted and
+        deduplicated, which leaves the postings in trigram and then issue
+        order.
+        """
+        lowered = [text.lower() for text in texts]
+        lengths = np.fromiter(map(len, lowered), dtype=np.int64, count=len(lowered))
+        codes = _code_points(''.join(lowered))
+        issue_of = np.repeat(np.arange(len(texts), dtype=np.int64), lengths)
+        # Trigrams crossing from one text into the next are not part of either
+        within = issue_of[:-2] == issue_of[2:]
+        issue_of = issue_of[:-2][within] if len(codes) >= 3 else issue_of[:0]
+
+        # Rank the characters that occur, so the trigram and its issue fit into one
+        # int64; ranks keep the order of the code points, and with it the sort order
+        present = np.bincount(codes) > 0
+        alphabet = np.flatnonzero(present)
+        ranks = (np.cumsum(present) - 1)[codes]
+        bits = max(len(alphabet) - 1, 1).bit_length()
+        issue_bits = max(len(texts) - 1, 1).bit_length()
+        if len(codes) >= 3:
+            packed = (ranks[:-2] << 2 * bits | ranks[1:-1] << bits | ranks[2:])[within]
+        else:
+            packed = np.zeros(0, dtype=np.int64)
+
+        if 3 * bits + issue_bits <= 63:
+            pairs = np.sort(packed << issue_bits | issue_of)
+            pairs = pairs[np.r_[True, pairs[1:] != pairs[:-1]]] if len(pairs) else pairs
+            packed, issue_of = pairs >> issue_bits, pairs & ((1 << issue_bits) - 1)
+        else:
+            # Too many distinct characters to pack the issue as well
+            order = np.lexsort((issue_of, packed))
+            packed, issue_of = packed[order], issue_of[order]
+            if len(packed):
+                first = np.r_[True, (packed[1:] != packed[:-1]) | (issue_of[1:] != issue_of[:-1])]
+                packed, issue_of = packed[first], issue_of[first]
+
+        starts = np.flatnonzero(np.r_[True, packed[1:] != packed[:-1]]) if len(packed) else np.zeros(0, dtype=np.int64)
+        unique = packed[starts]
+        mask = (1 << bits) - 1
+        # Back from ranks to the code points, the same keys trigram_keys() computes
+        keys = (alphabet[unique >> 2 * bits] << 42 | alphabet[unique >> bits & mask] << 21
+                | alphabet[unique & mask]) if len(unique) else np.zeros(0, dtype=np.int64)
+        return cls(keys.astype(np.int64), np.r_[starts, len(packed)].astype(np.int64),
+                   issue_of.astype(np.uint32), len(texts))
+
+    @staticmethod
+    def cache_path(data_path:str) -> str:
+        return f'{data_path}.trigrams.npz'
+
+    @staticmethod
+    def _params(data_path:str, size:int) -> np.ndarray:
+        stat = os.stat(data_path)
+        return np.array([_INDEX_VERSION, stat.st_size, stat.st_mtime_ns, size], dtype=np.int64)
+
+    @classmethod
+    def load(cls, data_path:str, size:int):
+        """
+        Loads the index saved next to the data file, or returns None if there
+        is none or it is out of date with respect to the data file.
+        """
+        try:
+            with np.load(cls.cache_path(data_path), allow_pickle=False) as cache:
+                if not np.array_equal(cache['params'], cls._params(data_path, size)):
+                    return None
+                return cls(cache['keys'], cache['offsets'], cache['positions'], size)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save(self, data_path:str):
+        """
+        Persists the index next to the data file, tagged with the size and
+        modification time of that file so it can be invalidated.
+        """
+        path = self.cache_path(data_path)
+        # Write to a temporary file first so an interrupted run cannot leave a truncated index
+        with open(path + '.tmp', 'wb') as fout:
+            np.savez(fout, params=self._params(data_path, self.size), keys=self.keys,
+                     offsets=self.offsets, positions=self.positions)
+        os.replace(path + '.tmp', path)
+
+    @classmethod
+    def for_issues(cls, issues:List[Issue], data_path:str=None):
+        """
+        Returns the index of the issues: the one built last time if it was
+        built for the same list, otherwise the one saved next to the data
+        file, otherwise a new one that is saved there. Returns None if
+        data_path is not a data file, since an index that cannot be reused
+        costs more to build than a scan of all issues.
+        """
+        global _CACHED
+        if _CACHED is not None and _CACHED[0] is issues:
+            return _CACHED[1]
+        if not isinstance(data_path, str) or not os.path.isfile(data_path):
+            return None
+
+        index = cls.load(data_path, len(issues))
+        if index is None:
+            index = cls.build([issue_text(issue) for issue in issues])
+            try:
+                index.save(data_path)
+            except OSError as e:
+                logger.info(f'Could not save trigram index: {e}')
+        _CACHED = (issues, index)
+        return index
+
+    def _posting(self, key:int) -> np.ndarray:
+        i = np.searchsorted(self.keys, key)
+        if i == len(self.keys) or self.keys[i] != key:
+            return self.positions[:0]
+        return self.positions[self.offsets[i]:self.offsets[i + 1]]
+
+    def _positions_with_all(self, literals:List[str]) -> Optional[np.ndarray]:
+        grams = set()
+        for literal in literals:
+            grams.update(trigram_keys(literal).tolist())
+        if not grams:
+            return None
+        postings = sorted((self._posting(g) for g in grams), key=len)
+        positions = postings[0]
+        for posting in postings[1:]:
+            if not len(positions):
+                break
+            positions = np.intersect1d(positions, posting, assume_unique=True)
+        return positions
+
+    def candidates(self, pattern:str) -> Optional[List[int]]:
+        """
+        Returns the positions of the issues that may match the regex, in
+        ascending order, or None if the index cannot narrow them down.
+        """
+        required = required_literals(pattern)
+        if required is None:
+            return None
+        positions = []
+        for alternative in required:
+            found = self._positions_with_all(alternative)
+            if found is None:
+                # This alternative has no trigram to look up, so anything may match
+                return None
+            positions.append(found)
+        return np.unique(np.concatenate(positions)).tolist()
+
+
+# Most recently used index, as (issues, index)
+_CACHED = None